@@ -0,0 +1,34 @@
+'''Compares the size of a parsed page, and the time to get it back,
+between the binary format, pickle, and parsing the YAML again.
+
+    python -m benchmarks.bench_binary [sections]
+'''
+import pickle
+import sys
+import timeit
+from stubbly.yaml2html.htyaml import HTYAML
+from stubbly.yaml2html import binary
+from benchmarks.pages import sample_page
+
+
+def main(sections = 200, repeat = 5):
+  yaml_src = sample_page(sections)
+  tree = HTYAML.parse_yaml(yaml_src)
+  pickled = pickle.dumps(tree, pickle.HIGHEST_PROTOCOL)
+  dumped = binary.dumps(tree)
+
+  for name, size, load, dump in (
+    ('yaml', len(yaml_src.encode('utf-8')), lambda: HTYAML.parse_yaml(yaml_src), None),
+    ('pickle', len(pickled), lambda: pickle.loads(pickled),
+     lambda: pickle.dumps(tree, pickle.HIGHEST_PROTOCOL)),
+    ('binary', len(dumped), lambda: binary.loads(dumped), lambda: binary.dumps(tree)),
+  ):
+    load_seconds = min(timeit.repeat(load, number = 1, repeat = repeat))
+    dump_seconds = min(timeit.repeat(dump, number = 1, repeat = repeat)) if dump else float('nan')
+    print('{name:8} {size:9d} bytes  load {load:8.4f} s  dump {dump:8.4f} s'.format(
+      name = name, size = size, load = load_seconds, dump = dump_seconds
+    ))
+
+
+if __name__ == '__main__':
+  main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,55 @@
+'''Compares a page of repeated cards written out in full, as if generated
+in Python before parsing, with the same page using a registered component.
+
+    python -m benchmarks.bench_components [cards]
+'''
+import sys
+import timeit
+from stubbly.yaml2html.htyaml import HTYAML
+from stubbly.yaml2html.components import ComponentRegistry
+
+_card = '''
+div:
+  - - class: card
+  - h3: $title
+  - ul:
+    - li: [first item, {a: [[href: '#first'], a link]}]
+    - li: second item
+  - - $content
+'''
+
+_expanded_template = '''\
+- div:
+  - - class: card
+  - h3: Card {kind}
+  - ul:
+    - li: [first item, {{a: [[href: '#first'], a link]}}]
+    - li: second item
+  - - Some *text* for card {kind}.
+'''
+
+_component_template = '''\
+- card: {{title: Card {kind}, content: Some *text* for card {kind}.}}
+'''
+
+
+def main(cards = 2000, kinds = 10, repeat = 5):
+  registry = ComponentRegistry()
+  registry.register('card', _card)
+  expanded = ''.join(_expanded_template.format(kind = n % kinds) for n in range(cards))
+  with_components = ''.join(_component_template.format(kind = n % kinds) for n in range(cards))
+
+  def generated():
+    HTYAML.parse_yaml(expanded).render(markdown = True)
+
+  def component():
+    registry.clear()
+    HTYAML.parse_yaml(with_components, components = registry).render(markdown = True)
+
+  for name, function in (('generated', generated), ('component', component)):
+    seconds = min(timeit.repeat(function, number = 1, repeat = repeat))
+    print('{name:10} {ms:9.2f} ms'.format(name = name, ms = seconds * 1000))
+
+
+if __name__ == '__main__':
+  main(*[int(arg) for arg in sys.argv[1:]])
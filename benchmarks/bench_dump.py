@@ -0,0 +1,36 @@
+'''Compares dumping a generated config full of symbols with the
+pure-Python StubblyDumper and with `stubbly.dump`, which uses libyaml's
+emitter when PyYAML was built with it.
+
+    python -m benchmarks.bench_dump [entries]
+'''
+import sys
+import timeit
+import yaml
+from stubbly import dump
+from stubbly.yaml_tags import StubblyDumper, FastStubblyDumper, Symbol, EscapedDollar
+
+
+def sample_config(entries):
+  return {
+    'service-{0}'.format(n): {
+      Symbol('$handler'): [Symbol('$route-{0}'.format(n % 50)), n, EscapedDollar('$$price')],
+      'timeout': str(n % 30),
+    }
+    for n in range(entries)
+  }
+
+
+def main(entries = 5000, repeat = 3):
+  config = sample_config(entries)
+  print('fast dumper: {0}'.format(FastStubblyDumper.__name__))
+  for name, function in (
+    ('python', lambda: yaml.dump(config, Dumper = StubblyDumper)),
+    ('dump', lambda: dump(config)),
+  ):
+    seconds = min(timeit.repeat(function, number = 1, repeat = repeat))
+    print('{name:8} {seconds:8.4f} s'.format(name = name, seconds = seconds))
+
+
+if __name__ == '__main__':
+  main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,42 @@
+'''Compares building a DOM by rendering a page and parsing the HTML back
+with lxml, with building it directly with `to_etree`.
+
+    python -m benchmarks.bench_etree [sections]
+
+ElementTree cannot parse HTML, so without lxml only `render` on its own,
+a lower bound for rendering and parsing, is timed against `to_etree`.
+'''
+import sys
+import timeit
+from stubbly.yaml2html.htyaml import HTYAML
+from stubbly.yaml2html.etree import to_etree
+from benchmarks.pages import sample_page
+
+try:
+  import lxml.html
+except ImportError:
+  lxml = None
+
+
+def main(sections = 200, repeat = 5):
+  page = HTYAML.parse_yaml(sample_page(sections))
+
+  functions = [
+    ('render', lambda: page.render(markdown = True)),
+    ('to_etree', lambda: to_etree(page, markdown = True, lxml = False)),
+  ]
+  if lxml is not None:
+    functions += [
+      ('render+lxml', lambda: lxml.html.fromstring(page.render(markdown = True))),
+      ('to_etree lxml', lambda: to_etree(page, markdown = True, lxml = True)),
+    ]
+  else:
+    print('lxml is not installed: render+lxml is not measured')
+
+  for name, function in functions:
+    seconds = min(timeit.repeat(function, number = 1, repeat = repeat))
+    print('{name:14} {ms:9.2f} ms'.format(name = name, ms = seconds * 1000))
+
+
+if __name__ == '__main__':
+  main(*[int(arg) for arg in sys.argv[1:]])
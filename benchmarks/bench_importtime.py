@@ -0,0 +1,63 @@
+'''Measures how long importing stubbly's modules takes, as reported by
+`python -X importtime`, in fresh interpreters with warm bytecode caches.
+
+    python -m benchmarks.bench_importtime [repeat]
+
+For each module it prints the best total import time, the part of it
+spent in stubbly's own modules, and which of the modules that stubbly
+only loads on first use were imported anyway.
+'''
+import os
+import subprocess
+import sys
+import tempfile
+
+MODULES = [
+  'stubbly',
+  'stubbly.yaml_tags',
+  'stubbly.yaml2html.htyaml',
+  'stubbly.yaml2html.cli',
+]
+
+# Only imported when they are first needed.
+DEFERRED = ['markdown2', 'concurrent.futures', 'logging']
+
+
+def importtime(module, pycache_prefix):
+  '''Returns `{imported module: (self us, cumulative us)}`.'''
+  env = dict(os.environ)
+  env.pop('PYTHONDONTWRITEBYTECODE', None)
+  result = subprocess.run(
+    [sys.executable, '-X', 'importtime', '-X', 'pycache_prefix=' + pycache_prefix,
+     '-W', 'ignore', '-c', 'import ' + module],
+    env = env, stderr = subprocess.PIPE, universal_newlines = True, check = True
+  )
+  times = {}
+  for line in result.stderr.splitlines():
+    if not line.startswith('import time:') or 'imported package' in line:
+      continue
+    self_us, cumulative_us, name = line[len('import time:'):].split('|')
+    times[name.strip()] = (int(self_us), int(cumulative_us))
+  return times
+
+
+def main(repeat = 10):
+  with tempfile.TemporaryDirectory() as pycache_prefix:
+    for module in MODULES:
+      importtime(module, pycache_prefix)
+      runs = [importtime(module, pycache_prefix) for _ in range(repeat)]
+      total = min(times[module][1] for times in runs)
+      own = min(
+        sum(self_us for name, (self_us, _) in times.items()
+            if name.split('.')[0] == 'stubbly')
+        for times in runs
+      )
+      deferred = [name for name in DEFERRED if name in runs[0]]
+      print('{module:26} {total:8.1f} ms  stubbly {own:6.1f} ms  deferred imported: {deferred}'.format(
+        module = module, total = total / 1000, own = own / 1000,
+        deferred = ', '.join(deferred) or 'none'
+      ))
+
+
+if __name__ == '__main__':
+  main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,34 @@
+'''Compares the latency of a one-word edit in a live preview, between a
+`PreviewSession` update and parsing and rendering the whole page again.
+
+    python -m benchmarks.bench_incremental [sections]
+'''
+import sys
+import timeit
+from stubbly.yaml2html.htyaml import HTYAML
+from stubbly.yaml2html.incremental import PreviewSession
+from benchmarks.pages import sample_page
+
+
+def main(sections = 500, repeat = 5):
+  yaml_src = sample_page(sections)
+  # Alternate between two versions that differ by one word in one section.
+  target = 'Section {0}\n'.format(sections // 2)
+  versions = [yaml_src, yaml_src.replace(target, 'Heading {0}\n'.format(sections // 2))]
+  session = PreviewSession()
+  session.update(yaml_src)
+  edits = iter(versions[n % 2] for n in range(1, 10 ** 9))
+
+  def full():
+    HTYAML.parse_yaml(next(edits)).render()
+
+  def incremental():
+    session.update(next(edits))
+
+  for name, function in (('full', full), ('incremental', incremental)):
+    seconds = min(timeit.repeat(function, number = 1, repeat = repeat))
+    print('{name:12} {ms:9.2f} ms per edit'.format(name = name, ms = seconds * 1000))
+
+
+if __name__ == '__main__':
+  main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,41 @@
+'''Compares parsing the same page from YAML and from JSON, with the
+standard library's `json` and, when installed, orjson.
+
+    python -m benchmarks.bench_json [sections]
+'''
+import json
+import sys
+import timeit
+import yaml
+from stubbly.yaml_tags import StubblyLoader
+from stubbly.yaml2html import json_input
+from stubbly.yaml2html.htyaml import HTYAML
+from benchmarks.pages import sample_page
+
+
+def main(sections = 200, repeat = 5):
+  yaml_src = sample_page(sections)
+  # The sample page has no stubbly tags, so plain JSON encodes it.
+  json_src = json.dumps(yaml.load(yaml_src, Loader = StubblyLoader))
+
+  decoders = [('json', json.loads)]
+  try:
+    import orjson
+    decoders.append(('orjson', orjson.loads))
+  except ImportError:
+    pass
+
+  timings = [('yaml', lambda: HTYAML.parse_yaml(yaml_src))]
+  for name, loads in decoders:
+    def parse(loads = loads):
+      json_input._loads = loads
+      HTYAML.parse_json(json_src)
+    timings.append((name, parse))
+
+  for name, function in timings:
+    seconds = min(timeit.repeat(function, number = 1, repeat = repeat))
+    print('{name:8} {ms:9.2f} ms'.format(name = name, ms = seconds * 1000))
+
+
+if __name__ == '__main__':
+  main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,28 @@
+'''Compares pretty and minified rendering throughput and output size.
+
+    python -m benchmarks.bench_minify [sections]
+'''
+import sys
+import timeit
+from stubbly.yaml2html.htyaml import HTYAML
+from benchmarks.pages import sample_page
+
+
+def main(sections = 200, repeat = 5):
+  page = HTYAML.parse_yaml(sample_page(sections))
+  for name, kwargs in (
+    ('pretty', {}),
+    ('minify', {'minify': True}),
+  ):
+    output = page.render(**kwargs)
+    seconds = min(timeit.repeat(lambda: page.render(**kwargs), number = 1, repeat = repeat))
+    print('{name:8} {seconds:8.4f} s  {rate:8.1f} pages/s  {size:9d} bytes'.format(
+      name = name,
+      seconds = seconds,
+      rate = 1 / seconds,
+      size = len(output.encode('utf-8'))
+    ))
+
+
+if __name__ == '__main__':
+  main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,37 @@
+'''Compares serial rendering with `ParallelRenderer`, on a long page.
+
+On free-threaded builds the parallel render should be faster by up to
+the number of workers; with the GIL it falls back to rendering serially,
+and should take the same time. `threads on GIL` shows what using threads
+anyway would cost.
+
+    python -m benchmarks.bench_parallel [sections] [workers]
+'''
+import sys
+import timeit
+from stubbly.yaml2html.htyaml import HTYAML
+from stubbly.yaml2html.parallel import ParallelRenderer, gil_enabled
+from benchmarks.pages import sample_page
+
+
+def main(sections = 500, workers = 4, repeat = 5):
+  tree = HTYAML.parse_yaml(sample_page(sections))
+  print('GIL enabled: {0}'.format(gil_enabled()))
+  renderers = [('serial', None), ('parallel', ParallelRenderer(workers))]
+  if gil_enabled():
+    renderers.append(('threads on GIL', ParallelRenderer(workers, serial_on_gil = False)))
+  expected = tree.render(markdown = True)
+  for name, renderer in renderers:
+    if renderer is None:
+      function = lambda: tree.render(markdown = True)
+    else:
+      function = lambda: renderer.render(tree, markdown = True)
+      assert function() == expected
+    seconds = min(timeit.repeat(function, number = 1, repeat = repeat))
+    print('{name:15} {ms:9.2f} ms'.format(name = name, ms = seconds * 1000))
+    if renderer is not None:
+      renderer.close()
+
+
+if __name__ == '__main__':
+  main(*[int(arg) for arg in sys.argv[1:]])
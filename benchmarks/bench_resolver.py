@@ -0,0 +1,49 @@
+'''Compares resolving '$'-prefixed scalars with StubblyLoader's combined
+dispatch against one implicit resolver per stubbly tag.
+
+    python -m benchmarks.bench_resolver [scalars]
+'''
+import re
+import sys
+import timeit
+import yaml
+from yaml.nodes import ScalarNode
+from stubbly.yaml_tags import StubblyLoader, Symbol, EscapedDollar, QuoteAsStrings
+
+
+class PerTagLoader(yaml.Loader):
+  '''The old setup: each stubbly tag as its own implicit resolver.'''
+
+
+for cls in (EscapedDollar, QuoteAsStrings, Symbol):
+  PerTagLoader.add_implicit_resolver(
+    cls.yaml_tag, re.compile(cls.resolver_regexp), cls.resolver_first
+  )
+
+
+def sample_scalars(count):
+  forms = ['$name', '$$dollars', '$quote-as-strings', 'plain text', '42']
+  return [forms[i % len(forms)] for i in range(count)]
+
+
+def main(scalars = 100000, repeat = 5):
+  values = sample_scalars(scalars)
+  implicit = (True, False)
+  for name, loader in (
+    ('per-tag', PerTagLoader('')),
+    ('stubbly', StubblyLoader('')),
+  ):
+    resolve = loader.resolve
+    def run():
+      for value in values:
+        resolve(ScalarNode, value, implicit)
+    seconds = min(timeit.repeat(run, number = 1, repeat = repeat))
+    print('{name:8} {seconds:8.4f} s  {rate:10.0f} scalars/s'.format(
+      name = name,
+      seconds = seconds,
+      rate = scalars / seconds
+    ))
+
+
+if __name__ == '__main__':
+  main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,48 @@
+'''Measures `scalars_to_strings` per-node cost, with stubbly's own
+scopes and with many more scope tags registered.
+
+    python -m benchmarks.bench_scopes [sections] [extra_scopes]
+'''
+import sys
+import timeit
+import yaml
+from stubbly.node_graph_filter import scalars_to_strings
+from stubbly.yaml_tags import StubblyLoader, Scope, ScopeTable, scope_table
+from benchmarks.pages import sample_page
+
+
+def count_nodes(node, seen = None):
+  if seen is None:
+    seen = set()
+  if id(node) in seen:
+    return 0
+  seen.add(id(node))
+  if isinstance(node, yaml.ScalarNode):
+    return 1
+  if isinstance(node, yaml.SequenceNode):
+    return 1 + sum(count_nodes(item, seen) for item in node.value)
+  return 1 + sum(count_nodes(k, seen) + count_nodes(v, seen) for k, v in node.value)
+
+
+def main(sections = 200, extra_scopes = 100, repeat = 5):
+  node = yaml.compose(sample_page(sections), Loader = StubblyLoader)
+  nodes = count_nodes(node)
+
+  crowded = ScopeTable(scope_table.tag_prefix)
+  for tag, scope in scope_table.scopes.items():
+    crowded.register(tag, scope)
+  for n in range(extra_scopes):
+    crowded.register('!stubbly/scope-{0}'.format(n), Scope('scope-{0}'.format(n)))
+
+  for name, table in (
+    ('stubbly', scope_table),
+    ('+{0}'.format(extra_scopes), crowded),
+  ):
+    seconds = min(timeit.repeat(
+      lambda: scalars_to_strings(node, table = table), number = 1, repeat = repeat
+    ))
+    print('{name:8} {per_node:8.3f} us/node'.format(name = name, per_node = seconds / nodes * 1e6))
+
+
+if __name__ == '__main__':
+  main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,41 @@
+'''Measures how many small snippets per second `stubbly.load` handles,
+composing with libyaml, against the pure-Python `StubblyLoader`.
+
+    python -m benchmarks.bench_small_loads [snippets]
+'''
+import sys
+import timeit
+from stubbly import load
+from stubbly.loader import _construct
+from stubbly.yaml_tags import StubblyLoader, FastStubblyLoader
+
+
+SNIPPETS = [
+  '{$route: /users, method: GET}',
+  '[$auth, token]',
+  '$name',
+  '{limit: 100, $quote-as-strings: [1, 2]}',
+]
+
+
+def load_with_python_loader(yaml_src):
+  loader = StubblyLoader(yaml_src)
+  loader.check_node()
+  return _construct(loader, loader.get_node())
+
+
+def main(snippets = 20000, repeat = 5):
+  print('load uses {0}'.format(FastStubblyLoader.__name__))
+  sources = [SNIPPETS[i % len(SNIPPETS)] for i in range(snippets)]
+  for name, function in (
+    ('python', load_with_python_loader),
+    ('load', load),
+  ):
+    seconds = min(timeit.repeat(
+      lambda: [function(source) for source in sources], number = 1, repeat = repeat
+    ))
+    print('{name:8} {rate:10.0f} snippets/s'.format(name = name, rate = snippets / seconds))
+
+
+if __name__ == '__main__':
+  main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,53 @@
+'''Measures memory and comparison cost of interned symbols against one
+string object per occurrence.
+
+    python -m benchmarks.bench_symbols [occurrences] [distinct]
+'''
+import sys
+import timeit
+import tracemalloc
+import yaml
+from stubbly.yaml_tags import StubblyLoader, Symbol
+
+
+def sample_document(occurrences, distinct):
+  return '[{0}]'.format(', '.join(
+    '$a-reasonably-long-symbol-name-{0}'.format(i % distinct) for i in range(occurrences)
+  ))
+
+
+def allocated(build):
+  tracemalloc.start()
+  result = build()
+  size = tracemalloc.get_traced_memory()[0]
+  tracemalloc.stop()
+  return result, size
+
+
+def main(occurrences = 200000, distinct = 300, repeat = 5):
+  document = yaml.compose(sample_document(occurrences, distinct), Loader = StubblyLoader)
+  names = [node.value for node in document.value]
+
+  copies, copies_size = allocated(lambda: [''.join(['$', name[1:]]) for name in names])
+  symbols, symbols_size = allocated(lambda: [Symbol(name) for name in names])
+  print('memory')
+  print('  {0:9} {1:10d} bytes'.format('strings', copies_size))
+  print('  {0:9} {1:10d} bytes'.format('symbols', symbols_size))
+
+  # Equal but separately built values, as when comparing against
+  # names from another document.
+  other_copies = [''.join(['$', name[1:]]) for name in names]
+  other_symbols = [Symbol(name) for name in names]
+  print('comparisons')
+  for name, items, others in (
+    ('strings', copies, other_copies),
+    ('symbols', symbols, other_symbols),
+  ):
+    seconds = min(timeit.repeat(
+      lambda: [a == b for a, b in zip(items, others)], number = 1, repeat = repeat
+    ))
+    print('  {0:9} {1:8.4f} s'.format(name, seconds))
+
+
+if __name__ == '__main__':
+  main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,30 @@
+'''Compares a large table written as `tr` and `td` elements with the same
+table written with `$table`, parsed and rendered.
+
+    python -m benchmarks.bench_table [rows] [columns]
+'''
+import sys
+import timeit
+from stubbly.yaml_tags import Table
+from stubbly.yaml2html.htyaml import HTYAML
+
+
+def main(rows = 20000, columns = 5, repeat = 3):
+  cells = [['r{0}c{1} & <x>'.format(i, j) for j in range(columns)] for i in range(rows)]
+  # Start from loaded YAML, so that only parsing and rendering are timed.
+  as_elements = [{'table': [{'tr': [{'td': cell} for cell in row]} for row in cells]}]
+  as_table = [{Table(): {'rows': cells}}]
+
+  def elements():
+    HTYAML.parse(as_elements).render()
+
+  def table():
+    HTYAML.parse(as_table).render()
+
+  for name, function in (('elements', elements), ('$table', table)):
+    seconds = min(timeit.repeat(function, number = 1, repeat = repeat))
+    print('{name:10} {ms:9.2f} ms'.format(name = name, ms = seconds * 1000))
+
+
+if __name__ == '__main__':
+  main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,32 @@
+'''Compares extracting the text of pages by rendering them with Markdown
+and stripping the HTML, with `to_text`.
+
+    python -m benchmarks.bench_text [pages] [sections]
+'''
+import sys
+import timeit
+from stubbly.yaml2html.htyaml import HTYAML
+from stubbly.yaml2html.plain_text import to_text, _strip_tags, SKIPPED_TAGS
+from benchmarks.pages import sample_page
+
+
+def main(pages = 200, sections = 10, repeat = 3):
+  trees = [HTYAML.parse_yaml(sample_page(sections)) for _ in range(pages)]
+
+  def render_then_strip():
+    for tree in trees:
+      _strip_tags(tree.render(markdown = True), SKIPPED_TAGS)
+
+  def extract():
+    for tree in trees:
+      to_text(tree, markdown = True)
+
+  for name, function in (('strip', render_then_strip), ('to_text', extract)):
+    seconds = min(timeit.repeat(function, number = 1, repeat = repeat))
+    print('{name:8} {ms:9.2f} ms  {rate:8.1f} pages/s'.format(
+      name = name, ms = seconds * 1000, rate = pages / seconds
+    ))
+
+
+if __name__ == '__main__':
+  main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,32 @@
+'''Generated YAML pages of adjustable size, shared by the benchmarks.'''
+
+_section_template = '''\
+    - section:
+      - - id: section-{n}
+          class: section
+      - h2: Section {n}
+      - - |
+          Paragraph {n} has *some* markdown & an [inline link](#s{n}).
+      - ul:
+        - li: [first item, {{a: [[href: '#a{n}'], a link]}}]
+        - li: second item
+        - li: third item
+      - p:
+        - Some text
+        - b: bold
+        - and more text.
+'''
+
+
+def sample_page(sections = 100):
+  '''Returns the YAML source of a page with the given number of sections.'''
+  return (
+    '- <!DOCTYPE html>\n'
+    '- html:\n'
+    '  - - lang: en\n'
+    '  - head:\n'
+    '    - meta: {charset: utf-8}\n'
+    '    - title: Benchmark page\n'
+    '  - body:\n' +
+    ''.join(_section_template.format(n = n) for n in range(sections))
+  )
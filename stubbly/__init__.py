@@ -1 +1,3 @@
-from .loader import load
\ No newline at end of file
+from .loader import load, load_all
+from .dumper import dump, dump_all
+from .yaml_tags import LoaderConfig
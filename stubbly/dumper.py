@@ -0,0 +1,27 @@
+import yaml
+from .yaml_tags import FastStubblyDumper
+
+def dump(data, stream = None, **kwargs):
+  '''Dump `data` as YAML that `load` reads back as `data`.
+
+Symbols, escaped dollars and `$quote-as-strings` are written as plain
+`$…` scalars, and strings that start with '$' are quoted. Uses libyaml's
+emitter when PyYAML was built with it. Returns the YAML if `stream` is
+None.
+
+    >>> from stubbly.yaml_tags import Symbol
+    >>> print(dump({Symbol('$code'): ['$1', 2]}), end = '')
+    $code:
+    - '$1'
+    - 2
+'''
+  return yaml.dump(data, stream, Dumper = FastStubblyDumper, **kwargs)
+
+def dump_all(documents, stream = None, **kwargs):
+  '''Dump each of `documents` as its own YAML document.
+
+`documents` can be any iterable, including a generator. Each document is
+written to `stream` as soon as it is represented, so memory use does not
+grow with the number of documents. Returns the YAML if `stream` is None.
+'''
+  return yaml.dump_all(documents, stream, Dumper = FastStubblyDumper, **kwargs)
@@ -0,0 +1,134 @@
+'''Read-only proxies that construct a document's contents on demand.
+
+`load(yaml_src, lazy = True)` returns a `LazyMapping` or `LazySequence`
+over the filtered node graph instead of building the whole document.
+Each proxy constructs a child the first time it is accessed and caches
+it, so the cost of loading follows the parts of the document that are
+actually used. Scalars, including `Symbol`, `EscapedDollar` and
+`QuoteAsStrings`, are built by the loader's own constructors, so they
+come out exactly as `load` would build them.
+'''
+from collections.abc import Mapping, Sequence
+from reprlib import recursive_repr
+from yaml import MappingNode, SequenceNode
+from yaml.resolver import BaseResolver
+
+_MAPPING_TAG = BaseResolver.DEFAULT_MAPPING_TAG
+_SEQUENCE_TAG = BaseResolver.DEFAULT_SEQUENCE_TAG
+
+
+def construct_lazily(loader, node, proxies = None):
+  '''Returns a proxy for plain mappings and sequences, and constructs
+anything else. `proxies` maps nodes to the proxies already made for them,
+so that aliases share one proxy and recursive documents work.'''
+  if proxies is None:
+    proxies = {}
+  node_type = type(node)
+  if node_type is MappingNode and node.tag == _MAPPING_TAG:
+    proxy_class = LazyMapping
+  elif node_type is SequenceNode and node.tag == _SEQUENCE_TAG:
+    proxy_class = LazySequence
+  else:
+    return loader.construct_object(node, deep = True)
+  proxy = proxies.get(node)
+  if proxy is None:
+    proxy = proxies[node] = proxy_class(loader, node, proxies)
+  return proxy
+
+
+class LazyMapping(Mapping):
+  r'''A mapping whose keys are constructed on first use,
+and whose values are each constructed when first looked up.
+
+    >>> from stubbly import load
+    >>> from stubbly.yaml_tags import Symbol
+    >>> config = load("""
+    ... server: {port: 80}
+    ... $code: [1, 2]
+    ... """, lazy = True)
+    >>> config['server']
+    LazyMapping({'port': '80'})
+    >>> config[Symbol('$code')]
+    LazySequence([1, 2])
+'''
+
+  def __init__(self, loader, node, proxies):
+    self._loader = loader
+    self._node = node
+    self._proxies = proxies
+    self._value_nodes = None
+    self._values = {}
+
+  def _index(self):
+    if self._value_nodes is None:
+      # Merge keys (`<<`) are flattened as `construct_mapping` does, on
+      # a copy, so the document's node is left as it was.
+      node = MappingNode(self._node.tag, list(self._node.value))
+      self._loader.flatten_mapping(node)
+      value_nodes = {}
+      for key_node, value_node in node.value:
+        key = construct_lazily(self._loader, key_node, self._proxies)
+        value_nodes[key] = value_node
+      self._value_nodes = value_nodes
+    return self._value_nodes
+
+  def __getitem__(self, key):
+    try:
+      return self._values[key]
+    except KeyError:
+      pass
+    value_node = self._index()[key]
+    value = self._values[key] = construct_lazily(
+      self._loader, value_node, self._proxies
+    )
+    return value
+
+  def __iter__(self):
+    return iter(self._index())
+
+  def __len__(self):
+    return len(self._index())
+
+  @recursive_repr()
+  def __repr__(self):
+    return '{0}({1!r})'.format(self.__class__.__name__, dict(self.items()))
+
+
+class LazySequence(Sequence):
+  '''A sequence whose items are each constructed when first accessed.'''
+
+  _unconstructed = object()
+
+  def __init__(self, loader, node, proxies):
+    self._loader = loader
+    self._node = node
+    self._proxies = proxies
+    self._items = [self._unconstructed] * len(node.value)
+
+  def __getitem__(self, index):
+    if isinstance(index, slice):
+      return [self[i] for i in range(*index.indices(len(self)))]
+    item = self._items[index]
+    if item is self._unconstructed:
+      item = self._items[index] = construct_lazily(
+        self._loader, self._node.value[index], self._proxies
+      )
+    return item
+
+  def __len__(self):
+    return len(self._items)
+
+  def __eq__(self, other):
+    if not isinstance(other, (list, LazySequence)):
+      return NotImplemented
+    return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+  def __ne__(self, other):
+    result = self.__eq__(other)
+    return result if result is NotImplemented else not result
+
+  __hash__ = None
+
+  @recursive_repr()
+  def __repr__(self):
+    return '{0}({1!r})'.format(self.__class__.__name__, list(self))
@@ -1,17 +1,65 @@
-
 import yaml
 from .node_graph_filter import scalars_to_strings
+from .yaml_tags import FastStubblyLoader
+from .lazy import construct_lazily
+
+def _construct(loader, node, lazy = False):
+  filtered = scalars_to_strings(node, table = loader.scope_table)
+  if not isinstance(filtered, (yaml.MappingNode, yaml.SequenceNode, yaml.ScalarNode)):
+    raise TypeError('scalars_to_strings returned a node that is neither MappingNode, SequenceNode, nor Scalar Node')
+  if lazy:
+    # Objects constructed for earlier documents are only referenced
+    # by their proxies from now on.
+    loader.constructed_objects = {}
+    return construct_lazily(loader, filtered)
+  # construct_document builds each node once, so nodes shared through
+  # aliases become shared objects, and recursive nodes are supported.
+  return loader.construct_document(filtered)
+
+def _loader_class(config):
+  # Composing in libyaml rather than in Python is most of the cost of
+  # loading a small document.
+  return FastStubblyLoader if config is None else config.FastLoader
+
+def load(yaml_src, lazy = False, config = None):
+  '''Load the first document in `yaml_src`.
+
+With `lazy = True`, mappings and sequences are returned as read-only
+`LazyMapping` and `LazySequence` proxies that construct their contents
+on first access. See `stubbly.lazy`.
+
+`config` is a `LoaderConfig` giving the tags to load with. By default,
+every tag registered on `StubblyLoader` is used.
+'''
+  loader = _loader_class(config)(yaml_src)
+  try:
+    loader.check_node()
+    node = loader.get_node()
+    return _construct(loader, node, lazy)
+  finally:
+    if not lazy:
+      loader.dispose()
+
+def load_all(stream, lazy = False, config = None):
+  r'''Generate the documents in a stream one at a time.
+
+`stream` can be a string or a file object; files are read incrementally.
+Each document is composed, filtered and constructed before the next one
+is read, so memory use does not grow with the length of the stream.
 
-def load(yaml_src):
-  loader = yaml.Loader(yaml_src)
-  loader.check_node()
-  node = loader.get_node()
-  filtered = scalars_to_strings(node)
-  if isinstance(filtered, yaml.MappingNode):
-    constructor = loader.construct_mapping
-    return loader.construct_mapping(filtered, deep = True)
-  if isinstance(filtered, yaml.SequenceNode):
-    return loader.construct_sequence(filtered, deep = True)
-  if isinstance(filtered, yaml.ScalarNode):
-    return loader.construct_scalar(filtered)
-  raise TypeError('scalars_to_strings returned a node that is neither MappingNode, SequenceNode, nor Scalar Node')
+    >>> documents = load_all("""
+    ... - 1
+    ... ---
+    ... $name: 2
+    ... """)
+    >>> next(documents)
+    ['1']
+    >>> next(documents)
+    {Symbol('$name'): 2}
+'''
+  loader = _loader_class(config)(stream)
+  try:
+    while loader.check_node():
+      yield _construct(loader, loader.get_node(), lazy)
+  finally:
+    loader.dispose()
@@ -1,16 +1,23 @@
 import yaml
 from yaml import SequenceNode, MappingNode, ScalarNode
-from yaml.resolver import BaseResolver
 from .yaml_tags import *
+from .yaml_tags.scopes import BASE, STRING_TAG
 
-[BASE, SYMBOL, QUOTE_AS_STRINGS] = range(3)
-STUBBLY_TAG_PREFIX = Symbol.tag_prefix
-STRING_TAG = BaseResolver.DEFAULT_SCALAR_TAG
+SYMBOL = Symbol.scope
+QUOTE_AS_STRINGS = QuoteAsStrings.scope
 
-def scalars_to_strings(node, state = BASE):
+def scalars_to_strings(node, state = BASE, memo = None, table = scope_table):
   r'''Turn scalars into strings, except for dict keys and !stubbly content.
 Also turn !stubbly/quote-as-strings content into strings.
 
+`state` is the `Scope` of `node`; keys with scope tags change the scope
+of their values, as given by `table`. See `stubbly.yaml_tags.scopes`.
+
+Anchored nodes appear in the graph once for every alias that refers to
+them. `memo` maps each (collection node, state) pair that has been
+visited to its filtered copy, so that shared and recursive structures
+stay shared and recursive, and are only filtered once.
+
     >>> document = """ 
     ...   number: 5
     ...   boolean: on
@@ -27,12 +34,12 @@ Also turn !stubbly/quote-as-strings content into strings.
     ...     - $code: 6 # SHOULD be converted to strings
     ...   ?
     ... """
-    >>> loader = yaml.Loader(document)
+    >>> loader = StubblyLoader(document)
     >>> loader.check_data()
     True
     >>> node = loader.get_node()
     >>> stringified = scalars_to_strings(node)
-    >>> print(yaml.serialize(stringified).strip())
+    >>> print(yaml.serialize(stringified, Dumper = StubblyDumper).strip())
     number: '5'
     boolean: 'on'
     null: ''
@@ -54,21 +61,35 @@ Also turn !stubbly/quote-as-strings content into strings.
   tag = node.tag
   value = node.value
 
-  if type(node) is SequenceNode:
-    return SequenceNode(
-      tag = tag,
-      value = [scalars_to_strings(item, state) for item in value]
-    )
+  node_type = type(node)
+  if node_type is SequenceNode or node_type is MappingNode:
+    if memo is None:
+      memo = {}
+    key = (id(node), state)
+    result = memo.get(key)
+    if result is not None:
+      return result
+    # Register the copy before filling it in, so recursive nodes
+    # find themselves.
+    result = memo[key] = node_type(tag = tag, value = [])
+    if node_type is SequenceNode:
+      result.value.extend(
+        scalars_to_strings(item, state, memo, table) for item in value
+      )
+    else:
+      result.value.extend(
+        mapping_item_to_strings(item, state, memo, table) for item in value
+      )
+    return result
 
-  if type(node) is MappingNode:
-    return MappingNode(
-      tag = tag,
-      value = [mapping_item_to_strings(item, state) for item in value]
-    )
-
-  if (tag == STRING_TAG or
-      state is SYMBOL or
-      (state is BASE and tag.startswith(STUBBLY_TAG_PREFIX))):
+  # Strings are kept in every scope.
+  if tag == STRING_TAG:
+    return node
+  try:
+    keep_scalar = table.rows[state][tag][1]
+  except KeyError:
+    keep_scalar = table.compile(state, tag)[1]
+  if keep_scalar:
     return node
 
   return ScalarNode(
@@ -76,18 +97,16 @@ Also turn !stubbly/quote-as-strings content into strings.
     value = value
   )
 
-def mapping_item_to_strings(item, state = BASE):
+def mapping_item_to_strings(item, state = BASE, memo = None, table = scope_table):
 
   key, value = item
   tag = key.tag
-  if state is QUOTE_AS_STRINGS and tag != STRING_TAG:
-    key_ = ScalarNode(tag = STRING_TAG, value = key.value)
-  else:
+  try:
+    next_state, _, keep_key = table.rows[state][tag]
+  except KeyError:
+    next_state, _, keep_key = table.compile(state, tag)
+  if keep_key:
     key_ = key
-  if state is QUOTE_AS_STRINGS or tag == QuoteAsStrings.yaml_tag:
-    next_state = QUOTE_AS_STRINGS
-  elif state is SYMBOL or tag == Symbol.yaml_tag:
-    next_state = SYMBOL
   else:
-    next_state = BASE
-  return (key_, scalars_to_strings(value, state = next_state))
+    key_ = ScalarNode(tag = STRING_TAG, value = key.value)
+  return (key_, scalars_to_strings(value, next_state, memo, table))
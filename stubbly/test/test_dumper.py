@@ -0,0 +1,82 @@
+from unittest import TestCase
+import doctest
+import io
+import yaml
+from .. import dumper
+from ..dumper import dump, dump_all
+from ..loader import load, load_all
+from ..yaml_tags import *
+
+
+class TestRoundTrip(TestCase):
+
+  documents = [
+    Symbol('$name'),
+    EscapedDollar('$$dollars'),
+    QuoteAsStrings(),
+    'plain',
+    '$not a symbol',
+    '$$not escaped',
+    '$quote-as-strings',
+    ['5', 'on', '', 'null', '~', '1.5'],
+    {
+      'key': 'value',
+      Symbol('$code'): [1, 2.5, True, None, Symbol('$x'), EscapedDollar('$$y')],
+      EscapedDollar('$$key'): [QuoteAsStrings(), QuoteAsStrings()],
+    },
+    [{QuoteAsStrings(): ['1', '$inner', '$$inner', '$quote-as-strings']}],
+  ]
+
+  def assertRoundTrips(self, dumped_with):
+    for document in self.documents:
+      with self.subTest(document = document):
+        loaded = load(dumped_with(document))
+        self.assertEqual(loaded, document)
+        self.assertEqual(type(loaded), type(document))
+
+  def test_dump(self):
+    self.assertRoundTrips(dump)
+
+  def test_python_dumper(self):
+    self.assertRoundTrips(lambda document: yaml.dump(document, Dumper = StubblyDumper))
+
+  def test_plain_output(self):
+    self.assertEqual(
+      dump([Symbol('$a'), EscapedDollar('$$b'), QuoteAsStrings()]),
+      '- $a\n- $$b\n- $quote-as-strings\n'
+    )
+
+  def test_no_anchors_for_repeated_objects(self):
+    self.assertNotIn('&', dump([QuoteAsStrings(), QuoteAsStrings(), Symbol('$a'), Symbol('$a')]))
+
+
+class TestDumpAll(TestCase):
+
+  def test_round_trip(self):
+    documents = TestRoundTrip.documents
+    self.assertEqual(list(load_all(dump_all(documents))), documents)
+
+  def test_streams_generator(self):
+    writes = []
+    class Stream:
+      def write(self, data):
+        writes.append(data)
+    def documents():
+      for n in range(3):
+        yield {Symbol('$n'): n}
+        self.assertTrue(writes)
+    self.assertIsNone(dump_all(documents(), Stream()))
+    self.assertEqual(
+      list(load_all(''.join(writes))),
+      [{Symbol('$n'): n} for n in range(3)]
+    )
+
+  def test_file(self):
+    stream = io.StringIO()
+    dump_all([['1'], [Symbol('$a')]], stream)
+    self.assertEqual(list(load_all(stream.getvalue())), [['1'], [Symbol('$a')]])
+
+
+def load_tests(loader_, tests, ignore):
+  tests.addTests(doctest.DocTestSuite(dumper))
+  return tests
@@ -0,0 +1,37 @@
+from unittest import TestCase
+import subprocess
+import sys
+
+# Only imported when they are first needed. See benchmarks/bench_importtime.py
+# for the time importing stubbly takes.
+DEFERRED = ['markdown2', 'concurrent.futures', 'logging']
+
+_script = '''
+import sys
+import stubbly.yaml2html.cli
+from stubbly.yaml_tags import DEFAULT_CONFIG, config
+print(' '.join(name for name in sys.argv[1:] if name in sys.modules))
+print(config._default_config is not None)
+DEFAULT_CONFIG.Loader
+print(config._default_config is not None)
+'''
+
+
+class TestImportTime(TestCase):
+
+  @classmethod
+  def setUpClass(cls):
+    cls.result = subprocess.run(
+      [sys.executable, '-W', 'ignore', '-c', _script] + DEFERRED,
+      stdout = subprocess.PIPE, stderr = subprocess.PIPE,
+      universal_newlines = True, check = True
+    )
+
+  def test_deferred_imports(self):
+    deferred = self.result.stdout.splitlines()[0]
+    self.assertEqual(deferred, '')
+
+  def test_default_config(self):
+    built_on_import, built_on_use = self.result.stdout.splitlines()[1:]
+    self.assertEqual(built_on_import, 'False')
+    self.assertEqual(built_on_use, 'True')
@@ -0,0 +1,85 @@
+from unittest import TestCase
+import doctest
+from .. import lazy
+from ..lazy import LazyMapping, LazySequence
+from ..loader import load, load_all
+from ..yaml_tags import *
+
+
+class TestLazyLoad(TestCase):
+
+  yaml_src = '''
+    database:
+      host: localhost
+      port: 5432
+    features: [a, b, on]
+    $code:
+      - 1
+      - $$escaped: yes
+      - $quote-as-strings: [$x, 2]
+  '''
+
+  def test_equal_to_eager_load(self):
+    self.assertEqual(load(self.yaml_src, lazy = True), load(self.yaml_src))
+
+  def test_proxies(self):
+    config = load(self.yaml_src, lazy = True)
+    self.assertIsInstance(config, LazyMapping)
+    self.assertIsInstance(config['database'], LazyMapping)
+    self.assertIsInstance(config['features'], LazySequence)
+
+  def test_values_constructed_on_first_access(self):
+    config = load(self.yaml_src, lazy = True)
+    self.assertEqual(config._values, {})
+    database = config['database']
+    self.assertEqual(list(config._values), ['database'])
+    self.assertIs(config['database'], database)
+    self.assertEqual(database._values, {})
+    self.assertEqual(database['port'], '5432')
+
+  def test_stubbly_objects(self):
+    code = load(self.yaml_src, lazy = True)[Symbol('$code')]
+    self.assertEqual(code[0], 1)
+    self.assertEqual(code[1], {EscapedDollar('$$escaped'): True})
+    self.assertIsInstance(list(code[1])[0], EscapedDollar)
+    self.assertEqual(code[2][QuoteAsStrings()], ['$x', '2'])
+
+  def test_missing_key(self):
+    with self.assertRaises(KeyError):
+      load(self.yaml_src, lazy = True)['missing']
+
+  def test_sequence_indexing(self):
+    features = load(self.yaml_src, lazy = True)['features']
+    self.assertEqual(features[-1], 'on')
+    self.assertEqual(features[:2], ['a', 'b'])
+    self.assertEqual(len(features), 3)
+    with self.assertRaises(IndexError):
+      features[3]
+
+  def test_aliases_share_proxies(self):
+    config = load('{a: &x [1], b: *x}', lazy = True)
+    self.assertIs(config['a'], config['b'])
+
+  def test_recursive(self):
+    config = load('&a {self: *a}', lazy = True)
+    self.assertIs(config['self'], config)
+    self.assertEqual(repr(config), "LazyMapping({'self': ...})")
+
+  def test_merge_keys(self):
+    yaml_src = 'base: &b {x: 1, y: 0}\nd:\n  <<: *b\n  y: 2\n'
+    config = load(yaml_src, lazy = True)
+    self.assertEqual(dict(config['d']), {'x': '1', 'y': '2'})
+    self.assertEqual(config, load(yaml_src))
+    self.assertEqual(dict(config['base']), {'x': '1', 'y': '0'})
+
+  def test_scalar_document(self):
+    self.assertEqual(load('$name', lazy = True), Symbol('$name'))
+
+  def test_load_all(self):
+    documents = list(load_all('a: 1\n---\n[2]\n', lazy = True))
+    self.assertEqual(documents, [{'a': '1'}, ['2']])
+
+
+def load_tests(loader, tests, ignore):
+  tests.addTests(doctest.DocTestSuite(lazy))
+  return tests
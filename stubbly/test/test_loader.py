@@ -1,6 +1,11 @@
-from unittest import TestCase
+from unittest import TestCase, skipUnless
+from concurrent.futures import ThreadPoolExecutor
+import doctest
+import io
+import yaml
+from .. import loader
 from ..yaml_tags import *
-from ..loader import load
+from ..loader import load, load_all
 
 class TestLoad(TestCase):
 
@@ -44,4 +49,152 @@ class TestLoad(TestCase):
           ]
         }
       ]
-    )
\ No newline at end of file
+    )
+
+  def test_aliases_construct_shared_objects(self):
+    obj = load('''
+      nav: &nav [home, about]
+      header: {$links: *nav}
+      footer: *nav
+    ''')
+    self.assertIs(obj['nav'], obj['footer'])
+    self.assertEqual(obj['nav'], ['home', 'about'])
+
+  def test_recursive_alias(self):
+    obj = load('&a [1, *a]')
+    self.assertEqual(obj[0], '1')
+    self.assertIs(obj[1], obj)
+
+  def test_recursive_mapping(self):
+    obj = load('&a {self: *a, value: 1}')
+    self.assertIs(obj['self'], obj)
+
+  def test_deeply_shared_aliases(self):
+    src = '- &a0 {leaf: 1}\n'
+    for level in range(1, 41):
+      src += '- &a{0} [*a{1}, *a{1}]\n'.format(level, level - 1)
+    obj = load(src)
+    self.assertIs(obj[40][0], obj[40][1])
+    self.assertIs(obj[1][0], obj[0])
+    self.assertEqual(obj[0], {'leaf': '1'})
+
+  def test_scalar_document(self):
+    self.assertEqual(load('$name'), Symbol('$name'))
+    self.assertEqual(load('12'), '12')
+
+class TestLoadAll(TestCase):
+
+  def test_multiple_documents(self):
+    yaml_src = (
+      '- 1\n'
+      '---\n'
+      '$code: [2]\n'
+      '---\n'
+      'plain\n'
+    )
+    self.assertEqual(
+      list(load_all(yaml_src)),
+      [['1'], {Symbol('$code'): [2]}, 'plain']
+    )
+
+  def test_empty_stream(self):
+    self.assertEqual(list(load_all('')), [])
+
+  def test_anchors_are_per_document(self):
+    documents = load_all('[&a [1], *a]\n---\n[&a [2], *a]\n')
+    first = next(documents)
+    second = next(documents)
+    self.assertIs(first[0], first[1])
+    self.assertEqual(second, [['2'], ['2']])
+
+  def test_file_object_read_incrementally(self):
+    count = 5000
+    stream = io.StringIO(''.join(
+      '---\n- document {0}\n'.format(n) for n in range(count)
+    ))
+    size = len(stream.getvalue())
+    documents = load_all(stream)
+    self.assertEqual(next(documents), ['document 0'])
+    self.assertLess(stream.tell(), size)
+    remaining = sum(1 for document in documents)
+    self.assertEqual(remaining, count - 1)
+
+class TestFastLoader(TestCase):
+
+  @skipUnless(yaml.__with_libyaml__, 'PyYAML is built without libyaml')
+  def test_composes_with_libyaml(self):
+    self.assertTrue(issubclass(FastStubblyLoader, yaml.cyaml.CParser))
+    self.assertTrue(issubclass(DEFAULT_CONFIG.FastLoader, yaml.cyaml.CParser))
+
+  def test_same_as_python_loader(self):
+    yaml_src = '{$a: [&x 1, *x, $$b, $quote-as-strings], <<: {c: 2}, d: [true, 1.5]}'
+    for config in (None, DEFAULT_CONFIG, LoaderConfig([EscapedDollar])):
+      python_loader = (StubblyLoader if config is None else config.Loader)(yaml_src)
+      expected = loader._construct(python_loader, python_loader.get_single_node())
+      self.assertEqual(load(yaml_src, config = config), expected)
+
+  def test_no_state_carried_over(self):
+    self.assertEqual(load('[&a [1], *a]'), [['1'], ['1']])
+    with self.assertRaises(yaml.composer.ComposerError):
+      load('[*a]')
+    self.assertEqual(load('key: value'), {'key': 'value'})
+
+  def test_threads(self):
+    sources = ['{{$key: [{0}], name: n{0}}}'.format(n) for n in range(2000)]
+    with ThreadPoolExecutor(max_workers = 8) as executor:
+      loaded = list(executor.map(load, sources))
+    for n, obj in enumerate(loaded):
+      self.assertEqual(obj, {Symbol('$key'): [n], 'name': 'n{0}'.format(n)})
+
+
+class TestConcurrentLoads(TestCase):
+
+  yaml_src = (
+    'id: {0}\n'
+    '$code: [{0}, $$cost, $quote-as-strings]\n'
+    '$quote-as-strings: {{$x: {0}}}\n'
+  )
+
+  def expected_default(self, n):
+    return {
+      'id': str(n),
+      Symbol('$code'): [n, EscapedDollar('$$cost'), QuoteAsStrings()],
+      QuoteAsStrings(): {'$x': str(n)},
+    }
+
+  def expected_escapes_only(self, n):
+    return {
+      'id': str(n),
+      '$code': [str(n), EscapedDollar('$$cost'), '$quote-as-strings'],
+      '$quote-as-strings': {'$x': str(n)},
+    }
+
+  def test_configs_side_by_side(self):
+    escapes_only = LoaderConfig([EscapedDollar])
+    def check(n):
+      if n % 2:
+        return load(self.yaml_src.format(n), config = escapes_only) == self.expected_escapes_only(n)
+      lazy = n % 3 == 0
+      loaded = load(self.yaml_src.format(n), lazy = lazy, config = DEFAULT_CONFIG)
+      return dict(loaded) == self.expected_default(n)
+    with ThreadPoolExecutor(max_workers = 16) as executor:
+      results = list(executor.map(check, range(1000)))
+    self.assertTrue(all(results))
+
+  def test_load_all_from_threads(self):
+    escapes_only = LoaderConfig([EscapedDollar])
+    stream = '---\n'.join(self.yaml_src.format(n) for n in range(50))
+    def check(config):
+      documents = list(load_all(stream, config = config))
+      expected = (
+        self.expected_escapes_only if config is escapes_only else self.expected_default
+      )
+      return documents == [expected(n) for n in range(50)]
+    with ThreadPoolExecutor(max_workers = 8) as executor:
+      results = list(executor.map(check, [escapes_only, None] * 8))
+    self.assertTrue(all(results))
+
+
+def load_tests(loader_, tests, ignore):
+  tests.addTests(doctest.DocTestSuite(loader))
+  return tests
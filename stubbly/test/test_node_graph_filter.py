@@ -1,7 +1,108 @@
 import unittest
 from unittest import TestCase
 import doctest
+import yaml
 from .. import node_graph_filter
+from ..yaml_tags import StubblyLoader, StubblyObject, Scope, ScopeTable
+from ..yaml_tags.scopes import BASE
+from ..node_graph_filter import scalars_to_strings, SYMBOL, QUOTE_AS_STRINGS
+
+STR = 'tag:yaml.org,2002:str'
+INT = 'tag:yaml.org,2002:int'
+
+
+class TestAliases(TestCase):
+
+  def filtered(self, yaml_src, **kwargs):
+    return scalars_to_strings(yaml.compose(yaml_src, Loader = StubblyLoader), **kwargs)
+
+  def test_alias_maps_to_one_node(self):
+    node = self.filtered('[&a [1, 2], *a, *a]')
+    self.assertIs(node.value[0], node.value[1])
+    self.assertIs(node.value[0], node.value[2])
+    self.assertEqual([item.value for item in node.value[0].value], ['1', '2'])
+
+  def test_alias_in_different_states(self):
+    node = self.filtered('[&a [1], {$code: *a}]')
+    base = node.value[0]
+    symbol = node.value[1].value[0][1]
+    self.assertIsNot(base, symbol)
+    self.assertEqual(base.value[0].tag, 'tag:yaml.org,2002:str')
+    self.assertEqual(symbol.value[0].tag, 'tag:yaml.org,2002:int')
+
+  def test_recursive_alias(self):
+    node = self.filtered('&a [1, *a]')
+    self.assertIs(node.value[1], node)
+
+  def test_deeply_shared_aliases(self):
+    # Without memoization, this would visit 2 ** 40 nodes.
+    src = '- &a0 [x]\n'
+    for level in range(1, 41):
+      src += '- &a{0} [*a{1}, *a{1}]\n'.format(level, level - 1)
+    node = self.filtered(src)
+    top = node.value[-1]
+    self.assertIs(top.value[0], top.value[1])
+
+  def test_state_argument(self):
+    node = self.filtered('[1]', state = SYMBOL)
+    self.assertEqual(node.value[0].tag, 'tag:yaml.org,2002:int')
+
+
+class Raw(StubblyObject):
+  '''Test scope tag: keeps every scalar, and cannot be left.'''
+  scope = Scope('raw', keep_scalars = True, final = True)
+
+  @classmethod
+  def from_yaml(cls, loader, node):
+    return cls()
+
+
+class TestScopes(TestCase):
+
+  def filtered(self, yaml_src, **kwargs):
+    return scalars_to_strings(yaml.compose(yaml_src, Loader = StubblyLoader), **kwargs)
+
+  def test_registered_through_metaclass(self):
+    node = self.filtered('{!stubbly/raw r: [1, {$quote-as-strings: 2}], n: [1]}')
+    raw = node.value[0][1]
+    self.assertEqual(raw.value[0].tag, INT)
+    self.assertEqual(raw.value[1].value[0][1].tag, INT)
+    self.assertEqual(node.value[1][1].value[0].tag, STR)
+
+  def test_quote_as_strings_is_final(self):
+    node = self.filtered('{$quote-as-strings: {$code: [1, $x]}}')
+    key, value = node.value[0][1].value[0]
+    self.assertEqual(key.tag, STR)
+    self.assertEqual([item.tag for item in value.value], [STR, STR])
+
+  def test_symbol_scope_can_be_left(self):
+    node = self.filtered('{$code: [{$quote-as-strings: [1]}, 2]}')
+    code = node.value[0][1]
+    self.assertEqual(code.value[0].value[0][1].value[0].tag, STR)
+    self.assertEqual(code.value[1].tag, INT)
+
+  def test_separate_table(self):
+    table = ScopeTable('!stubbly/')
+    node = self.filtered('{$code: [1]}', table = table)
+    self.assertEqual(node.value[0][1].value[0].tag, STR)
+    table.register('!stubbly/symbol', SYMBOL)
+    node = self.filtered('{$code: [1]}', table = table)
+    self.assertEqual(node.value[0][1].value[0].tag, INT)
+
+  def test_entries(self):
+    table = ScopeTable('!stubbly/')
+    table.register('!stubbly/quote-as-strings', QUOTE_AS_STRINGS)
+    self.assertEqual(table.entry(BASE, '!stubbly/x'), (BASE, True, True))
+    self.assertEqual(table.entry(BASE, INT), (BASE, False, True))
+    self.assertEqual(
+      table.entry(BASE, '!stubbly/quote-as-strings'),
+      (QUOTE_AS_STRINGS, True, True)
+    )
+    self.assertEqual(
+      table.entry(QUOTE_AS_STRINGS, '!stubbly/x'),
+      (QUOTE_AS_STRINGS, False, False)
+    )
+
 
 def load_tests(loader, tests, ignore):
   tests.addTests(doctest.DocTestSuite(node_graph_filter))
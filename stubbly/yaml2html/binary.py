@@ -0,0 +1,355 @@
+'''Compact binary format for parsed HTYAML trees.
+
+`dumps(tree)` writes a tree as bytes and `loads(data)` reads it back,
+for passing trees between processes or keeping them in caches. Loading
+is much faster than parsing the YAML again, and the data is much
+smaller than a pickle, because:
+
+- every string is stored once, in a table, and referred to by index;
+- nodes are stored in a flat table of unsigned integers, children before
+  their parents, and refer to their children by table index. The table
+  uses 1, 2 or 4 bytes per integer, whichever is enough for the tree;
+- identical text and attribute nodes are stored once;
+- the `yaml_node` each object was parsed from is left out.
+
+Loaded objects have `yaml_node = None`. Subtrees that appear several
+times in a tree, through YAML aliases, are stored once and are still
+shared, and rendered once, after loading. `LazyNodes` are parsed while
+dumping and load as plain `Nodes`. Trees containing `NotParsed`, or
+elements whose tag is not a string, cannot be dumped.
+
+    >>> from stubbly.yaml2html.htyaml import Nodes
+    >>> page = Nodes.parse_yaml("""
+    ... - p: [[class: intro], Hello]
+    ... - hr:
+    ... """)
+    >>> print(loads(dumps(page)).render())
+    <p class="intro">Hello</p>
+    <hr>
+
+Layout, all integers little-endian:
+
+    magic 'HTYB', uint32 version, uint32 integer size,
+    uint32 string count, uint32 string blob size,
+    uint32 node table size, uint32 root index,
+    integer length (in characters) of each string,
+    UTF-8 blob of all strings, padded to a multiple of 4 bytes,
+    node table: integer * node table size.
+
+Each node is a record in the node table, starting with its kind, plus
+SHARED on ELEMENT and NODES records rendered once for all their occurrences:
+
+    LITERAL  string
+    TEXT     string + 1, or 0 for null text
+    ATTRS    class, count, (name kind, name, value kind, value) * count
+    EMPTY    tag string, attributes node
+    ELEMENT  tag string, attributes node, nodes node
+    NODES    count, child node * count
+    TABLE    attributes node, width, header rows, rows,
+             column attributes node * width,
+             header cell string * width * header rows, by column,
+             cell string * width * rows, by column
+'''
+from array import array
+import struct
+import sys
+from .htyaml import (
+  Attributes, PotentiallyAmbiguousAttributes, UnambiguousAttributes,
+  AttributeValue, Literal, EscapableText, EmptyElement, ElementWithContent,
+  Nodes
+)
+from .bulk_table import BulkTable
+
+MAGIC = b'HTYB'
+VERSION = 1
+
+_HEADER = struct.Struct('<4s6I')
+
+# Array type codes by integer size.
+_TYPECODES = {1: 'B', 2: 'H', 4: 'I'}
+
+[LITERAL, TEXT, ATTRS, EMPTY, ELEMENT, NODES, TABLE] = range(7)
+# Added to the kind of ELEMENT and NODES records that are shared.
+SHARED = 0x80
+
+ATTRIBUTES_CLASSES = (Attributes, PotentiallyAmbiguousAttributes, UnambiguousAttributes)
+
+# Kinds of attribute names and values. Numbers are stored as strings.
+[VALUE_NONE, VALUE_FALSE, VALUE_TRUE, VALUE_STR, VALUE_INT, VALUE_FLOAT] = range(6)
+
+
+class BinaryFormatError(ValueError):
+  pass
+
+
+class _Encoder(object):
+
+  def __init__(self):
+    self.strings = []
+    self.string_indexes = {}
+    self.table = []
+    self.node_indexes = {}
+    # Dumped nodes are kept alive, so that their ids are not reused.
+    self.dumped = []
+    self.record_count = 0
+    # Indexes of leaf records, so that identical leaves are stored once.
+    self.leaf_indexes = {}
+
+  def string(self, value):
+    value = str.__str__(value)
+    index = self.string_indexes.get(value)
+    if index is None:
+      index = self.string_indexes[value] = len(self.strings)
+      self.strings.append(value)
+    return index
+
+  def tag(self, node):
+    tag = node.tag
+    if not isinstance(tag, str):
+      raise BinaryFormatError('cannot dump element with tag {0!r}'.format(tag))
+    return self.string(tag)
+
+  def value(self, value):
+    if value is None:
+      return (VALUE_NONE, 0)
+    if value is True:
+      return (VALUE_TRUE, 0)
+    if value is False:
+      return (VALUE_FALSE, 0)
+    if isinstance(value, str):
+      return (VALUE_STR, self.string(value))
+    if isinstance(value, int):
+      return (VALUE_INT, self.string(str(value)))
+    if isinstance(value, float):
+      return (VALUE_FLOAT, self.string(repr(value)))
+    raise BinaryFormatError('cannot dump attribute {0!r}'.format(value))
+
+  def node(self, node):
+    key = id(node)
+    index = self.node_indexes.get(key)
+    if index is not None:
+      return index
+    node_type = type(node)
+    leaf = False
+    if isinstance(node, Nodes):
+      children = [self.node(child) for child in node.nodes]
+      record = [NODES, len(children)] + children
+    elif node_type is ElementWithContent:
+      attributes = self.node(node.attributes)
+      nodes = self.node(node.nodes)
+      record = [ELEMENT, self.tag(node), attributes, nodes]
+    elif node_type is BulkTable:
+      columns = node.column_attributes
+      header_rows = len(node.header[0]) if node.header else 0
+      rows = len(node.cells[0]) if node.cells else 0
+      record = [TABLE, self.node(node.attributes), len(columns), header_rows, rows]
+      record += [self.node(attributes) for attributes in columns]
+      for column in node.header + node.cells:
+        record += [self.string(cell) for cell in column]
+    else:
+      leaf = True
+      if node_type is EmptyElement:
+        record = (EMPTY, self.tag(node), self.node(node.attributes))
+      elif node_type in ATTRIBUTES_CLASSES:
+        record = [ATTRS, ATTRIBUTES_CLASSES.index(node_type), len(node.attributes)]
+        for name, value in node.attributes.items():
+          record.extend(self.value(name))
+          record.extend(self.value(value.value))
+        record = tuple(record)
+      elif node_type is Literal:
+        record = (LITERAL, self.string(node.literal))
+      elif node_type is EscapableText:
+        text = node.text
+        record = (TEXT, 0 if text is None else self.string(text) + 1)
+      else:
+        raise BinaryFormatError('cannot dump unsupported node {0}'.format(node_type.__name__))
+      index = self.leaf_indexes.get(record)
+      if index is not None:
+        self.node_indexes[key] = index
+        self.dumped.append(node)
+        return index
+    if '_shared' in node.__dict__ and record[0] in (NODES, ELEMENT):
+      record[0] |= SHARED
+    self.table.extend(record)
+    index = self.node_indexes[key] = self.record_count
+    self.record_count += 1
+    if leaf:
+      self.leaf_indexes[record] = index
+    self.dumped.append(node)
+    return index
+
+  def dumps(self, tree):
+    root = self.node(tree)
+    lengths = [len(string) for string in self.strings]
+    table = self.table
+    size = _integer_size(max(lengths + table + [0]))
+    blob = ''.join(self.strings).encode('utf-8')
+    blob += b'\0' * (-len(blob) % 4)
+    return b''.join((
+      _HEADER.pack(MAGIC, VERSION, size, len(lengths), len(blob), len(table), root),
+      _pack_integers(lengths, size),
+      blob,
+      _pack_integers(table, size)
+    ))
+
+
+def _integer_size(largest):
+  for size in (1, 2, 4):
+    if largest < 1 << (8 * size):
+      return size
+  raise BinaryFormatError('tree too large to dump')
+
+
+def _pack_integers(values, size):
+  packed = array(_TYPECODES[size], values)
+  if sys.byteorder != 'little':
+    packed.byteswap()
+  return packed.tobytes()
+
+
+def _unpack_integers(data, start, count, size):
+  values = array(_TYPECODES[size])
+  values.frombytes(data[start:start + size * count])
+  if sys.byteorder != 'little':
+    values.byteswap()
+  return values.tolist()
+
+
+def dumps(tree):
+  '''Returns `tree`, a parsed HTYAML tree, as bytes.'''
+  return _Encoder().dumps(tree)
+
+
+def _decode_value(kind, payload, strings):
+  if kind == VALUE_STR:
+    return strings[payload]
+  if kind == VALUE_NONE:
+    return None
+  if kind == VALUE_TRUE:
+    return True
+  if kind == VALUE_FALSE:
+    return False
+  if kind == VALUE_INT:
+    return int(strings[payload])
+  return float(strings[payload])
+
+
+def loads(data):
+  '''Returns the tree that `dumps` turned into `data`.'''
+  try:
+    magic, version, size, string_count, blob_size, table_size, root = _HEADER.unpack_from(data)
+  except struct.error:
+    raise BinaryFormatError('truncated HTYAML data')
+  if magic != MAGIC:
+    raise BinaryFormatError('not HTYAML binary data')
+  if version != VERSION:
+    raise BinaryFormatError('unsupported HTYAML binary version {0}'.format(version))
+  if size not in _TYPECODES:
+    raise BinaryFormatError('corrupt HTYAML data')
+
+  offset = _HEADER.size
+  lengths = _unpack_integers(data, offset, string_count, size)
+  offset += size * string_count
+  blob = bytes(data[offset:offset + blob_size]).decode('utf-8')
+  offset += blob_size
+  table = _unpack_integers(data, offset, table_size, size)
+  if len(table) != table_size:
+    raise BinaryFormatError('truncated HTYAML data')
+
+  strings = []
+  position = 0
+  for length in lengths:
+    strings.append(blob[position:position + length])
+    position += length
+
+  # Objects are built without calling __init__, which would only copy
+  # the fields into __dict__.
+  new = object.__new__
+  nodes = []
+  append = nodes.append
+  i = 0
+  try:
+    while i < table_size:
+      kind = table[i]
+      if kind == LITERAL:
+        node = new(Literal)
+        node.__dict__.update(literal = strings[table[i + 1]], yaml_node = None)
+        i += 2
+      elif kind & ~SHARED == NODES:
+        count = table[i + 1]
+        node = new(Nodes)
+        node.__dict__.update(
+          nodes = [nodes[index] for index in table[i + 2:i + 2 + count]],
+          yaml_node = None
+        )
+        if kind & SHARED:
+          node._share()
+        i += 2 + count
+      elif kind & ~SHARED == ELEMENT:
+        node = new(ElementWithContent)
+        node.__dict__.update(
+          tag = strings[table[i + 1]],
+          attributes = nodes[table[i + 2]],
+          nodes = nodes[table[i + 3]],
+          yaml_node = None
+        )
+        if kind & SHARED:
+          node._share()
+        i += 4
+      elif kind == ATTRS:
+        count = table[i + 2]
+        attributes = {}
+        j = i + 3
+        for _ in range(count):
+          value = new(AttributeValue)
+          value.__dict__.update(
+            value = _decode_value(table[j + 2], table[j + 3], strings),
+            yaml_node = None
+          )
+          attributes[_decode_value(table[j], table[j + 1], strings)] = value
+          j += 4
+        node = new(ATTRIBUTES_CLASSES[table[i + 1]])
+        node.__dict__.update(attributes = attributes, yaml_node = None)
+        i = j
+      elif kind == TEXT:
+        text = table[i + 1]
+        node = new(EscapableText)
+        node.__dict__.update(
+          text = strings[text - 1] if text else None,
+          yaml_node = None
+        )
+        i += 2
+      elif kind == EMPTY:
+        node = new(EmptyElement)
+        node.__dict__.update(
+          tag = strings[table[i + 1]],
+          attributes = nodes[table[i + 2]],
+          yaml_node = None
+        )
+        i += 3
+      elif kind == TABLE:
+        width, header_rows, rows = table[i + 2:i + 5]
+        j = i + 5 + width
+        header = []
+        for _ in range(width):
+          header.append([strings[index] for index in table[j:j + header_rows]])
+          j += header_rows
+        cells = []
+        for _ in range(width):
+          cells.append([strings[index] for index in table[j:j + rows]])
+          j += rows
+        node = new(BulkTable)
+        node.__dict__.update(
+          attributes = nodes[table[i + 1]],
+          column_attributes = [nodes[index] for index in table[i + 5:i + 5 + width]],
+          header = header,
+          cells = cells,
+          yaml_node = None
+        )
+        i = j
+      else:
+        raise BinaryFormatError('unknown node kind {0}'.format(kind))
+      append(node)
+    return nodes[root]
+  except IndexError:
+    raise BinaryFormatError('corrupt HTYAML data')
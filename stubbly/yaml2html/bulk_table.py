@@ -0,0 +1,200 @@
+'''Large tables of plain cells, written with `$table`.
+
+Written as `tr` and `td` elements, every cell of a table is parsed into
+several HTYAML objects and rendered one at a time. A `$table` keeps its
+cells as lists of strings, one list per column, and renders each column
+in one go: the cells of a column are escaped together, and wrapped in
+the column's `td` tag with a single list comprehension.
+
+The value of `$table` is either a list of rows, each a list of cells, or
+a mapping with some of:
+
+- `rows`: the list of rows;
+- `csv` or `tsv`: the name of a CSV or tab-separated file to read the
+  rows from instead, relative to the `include_dir` option and inside
+  that directory, as for `$include`;
+- `header`: a header row, or a list of header rows;
+- `header_rows`: how many of the first rows are header rows;
+- `attributes`: the attributes of the `table` element;
+- `columns`: a list of attribute mappings, one for each column, for its
+  `td` elements.
+
+Cells are text, numbers, booleans or null, and are escaped, never read
+as Markdown. Each row is rendered on one line:
+
+    >>> from stubbly.yaml2html.htyaml import Nodes
+    >>> print(Nodes.parse_yaml("""
+    ... - $table:
+    ...     attributes: {class: report}
+    ...     header: [Name, Count]
+    ...     columns: [{}, {class: number}]
+    ...     rows:
+    ...       - [Apples & pears, 3]
+    ...       - [<b>, null]
+    ... """).render())
+    <table class="report">
+      <thead>
+        <tr><th>Name</th><th>Count</th></tr>
+      </thead>
+      <tbody>
+        <tr><td>Apples &amp; pears</td><td class="number">3</td></tr>
+        <tr><td>&lt;b&gt;</td><td class="number"></td></tr>
+      </tbody>
+    </table>
+'''
+import csv
+from .htyaml import (
+  Node, NotParsed, ParseState, PotentiallyAmbiguousAttributes, Attributes,
+  _check_output_size
+)
+from .settings import escape, get_kwarg_with_default, RENDER_BLOCK
+
+_OPTIONS = ('rows', 'csv', 'tsv', 'header', 'header_rows', 'attributes', 'columns')
+
+
+def _cell(value):
+  if type(value) is bool:
+    return 'true' if value else 'false'
+  if value is None:
+    return ''
+  if isinstance(value, (str, int, float)):
+    return str(value)
+  raise ValueError('cells must be text, numbers, booleans or null')
+
+
+def _escape_column(cells):
+  '''Escapes the cells of a column with a single call to `escape`.'''
+  escaped = escape('\0'.join(cells), quote = False).split('\0')
+  if len(escaped) != len(cells):
+    # Some cell contains the separator.
+    escaped = [escape(cell, quote = False) for cell in cells]
+  return escaped
+
+
+class BulkTable(Node):
+  '''A `$table`. `header` and `cells` are lists of columns, each a list
+of strings; `column_attributes` holds an `Attributes` for each column.'''
+
+  @classmethod
+  def parse(cls, yaml_node, **kwargs):
+    [options] = yaml_node.values()
+    if type(options) is list:
+      options = {'rows': options}
+    if type(options) is not dict:
+      return cls.fail(yaml_node, '$table needs a list of rows or a mapping')
+    unknown = [name for name in options if name not in _OPTIONS]
+    if unknown:
+      return cls.fail(yaml_node, 'unknown $table option {0}'.format(unknown[0]))
+
+    sources = [name for name in ('rows', 'csv', 'tsv') if name in options]
+    if len(sources) > 1:
+      return cls.fail(yaml_node, '$table needs only one of rows, csv and tsv')
+    try:
+      if sources in (['csv'], ['tsv']):
+        rows = cls._read(sources[0], options[sources[0]], kwargs)
+      else:
+        rows = options.get('rows') or []
+        if type(rows) is not list or any(type(row) is not list for row in rows):
+          return cls.fail(yaml_node, 'rows must be a list of lists')
+      header = options.get('header') or []
+      if type(header) is not list:
+        return cls.fail(yaml_node, 'header must be a list')
+      if header and all(type(row) is not list for row in header):
+        header = [header]
+      header_rows = options.get('header_rows') or 0
+      if type(header_rows) is not int or header_rows < 0:
+        return cls.fail(yaml_node, 'header_rows must be a whole number')
+      header = header + rows[:header_rows]
+      rows = rows[header_rows:]
+      if any(type(row) is not list for row in header):
+        return cls.fail(yaml_node, 'header must be a row or a list of rows')
+      width = max([len(row) for row in header] + [len(row) for row in rows] + [0])
+      header = cls._columns(header, width)
+      cells = cls._columns(rows, width)
+    except ValueError as error:
+      return cls.fail(yaml_node, str(error))
+    except OSError as error:
+      return cls.fail(yaml_node, 'cannot read table: {0}'.format(error.strerror or error))
+
+    attributes = PotentiallyAmbiguousAttributes.parse(options.get('attributes'))
+    if isinstance(attributes, NotParsed):
+      return attributes
+    column_options = options.get('columns') or []
+    if type(column_options) is not list:
+      return cls.fail(yaml_node, 'columns must be a list of attribute mappings')
+    column_attributes = []
+    for column in column_options[:width]:
+      parsed = PotentiallyAmbiguousAttributes.parse(column)
+      if isinstance(parsed, NotParsed):
+        return parsed
+      column_attributes.append(parsed)
+    column_attributes += [Attributes.empty()] * (width - len(column_attributes))
+
+    ParseState.from_kwargs(kwargs).count(1 + len(column_attributes))
+    return cls(
+      attributes = attributes,
+      column_attributes = column_attributes,
+      header = header,
+      cells = cells,
+      yaml_node = yaml_node
+    )
+
+  @staticmethod
+  def _read(kind, path, kwargs):
+    '''Returns the rows of a CSV or TSV file, and records it as a
+dependency of the document, like a fragment.'''
+    from .fragments import file_signature, included_file
+    if not isinstance(path, str):
+      raise ValueError('{0} needs a file name'.format(kind))
+    try:
+      file_name = included_file(path, kwargs)
+    except ValueError as error:
+      raise ValueError('cannot read table {0}: {1}'.format(path, error))
+    signature = file_signature(file_name)
+    with open(file_name, encoding = 'utf-8', newline = '') as f:
+      rows = list(csv.reader(f, delimiter = '\t' if kind == 'tsv' else ','))
+    ParseState.from_kwargs(kwargs).includes[file_name] = signature
+    return rows
+
+  @staticmethod
+  def _columns(rows, width):
+    '''Turns rows into columns of strings, padding short rows.'''
+    columns = []
+    for j in range(width):
+      columns.append([_cell(row[j]) if j < len(row) else '' for row in rows])
+    return columns
+
+  def preferred_render_style(self, **kwargs):
+    return RENDER_BLOCK
+
+  def _render_rows(self, columns, tag, column_attributes, row_prefix, kwargs):
+    if not columns or not columns[0]:
+      return []
+    wrapped = []
+    for j, column in enumerate(columns):
+      open_tag = '<{0}{1}>'.format(tag, column_attributes[j].render(**kwargs) if column_attributes else '')
+      close_tag = '</{0}>'.format(tag)
+      wrapped.append([open_tag + cell + close_tag for cell in _escape_column(column)])
+    row_start = row_prefix + '<tr>'
+    return [row_start + ''.join(row) + '</tr>' for row in zip(*wrapped)]
+
+  def render(self, **kwargs):
+    minify = get_kwarg_with_default(kwargs, 'minify')
+    prefix = '' if minify else get_kwarg_with_default(kwargs, 'line_prefix')
+    inner = '' if minify else prefix + '  '
+    row_prefix = '' if minify else inner + '  '
+
+    lines = [prefix + '<table' + self.attributes.render(**kwargs) + '>']
+    if self.header and self.header[0]:
+      lines.append(inner + '<thead>')
+      lines += self._render_rows(self.header, 'th', None, row_prefix, kwargs)
+      lines.append(inner + '</thead>')
+    body = self._render_rows(self.cells, 'td', self.column_attributes, row_prefix, kwargs)
+    if body:
+      lines.append(inner + '<tbody>')
+      lines += body
+      lines.append(inner + '</tbody>')
+    else:
+      lines.append(inner + '<tbody></tbody>')
+    lines.append(prefix + '</table>')
+    return _check_output_size(('' if minify else '\n').join(lines), kwargs)
@@ -0,0 +1,177 @@
+'''Command line tool that renders HTYAML pages as HTML.
+
+Render one page to standard output:
+
+    python -m stubbly.yaml2html.cli page.yaml
+
+Render every `---`-separated page of a stream to its own file, four at a
+time:
+
+    python -m stubbly.yaml2html.cli --stream site.yaml --output-dir out --jobs 4
+
+Pages may also be written as JSON, and streams as JSON Lines, one page
+per line. By default the format is told by the file extension, `.json`
+or `.jsonl`; a single page with any other name is read as JSON if it
+starts like JSON and decodes as JSON.
+'''
+import argparse
+import os
+from json import JSONDecodeError
+import sys
+from collections import deque
+import yaml
+from .htyaml import HTYAML, PageLoader
+from .json_input import detect_format, load_json_lines
+from .parallel import render_parallel
+
+
+def render_page(yaml_node, render_kwargs, include_dir = None):
+  return HTYAML.parse(yaml_node, include_dir = include_dir).render(**render_kwargs)
+
+
+def _write_page(job):
+  yaml_node, path, render_kwargs, include_dir = job
+  html = render_page(yaml_node, render_kwargs, include_dir)
+  with open(path, 'w', encoding = 'utf-8') as f:
+    f.write(html)
+    f.write('\n')
+  return path
+
+
+def parse_source(source, file_name, source_format = 'auto', **kwargs):
+  '''Parses the page in `source`, a string or file, as 'yaml', 'json',
+or, for 'auto', the format `detect_format` gives for `file_name`.'''
+  if source_format == 'auto':
+    if hasattr(source, 'read'):
+      source = source.read()
+    source_format = detect_format(file_name, source[:64])
+    if source_format == 'json' and detect_format(file_name) == 'yaml':
+      # Told by the content rather than the name: it may be YAML that
+      # only looks like JSON.
+      try:
+        return HTYAML.parse_json(source, **kwargs)
+      except JSONDecodeError:
+        source_format = 'yaml'
+  if source_format == 'json':
+    return HTYAML.parse_json(source, **kwargs)
+  return HTYAML.parse_yaml(source, **kwargs)
+
+
+def render_stream(stream, output_dir, name_template = 'page-{index:04d}.html',
+                  jobs = 1, include_dir = None, source_format = 'yaml',
+                  **render_kwargs):
+  '''Renders each document in `stream` to its own file in `output_dir`,
+and yields the file names in document order. `$include` paths are
+relative to `include_dir`. With `source_format = 'json'` the stream is
+read as JSON Lines.
+
+Documents are read one at a time, so memory use does not depend on the
+length of the stream. With `jobs` greater than 1, pages are parsed and
+rendered by a pool of processes, with at most `2 * jobs` pages in flight.
+'''
+  if source_format == 'json':
+    documents = load_json_lines(stream)
+  else:
+    documents = yaml.load_all(stream, Loader = PageLoader)
+  page_jobs = (
+    (yaml_node, os.path.join(output_dir, name_template.format(index = index)),
+     render_kwargs, include_dir)
+    for index, yaml_node in enumerate(documents, 1)
+  )
+  if jobs <= 1:
+    for job in page_jobs:
+      yield _write_page(job)
+    return
+
+  from concurrent.futures import ProcessPoolExecutor
+  with ProcessPoolExecutor(max_workers = jobs) as executor:
+    pending = deque()
+    for job in page_jobs:
+      pending.append(executor.submit(_write_page, job))
+      if len(pending) >= 2 * jobs:
+        yield pending.popleft().result()
+    while pending:
+      yield pending.popleft().result()
+
+
+def parse_args(argv):
+  parser = argparse.ArgumentParser(
+    prog = 'htyaml',
+    description = 'Render YAML+Markdown pages as HTML.'
+  )
+  parser.add_argument('source', help = "YAML or JSON file, or '-' for standard input")
+  parser.add_argument(
+    '--format', dest = 'source_format', choices = ('auto', 'yaml', 'json'),
+    default = 'auto',
+    help = 'format of the source; JSON streams are JSON Lines (default: %(default)s)'
+  )
+  parser.add_argument(
+    '--stream', action = 'store_true',
+    help = 'render each document of a multi-document stream as its own page'
+  )
+  parser.add_argument(
+    '--output-dir',
+    help = 'directory to write pages to (required with --stream)'
+  )
+  parser.add_argument(
+    '--name', default = 'page-{index:04d}.html',
+    help = 'file name template for streamed pages (default: %(default)s)'
+  )
+  parser.add_argument(
+    '--jobs', type = int, default = 1,
+    help = 'number of processes to render streamed pages with'
+  )
+  parser.add_argument(
+    '--threads', type = int, default = 1,
+    help = 'number of threads to render a single page with, '
+           'on free-threaded Python builds'
+  )
+  parser.add_argument(
+    '--no-markdown', dest = 'markdown', action = 'store_false',
+    help = 'escape text instead of rendering it as Markdown'
+  )
+  parser.add_argument(
+    '--minify', action = 'store_true',
+    help = 'leave out indentation and newlines'
+  )
+  args = parser.parse_args(argv)
+  if args.stream and not args.output_dir:
+    parser.error('--stream requires --output-dir')
+  return args
+
+
+def main(argv = None):
+  args = parse_args(sys.argv[1:] if argv is None else argv)
+  render_kwargs = {'markdown': args.markdown}
+  if args.minify:
+    render_kwargs['minify'] = True
+
+  if args.source == '-':
+    source = sys.stdin
+    include_dir = None
+  else:
+    source = open(args.source, encoding = 'utf-8')
+    include_dir = os.path.dirname(os.path.abspath(args.source))
+  try:
+    if args.stream:
+      source_format = args.source_format
+      if source_format == 'auto':
+        source_format = detect_format(args.source)
+      os.makedirs(args.output_dir, exist_ok = True)
+      for path in render_stream(source, args.output_dir, args.name, args.jobs,
+                                include_dir, source_format, **render_kwargs):
+        print(path)
+    else:
+      page = parse_source(source, args.source, args.source_format,
+                          include_dir = include_dir)
+      if args.threads > 1:
+        print(render_parallel(page, args.threads, **render_kwargs))
+      else:
+        print(page.render(**render_kwargs))
+  finally:
+    if source is not sys.stdin:
+      source.close()
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,224 @@
+'''Custom elements, expanded into HTYAML subtrees while parsing.
+
+A `ComponentRegistry` maps tag names to components. A Python component
+is a function that returns YAML data; a YAML component is YAML source in
+which `$name` symbols stand for arguments. In a page, a component is
+used like an element. A mapping value is passed as keyword arguments,
+any other value as the `content` argument:
+
+    >>> registry = ComponentRegistry()
+    >>> registry.register('card', """
+    ... div:
+    ...   - - class: card
+    ...   - h3: $title
+    ...   - - $content
+    ... """)
+    >>> registry.register('alert', lambda content: {'p': [[{'class': 'alert'}], content]})
+    >>> from stubbly.yaml2html.htyaml import Nodes
+    >>> page = Nodes.parse_yaml("""
+    ... - card: {title: Hello, content: Some text}
+    ... - alert: Careful
+    ... """, components = registry)
+    >>> print(page.render(markdown = True))
+    <div class="card">
+      <h3>Hello</h3>
+      <p>Some text</p>
+    </div>
+    <p class="alert">Careful</p>
+
+In YAML components, `$$` writes a `$` that is not an argument: `$$5`
+is the text `$5`. Other text starting with `$`, other than `$name`, is
+plain text.
+
+Expansions are memoized by component and argument values: every use of
+a component with the same arguments shares one parsed subtree, which is
+rendered once for each set of render options. Components should
+therefore return the same data whenever they are given the same
+arguments.
+
+`component_registry` is the registry for the process, used unless the
+`components` parse option names another.
+'''
+import threading
+from collections import OrderedDict
+import yaml
+from ..yaml_tags import LoaderConfig, Symbol, EscapedDollar
+from .settings import get_kwarg_with_default
+
+
+class _MissingArgument(Exception):
+  pass
+
+
+_template_loader = None
+
+
+def _loader():
+  '''The Loader for YAML components: `$name` and `$$` only. Built on
+first use, to keep importing stubbly cheap.'''
+  global _template_loader
+  if _template_loader is None:
+    _template_loader = LoaderConfig((EscapedDollar, Symbol)).Loader
+  return _template_loader
+
+
+def _substitute(template, arguments):
+  '''Copies `template`, replacing `$name` symbols in values and list
+items by `arguments[name]`.'''
+  template_type = type(template)
+  if template_type is Symbol:
+    try:
+      return arguments[str(template)]
+    except KeyError:
+      raise _MissingArgument(str(template))
+  if template_type is EscapedDollar:
+    return str.__str__(template)
+  if template_type is list:
+    return [_substitute(item, arguments) for item in template]
+  if template_type is dict:
+    return dict(
+      (key, _substitute(value, arguments)) for key, value in template.items()
+    )
+  return template
+
+
+class YAMLComponent(object):
+  '''A component written as YAML, with `$name` symbols for arguments.'''
+
+  def __init__(self, yaml_src):
+    self.template = yaml.load(yaml_src, Loader = _loader())
+
+  def __call__(self, **arguments):
+    return _substitute(self.template, arguments)
+
+
+def _freeze(value):
+  '''A hashable key for YAML data. Types are part of the key, so that
+e.g. `Symbol('$a')` and `'a'` differ.'''
+  value_type = type(value)
+  if value_type is list:
+    return (list, tuple(_freeze(item) for item in value))
+  if value_type is dict:
+    return (dict, frozenset((_freeze(k), _freeze(v)) for k, v in value.items()))
+  hash(value)
+  return (value_type, value)
+
+
+def _argument_mismatch(function, arguments):
+  '''Returns why `function` cannot be called with `arguments` as keyword
+arguments, or None if it can, or if its signature is unknown.'''
+  # Imported on first use: inspect is slow to import.
+  import inspect
+  try:
+    signature = inspect.signature(function)
+  except (TypeError, ValueError):
+    return None
+  try:
+    signature.bind(**arguments)
+  except TypeError as error:
+    return str(error)
+  return None
+
+
+class ComponentRegistry(object):
+  '''Components by tag name, and their memoized expansions.'''
+
+  def __init__(self, max_expansions = 4096):
+    self.components = {}
+    self.max_expansions = max_expansions
+    self._expansions = OrderedDict()
+    self._lock = threading.Lock()
+    # Keys of the expansions being parsed by each thread, to catch
+    # components that expand to themselves.
+    self._expanding = threading.local()
+
+  def register(self, name, component):
+    '''Makes the tag `name` expand through `component`: a function
+returning YAML data, or YAML source for a `YAMLComponent`.'''
+    if isinstance(component, str):
+      component = YAMLComponent(component)
+    with self._lock:
+      self.components[name] = component
+      self._expansions.clear()
+
+  def unregister(self, name):
+    with self._lock:
+      del self.components[name]
+      self._expansions.clear()
+
+  def clear(self):
+    '''Forgets all memoized expansions.'''
+    with self._lock:
+      self._expansions.clear()
+
+  def expand(self, cls, yaml_node, kwargs):
+    '''Returns the parsed expansion of `yaml_node`, a single-entry
+mapping whose key is a registered tag, for `Element.parse`.'''
+    from .htyaml import Nodes, ParseState
+
+    [(name, value)] = yaml_node.items()
+    component = self.components[name]
+    if type(value) is dict:
+      arguments = dict((str(key), argument) for key, argument in value.items())
+    elif value is None:
+      arguments = {}
+    else:
+      arguments = {'content': value}
+
+    options = (
+      bool(get_kwarg_with_default(kwargs, 'lazy')),
+      get_kwarg_with_default(kwargs, 'include_dir'),
+    )
+    try:
+      key = (name, _freeze(arguments)) + options
+    except TypeError:
+      key = None
+    state = ParseState.from_kwargs(kwargs)
+    if key is not None:
+      with self._lock:
+        entry = self._expansions.get(key)
+        if entry is not None:
+          self._expansions.move_to_end(key)
+      if entry is not None:
+        tree, node_count, includes = entry
+        state.includes.update(includes)
+        state.count(node_count)
+        return tree
+
+    expanding = self._expanding.__dict__.setdefault('keys', [])
+    # Arguments that cannot be hashed are compared by equality instead.
+    guard = key if key is not None else (name, arguments) + options
+    if guard in expanding:
+      return cls.fail(yaml_node, 'component {0} expands to itself'.format(name))
+    expanding.append(guard)
+    try:
+      if not isinstance(component, YAMLComponent):
+        mismatch = _argument_mismatch(component, arguments)
+        if mismatch is not None:
+          return cls.fail(yaml_node, 'component {0}: {1}'.format(name, mismatch))
+      try:
+        expansion = component(**arguments)
+      except _MissingArgument as error:
+        return cls.fail(yaml_node, 'component {0} needs argument {1}'.format(
+          name, error.args[0]
+        ))
+      expansion_state = ParseState(get_kwarg_with_default(kwargs, 'max_nodes'))
+      parse_kwargs = dict(kwargs, parse_state = expansion_state)
+      tree = Nodes.parse(expansion, **parse_kwargs)
+    finally:
+      expanding.pop()
+
+    state.includes.update(expansion_state.includes)
+    state.count(expansion_state.node_count)
+    if key is not None:
+      tree._share()
+      with self._lock:
+        self._expansions[key] = (
+          tree, expansion_state.node_count, expansion_state.includes
+        )
+        while len(self._expansions) > self.max_expansions:
+          self._expansions.popitem(last = False)
+    return tree
+
+
+component_registry = ComponentRegistry()
@@ -0,0 +1,232 @@
+'''Builds ElementTree documents straight from HTYAML trees.
+
+Steps that work on a DOM, such as rewriting links or sanitizing, would
+otherwise parse the output of `render` back into a tree. `to_etree`
+builds the tree directly from the elements and attributes of the HTYAML
+tree. Only text that holds HTML, namely Markdown output and literals
+containing markup, is parsed, as a fragment in place:
+
+    >>> from xml.etree import ElementTree
+    >>> from stubbly.yaml2html.htyaml import Nodes
+    >>> page = Nodes.parse_yaml("""
+    ... - div:
+    ...   - - class: intro
+    ...   - - Some *text*
+    ...   - p: [see, {a: [[href: /more], more]}]
+    ... """)
+    >>> root = to_etree(page, markdown = True, lxml = False)
+    >>> root.find('p/a').get('href')
+    '/more'
+    >>> ElementTree.tostring(root, encoding = 'unicode', method = 'html')
+    '<div class="intro"><p>Some <em>text</em></p><p>see <a href="/more">more</a></p></div>'
+
+A tree of a single element, possibly after a doctype, becomes that
+element; any other tree is put in a `wrapper` element, `div` by default.
+Whitespace is as in `render(minify = True)`: a space between neighbouring
+inline nodes. Comments and declarations in literals are dropped.
+
+The tree is built with lxml, as `lxml.html` elements, when lxml is
+installed, and with `xml.etree.ElementTree` otherwise; pass `lxml = True`
+or `lxml = False` to choose.
+'''
+import re
+from html.parser import HTMLParser
+from .htyaml import (
+  NotParsed, ParseError, Literal, EscapableText, EmptyElement,
+  ElementWithContent, Nodes
+)
+from .bulk_table import BulkTable
+from .settings import get_kwarg_with_default, RENDER_BLOCK
+
+_DOCTYPE = re.compile(r'^\s*<!doctype[^>]*>\s*$', re.IGNORECASE)
+
+# Elements that never have an end tag.
+VOID_ELEMENTS = frozenset((
+  'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+  'meta', 'param', 'source', 'track', 'wbr'
+))
+
+
+def _attribute_text(value):
+  '''The value of an attribute, as `AttributeValue.render` writes it,
+before escaping.'''
+  if value is None:
+    return ''
+  if type(value) is bool:
+    return 'true' if value else 'false'
+  return str(value)
+
+
+def _attributes(attributes):
+  return dict(
+    (str(name), _attribute_text(value.value))
+    for name, value in sorted(attributes.attributes.items(), key = lambda item: item[0])
+  )
+
+
+def _append_text(parent, text):
+  '''Adds `text` after the last child of `parent`.'''
+  if not text:
+    return
+  if len(parent):
+    last = parent[-1]
+    last.tail = (last.tail or '') + text
+  else:
+    parent.text = (parent.text or '') + text
+
+
+class _FragmentParser(HTMLParser):
+  '''Adds the nodes of an HTML fragment to an ElementTree element.
+Unclosed elements are closed at the end of the fragment.'''
+
+  def __init__(self, parent, sub_element):
+    super(_FragmentParser, self).__init__(convert_charrefs = True)
+    self.stack = [parent]
+    self.sub_element = sub_element
+
+  def handle_starttag(self, tag, attrs):
+    element = self.sub_element(self.stack[-1], tag, dict(
+      (name, value or '') for name, value in attrs
+    ))
+    if tag not in VOID_ELEMENTS:
+      self.stack.append(element)
+
+  def handle_startendtag(self, tag, attrs):
+    self.sub_element(self.stack[-1], tag, dict(
+      (name, value or '') for name, value in attrs
+    ))
+
+  def handle_endtag(self, tag):
+    for depth in range(len(self.stack) - 1, 0, -1):
+      if self.stack[depth].tag == tag:
+        del self.stack[depth:]
+        return
+
+  def handle_data(self, data):
+    _append_text(self.stack[-1], data)
+
+
+class _ElementTreeBuilder(object):
+
+  def __init__(self):
+    from xml.etree import ElementTree
+    self.element = ElementTree.Element
+    self.sub_element = ElementTree.SubElement
+
+  def append_html(self, parent, html):
+    parser = _FragmentParser(parent, self.sub_element)
+    parser.feed(html)
+    parser.close()
+
+
+class _LxmlBuilder(object):
+
+  def __init__(self):
+    import lxml.etree
+    import lxml.html
+    self.element = lxml.html.Element
+    self.sub_element = lxml.etree.SubElement
+    self.fragments_fromstring = lxml.html.fragments_fromstring
+
+  def append_html(self, parent, html):
+    if not html.strip():
+      _append_text(parent, html)
+      return
+    for fragment in self.fragments_fromstring(html):
+      if isinstance(fragment, str):
+        _append_text(parent, fragment)
+      else:
+        parent.append(fragment)
+
+
+def _builder(lxml):
+  if lxml is None:
+    try:
+      return _LxmlBuilder()
+    except ImportError:
+      return _ElementTreeBuilder()
+  return _LxmlBuilder() if lxml else _ElementTreeBuilder()
+
+
+class _TreeBuilder(object):
+
+  def __init__(self, builder, kwargs):
+    self.builder = builder
+    self.kwargs = kwargs
+    self.markdown = get_kwarg_with_default(kwargs, 'markdown')
+    self.markdown_kwargs = dict(kwargs, minify = True, line_prefix = '')
+
+  def append(self, parent, node):
+    '''Adds `node` to the end of `parent`.'''
+    node_type = type(node)
+    if isinstance(node, Nodes):
+      self.append_nodes(parent, node)
+    elif node_type is ElementWithContent:
+      element = self.builder.sub_element(parent, node.tag, _attributes(node.attributes))
+      self.append_nodes(element, node.nodes)
+    elif node_type is EmptyElement:
+      self.builder.sub_element(parent, node.tag, _attributes(node.attributes))
+    elif node_type is Literal:
+      literal = node.literal
+      if '<' in literal or '&' in literal:
+        if not _DOCTYPE.match(literal):
+          self.builder.append_html(parent, literal)
+      else:
+        _append_text(parent, literal)
+    elif node_type is EscapableText:
+      if node.text is None:
+        pass
+      elif self.markdown:
+        self.builder.append_html(parent, node.render(**self.markdown_kwargs))
+      else:
+        _append_text(parent, node.text)
+    elif isinstance(node, NotParsed):
+      raise ParseError(node)
+    elif isinstance(node, BulkTable):
+      self.append_table(parent, node)
+    else:
+      raise TypeError('cannot convert {0} to an element'.format(node_type.__name__))
+
+  def append_nodes(self, parent, nodes):
+    kwargs = self.kwargs
+    previous_inline = False
+    for node in nodes:
+      inline = node.preferred_render_style(**kwargs) != RENDER_BLOCK
+      if inline and previous_inline:
+        _append_text(parent, ' ')
+      self.append(parent, node)
+      previous_inline = inline
+
+  def append_table(self, parent, table):
+    '''Adds a `BulkTable`, cell by cell.'''
+    sub_element = self.builder.sub_element
+    element = sub_element(parent, 'table', _attributes(table.attributes))
+    if table.header and table.header[0]:
+      thead = sub_element(element, 'thead', {})
+      for row in zip(*table.header):
+        tr = sub_element(thead, 'tr', {})
+        for cell in row:
+          sub_element(tr, 'th', {}).text = cell
+    tbody = sub_element(element, 'tbody', {})
+    column_attributes = [_attributes(column) for column in table.column_attributes]
+    for row in zip(*table.cells):
+      tr = sub_element(tbody, 'tr', {})
+      for cell, attributes in zip(row, column_attributes):
+        sub_element(tr, 'td', attributes).text = cell
+
+
+def to_etree(tree, wrapper = 'div', lxml = None, **kwargs):
+  '''Returns the element built from `tree`, a parsed HTYAML tree. Takes
+the render options that affect content, such as `markdown`.
+
+Raises `ParseError` if `tree` contains a `NotParsed`.'''
+  builder = _builder(lxml)
+  tree_builder = _TreeBuilder(builder, kwargs)
+  root = builder.element(wrapper, {})
+  tree_builder.append(root, tree)
+  if len(root) == 1 and not (root.text or '').strip() and not (root[0].tail or '').strip():
+    element = root[0]
+    root.remove(element)
+    element.tail = None
+    return element
+  return root
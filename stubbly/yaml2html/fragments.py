@@ -0,0 +1,187 @@
+'''Shared YAML fragments, included into pages with `$include`.
+
+    - $include: header.yaml
+    - p: Page content
+    - $include: footer.yaml
+
+is parsed as if the nodes of `header.yaml` and `footer.yaml` were written
+out in the page. Paths are relative to the `include_dir` parse option,
+which the command line tool and `HTYAMLApp` set to the directory of the
+including file; fragments may include other fragments, relative to their
+own directory. Included files must be inside that directory: absolute
+paths, and paths that leave it through `..` or a symbolic link, are
+parse errors, so a page served by `HTYAMLApp` cannot include files from
+elsewhere on the server. The same goes for the CSV and TSV files of
+`$table`.
+
+A `FragmentCache` parses each fragment once, into an immutable subtree
+that every page including it shares, and that is rendered once for each
+set of render options. Fragments are parsed again when their file, or a
+fragment they include, changes. `fragment_cache` is the cache for the
+process, used unless the `fragment_cache` option names another.
+
+`parse_file` records which fragments each page includes, directly or not,
+so `dependents` can tell which pages to rebuild when a fragment changes.
+'''
+import os
+import threading
+import yaml
+from .htyaml import HTYAML, ParseState, load_page
+from .settings import get_kwarg_with_default
+
+
+def file_signature(file_name):
+  '''Changes whenever the file is written to or replaced.'''
+  st = os.stat(file_name)
+  return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class CachedFragment(object):
+  '''A parsed fragment. `dependencies` maps the file name of the fragment
+and of every fragment it includes to its `file_signature` when parsed.'''
+
+  def __init__(self, tree, node_count, dependencies):
+    self.tree = tree
+    self.node_count = node_count
+    self.dependencies = dependencies
+
+  def is_current(self):
+    try:
+      return all(
+        file_signature(file_name) == signature
+        for file_name, signature in self.dependencies.items()
+      )
+    except OSError:
+      return False
+
+
+class FragmentCache(object):
+  '''Parsed fragments by file name, and the fragments each page uses.'''
+
+  def __init__(self):
+    self._fragments = {}
+    self._lock = threading.Lock()
+    # File names of the fragments being parsed by each thread, to catch
+    # fragments that include themselves.
+    self._parsing = threading.local()
+    self.dependencies = {}
+
+  def get(self, file_name, **kwargs):
+    '''Returns the `CachedFragment` for `file_name`, an absolute path,
+parsing it if it is not cached or has changed. Fragments are parsed
+with the `lazy` and `components` options of the page, and cached
+separately for each.
+
+Raises `OSError` if the file cannot be read.'''
+    lazy = bool(get_kwarg_with_default(kwargs, 'lazy'))
+    components = get_kwarg_with_default(kwargs, 'components')
+    key = (file_name, lazy, components)
+    fragment = self._fragments.get(key)
+    if fragment is not None and fragment.is_current():
+      return fragment
+
+    parsing = self._parsing.__dict__.setdefault('file_names', [])
+    if file_name in parsing:
+      return CachedFragment(
+        HTYAML.fail(file_name, 'fragment includes itself'), 0, {}
+      )
+    parsing.append(file_name)
+    try:
+      signature = file_signature(file_name)
+      with open(file_name, encoding = 'utf-8') as f:
+        source = f.read()
+      yaml_node, anchored = load_page(source)
+      state = ParseState(get_kwarg_with_default(kwargs, 'max_nodes'), anchored)
+      tree = HTYAML.parse(
+        yaml_node,
+        lazy = lazy,
+        components = components,
+        parse_state = state,
+        fragment_cache = self,
+        include_dir = os.path.dirname(file_name)
+      )
+    finally:
+      parsing.pop()
+
+    tree._share()
+    dependencies = dict(state.includes)
+    dependencies[file_name] = signature
+    fragment = CachedFragment(tree, state.node_count, dependencies)
+    with self._lock:
+      self._fragments[key] = fragment
+    return fragment
+
+  def parse_file(self, file_name, source = None, **kwargs):
+    '''Parses the page in `file_name`, or `source` if given, and records
+the fragments it includes. Returns the parsed page.'''
+    file_name = os.path.abspath(file_name)
+    if source is None:
+      with open(file_name, encoding = 'utf-8') as f:
+        source = f.read()
+    kwargs.setdefault('include_dir', os.path.dirname(file_name))
+    kwargs['fragment_cache'] = self
+    yaml_node, anchored = load_page(source)
+    state = kwargs['parse_state'] = ParseState(
+      get_kwarg_with_default(kwargs, 'max_nodes'), anchored
+    )
+    tree = HTYAML.parse(yaml_node, **kwargs)
+    with self._lock:
+      self.dependencies[file_name] = frozenset(state.includes)
+    return tree
+
+  def dependents(self, file_name):
+    '''Returns the sorted file names of the pages parsed by `parse_file`
+that include `file_name`, directly or through other fragments.'''
+    file_name = os.path.abspath(file_name)
+    with self._lock:
+      return sorted(
+        page for page, includes in self.dependencies.items()
+        if file_name in includes
+      )
+
+  def clear(self):
+    with self._lock:
+      self._fragments.clear()
+      self.dependencies.clear()
+
+
+fragment_cache = FragmentCache()
+
+
+def included_file(path, kwargs):
+  '''Returns the absolute file name of `path`, relative to the
+`include_dir` option, for `$include` and the files of `$table`.
+
+Raises `ValueError` if the file is outside `include_dir`.'''
+  include_dir = os.path.abspath(get_kwarg_with_default(kwargs, 'include_dir') or '')
+  file_name = os.path.abspath(os.path.join(include_dir, path))
+  real_dir = os.path.realpath(include_dir)
+  if os.path.isabs(path) or os.path.commonpath(
+      [real_dir, os.path.realpath(file_name)]) != real_dir:
+    raise ValueError('outside {0}'.format(include_dir))
+  return file_name
+
+
+def parse_include(cls, yaml_node, kwargs):
+  '''Returns the subtree of the fragment named by `yaml_node`, a
+`{$include: path}` mapping, for `Node.parse`.'''
+  [path] = yaml_node.values()
+  if not isinstance(path, str):
+    return cls.fail(yaml_node, '$include needs a file name')
+  try:
+    file_name = included_file(path, kwargs)
+  except ValueError as error:
+    return cls.fail(yaml_node, 'cannot include {0}: {1}'.format(path, error))
+  cache = get_kwarg_with_default(kwargs, 'fragment_cache') or fragment_cache
+  try:
+    fragment = cache.get(file_name, **kwargs)
+  except OSError as error:
+    return cls.fail(yaml_node, 'cannot include {0}: {1}'.format(
+      path, error.strerror or error
+    ))
+  except yaml.YAMLError as error:
+    return cls.fail(yaml_node, 'cannot include {0}: {1}'.format(path, error))
+  state = ParseState.from_kwargs(kwargs)
+  state.includes.update(fragment.dependencies)
+  state.count(fragment.node_count)
+  return fragment.tree
@@ -1,7 +1,46 @@
 #!/usr/bin/env python
-import yaml
-import markdown2
+from ..yaml_tags import LoaderConfig, Include, Table
+from ..dumper import dump
 from .settings import *
+from .index import ElementIndex, ANY
+from .components import component_registry
+
+
+class PageLoader(LoaderConfig((Include, Table)).Loader):
+  '''Loads pages with the `$include` and `$table` tags only: any other
+text starting with `$` is text, as it is for `yaml.Loader`.
+
+`anchor_names` are the anchors the last document composed defines, and
+`anchored` tells whether there are any. Without anchors there are no
+aliases, so no list or dict appears twice in the document.
+'''
+  anchor_names = ()
+
+  def compose_document(self):
+    # The composer collects the anchors of a document in `anchors`, and
+    # replaces it with a new dict when the document ends.
+    anchors = self.anchors
+    node = super(PageLoader, self).compose_document()
+    self.anchor_names = tuple(anchors)
+    return node
+
+  @property
+  def anchored(self):
+    return bool(self.anchor_names)
+
+
+def load_page(yaml_src):
+  '''Returns the first document in `yaml_src`, loaded with `PageLoader`,
+and whether it defines any anchors.
+
+    >>> load_page('[&a {p: x}, *a]')
+    ([{'p': 'x'}, {'p': 'x'}], True)
+'''
+  loader = PageLoader(yaml_src)
+  try:
+    return loader.get_single_data(), loader.anchored
+  finally:
+    loader.dispose()
 
 
 class HTYAML(object):
@@ -35,14 +74,49 @@ Two HTYAML objects are equal if the types and contents are equal:
     ))
 
   @classmethod
-  def parse(cls, obj):
-    '''Parse the object as a list of nodes.'''
-    return Nodes.parse(obj)
+  def parse(cls, obj, **kwargs):
+    '''Parse the object as a list of nodes.
+
+With `lazy = True` the children of each element are only parsed when
+they are first needed. See `LazyNodes`.
+'''
+    return Nodes.parse(obj, **kwargs)
 
   @classmethod
   def parse_yaml(cls, yaml_src, **kwargs):
-    '''Parse the object returned by yaml.load(yaml_src).'''
-    return cls.parse(yaml.load(yaml_src), **kwargs)
+    '''Parse the object returned by yaml.load(yaml_src, Loader = PageLoader).'''
+    yaml_node, anchored = load_page(yaml_src)
+    ParseState.from_kwargs(kwargs, aliases = anchored)
+    return cls.parse(yaml_node, **kwargs)
+
+  @classmethod
+  def parse_json(cls, json_src, **kwargs):
+    '''Parse the object decoded from the JSON in `json_src`, with `$`
+strings resolved as in YAML; see `stubbly.yaml2html.json_input`.
+
+    >>> HTYAML.parse_json('[{"p": ["one", {"b": "two"}]}]').render()
+    '<p>one <b>two</b></p>'
+'''
+    from .json_input import load_json
+    return cls.parse(load_json(json_src), **kwargs)
+
+  @classmethod
+  def parse_yaml_all(cls, yaml_src, **kwargs):
+    '''Generates the parsed documents of a multi-document stream.
+Documents are read, parsed and yielded one at a time.
+
+    >>> [page.render() for page in HTYAML.parse_yaml_all('p: one\\n---\\np: two')]
+    ['<p>one</p>', '<p>two</p>']
+'''
+    loader = PageLoader(yaml_src)
+    try:
+      while loader.check_data():
+        yaml_node = loader.get_data()
+        document_kwargs = dict(kwargs)
+        ParseState.from_kwargs(document_kwargs, aliases = loader.anchored)
+        yield cls.parse(yaml_node, **document_kwargs)
+    finally:
+      loader.dispose()
 
   @classmethod
   def fail(cls, yaml_node, message):
@@ -64,6 +138,18 @@ Two HTYAML objects are equal if the types and contents are equal:
   def preferred_render_style(self, **kwargs):
     self._not_implemented('preferred_render_style')
 
+  def to_etree(self, **kwargs):
+    '''Returns this tree as an ElementTree element, built without
+rendering it; see `stubbly.yaml2html.etree`.'''
+    from .etree import to_etree
+    return to_etree(self, **kwargs)
+
+  def to_text(self, **kwargs):
+    '''Returns the visible text of this tree, without rendering it;
+see `stubbly.yaml2html.plain_text`.'''
+    from .plain_text import to_text
+    return to_text(self, **kwargs)
+
   def __init__(self, **kwargs):
     self.__dict__.update(kwargs)
 
@@ -73,6 +159,18 @@ Two HTYAML objects are equal if the types and contents are equal:
     ))
 
 
+  def _public_dict(self):
+    '''Attributes whose names start with an underscore hold private state,
+such as caches, and are left out of comparisons and representations.
+
+    >>> HTYAML(foo = 1, _cache = 2)
+    HTYAML(foo = 1)
+'''
+    return dict(
+      (name, value) for name, value in self.__dict__.items()
+      if not name.startswith('_')
+    )
+
   def __repr__(self):
     '''To ensure predictable output in unit tests,
 the list of constructors is sorted in rendering.
@@ -81,7 +179,7 @@ the list of constructors is sorted in rendering.
     HTYAML(a = 'a', b = 'b', c = 'c', d = 'd')
 '''
     class_name = self.__class__.__name__
-    item_list = list(self.__dict__.items())
+    item_list = list(self._public_dict().items())
     item_list.sort()
     items = ', '.join('%s = %s' % (name, repr(value)) for name, value in item_list)
     return '{class_name}({items})'.format(
@@ -90,11 +188,116 @@ the list of constructors is sorted in rendering.
     )
 
   def __eq__(self, other):
-    return type(self) == type(other) and self.__dict__ == other.__dict__
+    return (
+      type(self) == type(other) and
+      self._public_dict() == other._public_dict()
+    )
 
   def __ne__(self, other):
     return not (self == other)
 
+  def _share(self):
+    '''Marks a node that appears at several places in the tree, through
+YAML aliases, or in several trees, such as an included fragment, so that
+it is rendered with `_render_once`.'''
+    self.__dict__['_shared'] = True
+
+  def _render_once(self, kwargs):
+    '''Renders a node that appears at several places in the tree,
+through YAML aliases, only once for each set of render options.'''
+    key = repr(sorted(kwargs.items()))
+    renders = self.__dict__.setdefault('_renders', {})
+    try:
+      return renders[key]
+    except KeyError:
+      result = renders[key] = self._render(kwargs)
+      return result
+
+
+
+class LimitExceeded(ValueError):
+  '''Raised when a document expands to more nodes than `max_nodes`,
+or renders to more characters than `max_output_size`.'''
+
+
+class ParseState(object):
+  '''Shared by all the `parse` calls for one document.
+
+YAML anchors and aliases make several places in the document refer to
+the same Python object. `memo` maps the identity of each list and dict
+that has been parsed to its result, so an aliased subtree is parsed once
+and becomes a single shared HTYAML node. For a document known to have no
+aliases, `aliases = False`, `memo` is None and nothing is memoized.
+`node_count` counts nodes as if the aliases were expanded, and parsing
+stops with `LimitExceeded` once it passes `max_nodes`. `includes` maps
+the file name of each fragment included with `$include` to its file
+signature.
+'''
+
+  _in_progress = object()
+
+  def __init__(self, max_nodes = None, aliases = True):
+    self.memo = {} if aliases else None
+    self.node_count = 0
+    self.max_nodes = max_nodes
+    self.includes = {}
+
+  @classmethod
+  def from_kwargs(cls, kwargs, aliases = True):
+    state = kwargs.get('parse_state')
+    if state is None:
+      state = kwargs['parse_state'] = cls(
+        get_kwarg_with_default(kwargs, 'max_nodes'), aliases
+      )
+    return state
+
+  def count(self, nodes):
+    self.node_count += nodes
+    if self.max_nodes is not None and self.node_count > self.max_nodes:
+      raise LimitExceeded(
+        'document expands to more than {0} nodes'.format(self.max_nodes)
+      )
+
+  def start(self, key):
+    '''Marks `key` as being parsed. Returns the node count so far.'''
+    self.memo[key] = self._in_progress
+    return self.node_count
+
+  def finish(self, key, yaml_node, result, start):
+    self.memo[key] = (yaml_node, result, self.node_count - start)
+    return result
+
+  def reuse(self, cls, yaml_node, entry):
+    if entry is self._in_progress:
+      return cls.fail(yaml_node, 'contains itself')
+    yaml_node, result, size = entry
+    self.count(size)
+    result._share()
+    return result
+
+
+def _render_child(node, kwargs):
+  '''How `Nodes` and `ElementWithContent` render their children, unless
+told otherwise; see `stubbly.yaml2html.parallel`.'''
+  return node.render(**kwargs)
+
+
+def _check_output_size(result, kwargs):
+  limit = get_kwarg_with_default(kwargs, 'max_output_size')
+  if limit is not None and len(result) > limit:
+    raise LimitExceeded(
+      'rendered output is longer than {0} characters'.format(limit)
+    )
+  return result
+
+
+class ParseError(ValueError):
+  '''Raised when a lazily parsed subtree turns out not to be valid.
+The `NotParsed` object describing the failure is in `not_parsed`.
+'''
+  def __init__(self, not_parsed):
+    super(ParseError, self).__init__(not_parsed.message)
+    self.not_parsed = not_parsed
 
 
 class NotParsed(HTYAML):
@@ -103,12 +306,16 @@ class NotParsed(HTYAML):
     '{yaml_node}\n'
     '{message}'
   )
-  def render(self):
+  def render(self, **kwargs):
       return self._render_template.format(
-        yaml_node = yaml.dump(self.yaml_node, default_flow_style = False),
+        yaml_node = dump(self.yaml_node, default_flow_style = False),
         message = self.message
       )
 
+  def _share(self):
+    # Failures are reported rather than rendered as part of a tree.
+    pass
+
 
 
 class Node(HTYAML):
@@ -121,15 +328,52 @@ which should implement the `render` method.
 
     >>> Node.parse_yaml('hr:').render()
     '<hr>'
+
+A single-entry mapping whose key is `$include` is replaced by the nodes
+of a fragment (see `stubbly.yaml2html.fragments`), one whose key is
+`$table` is a `BulkTable` (see `stubbly.yaml2html.bulk_table`), and one
+whose key is the tag of a registered component by the component's
+expansion (see `stubbly.yaml2html.components`).
 '''
   
   @classmethod
-  def parse(cls, yaml_node):
-    result = Text.parse(yaml_node)
-    if isinstance(result, NotParsed):
-      result = Element.parse(yaml_node)
+  def parse(cls, yaml_node, **kwargs):
+    return cls._parse(yaml_node, kwargs, ParseState.from_kwargs(kwargs))
+
+  @classmethod
+  def _parse(cls, yaml_node, kwargs, state):
+    # Children are parsed with the same `kwargs` and `state`, rather than
+    # with a copy of `kwargs` for each call.
+    key = None
+    if state.memo is not None and type(yaml_node) in (list, dict):
+      key = (Node, id(yaml_node))
+      entry = state.memo.get(key)
+      if entry is not None:
+        return state.reuse(cls, yaml_node, entry)
+      start = state.start(key)
+    state.count(1)
+
+    first = None
+    if type(yaml_node) is dict and len(yaml_node) == 1:
+      first = next(iter(yaml_node))
+      registry = get_kwarg_with_default(kwargs, 'components') or component_registry
+    if type(first) is Include:
+      from .fragments import parse_include
+      result = parse_include(cls, yaml_node, kwargs)
+    elif type(first) is Table:
+      from .bulk_table import BulkTable
+      result = BulkTable.parse(yaml_node, **kwargs)
+    elif first is not None and first in registry.components:
+      result = registry.expand(cls, yaml_node, kwargs)
+    else:
+      result = Text.parse(yaml_node)
       if isinstance(result, NotParsed):
-        result = cls.fail(yaml_node, 'not a valid HTML node')
+        result = Element._parse(yaml_node, kwargs, state)
+        if isinstance(result, NotParsed):
+          result = cls.fail(yaml_node, 'not a valid HTML node')
+
+    if key is not None:
+      state.finish(key, yaml_node, result, start)
     return result
 
   @staticmethod
@@ -162,7 +406,7 @@ which should implement the `render` method.
   
 
   @classmethod
-  def parse(cls, yaml_node):
+  def parse(cls, yaml_node, **kwargs):
     result = Literal.parse(yaml_node)
     if isinstance(result, NotParsed):
       result = EscapableText.parse(yaml_node)
@@ -186,7 +430,7 @@ e.g.:
 '''
 
   @classmethod
-  def parse(cls, yaml_node):
+  def parse(cls, yaml_node, **kwargs):
 
     if type(yaml_node) is not str:
       return cls.fail(yaml_node, 'not text')
@@ -194,6 +438,8 @@ e.g.:
     return cls(literal = yaml_node, yaml_node = yaml_node)
 
   def render(self, **kwargs):
+    if get_kwarg_with_default(kwargs, 'minify'):
+      return self.literal
     return self._add_prefix(self.literal, kwargs)
 
   def preferred_render_style(self, **kwargs):
@@ -242,7 +488,7 @@ renderer. Specify Markdown2 extra features with the `markdown_extras` argument:
 '''
 
   @classmethod
-  def parse(cls, yaml_node):
+  def parse(cls, yaml_node, **kwargs):
     if type(yaml_node) is not list or len (yaml_node) is not 1:
       return cls.fail(yaml_node, 'not a singleton list')
     text = yaml_node[0]
@@ -259,13 +505,17 @@ renderer. Specify Markdown2 extra features with the `markdown_extras` argument:
 
     markdown = get_kwarg_with_default(kwargs, 'markdown')
     if markdown:
+      # Imported here, as it takes longer to import than the rest of
+      # stubbly, and many runs never render markdown.
+      import markdown2
       extras = get_kwarg_with_default(kwargs, 'markdown_extras')
       result = markdown2.markdown(result, extras = extras)
       result = result[:-1] # remove the trailing newline
     else:
       result = escape(result, quote = False)
 
-    line_prefix = get_kwarg_with_default(kwargs, 'line_prefix')
+    if get_kwarg_with_default(kwargs, 'minify'):
+      return result
     return self._add_prefix(result, kwargs)
 
   def preferred_render_style(self, **kwargs):
@@ -319,7 +569,7 @@ Ampersands, quotes, and so on are escaped.
     for name, value in d.items():
       converted = AttributeValue.parse(value)
       if isinstance(converted, NotParsed):
-        return parsed_value
+        return converted
       result[name] = converted
     return result
 
@@ -375,7 +625,7 @@ Quotes, ampersands, and so on are escaped:
 '''
 
     @classmethod
-    def parse(cls, yaml_node):
+    def parse(cls, yaml_node, **kwargs):
       if yaml_node is not None and type(yaml_node) not in (str, int, bool, float):
         return cls.fail(yaml_node, 'must be text, a number, a bool, or null')
       return cls(value = yaml_node, yaml_node = yaml_node)
@@ -409,12 +659,14 @@ Nulls are treated as empty attribute lists:
 """
   
   @classmethod
-  def parse(cls, yaml_node):
+  def parse(cls, yaml_node, **kwargs):
     if yaml_node is None:
       return cls(attributes = {}, yaml_node = None)
     if type(yaml_node) is not dict:
       return cls.fail(yaml_node, 'not a dict or null')
     attributes = cls._convert_dict_entries_to_attribute_values(yaml_node)
+    if isinstance(attributes, NotParsed):
+      return attributes
     return cls(
       attributes = attributes,
       yaml_node = yaml_node
@@ -432,7 +684,7 @@ To avoid confusion, the attribute list must be multiple, or wrapped in a list.
 """
 
   @classmethod
-  def parse(cls, yaml_node):
+  def parse(cls, yaml_node, **kwargs):
     if yaml_node in [None, {}, [], [None], [{}]]:
       return cls.empty(yaml_node = yaml_node)
 
@@ -460,6 +712,8 @@ To avoid confusion, the attribute list must be multiple, or wrapped in a list.
       )
 
     attributes = cls._convert_dict_entries_to_attribute_values(node)
+    if isinstance(attributes, NotParsed):
+      return attributes
     return cls(attributes = attributes, yaml_node = yaml_node)
 
 
@@ -488,10 +742,14 @@ A self-closing element can only contain a dict or null.
     '<hr width="75%">'
 '''
   @classmethod
-  def parse(cls, yaml_node):
+  def parse(cls, yaml_node, **kwargs):
+    return cls._parse(yaml_node, kwargs, ParseState.from_kwargs(kwargs))
+
+  @classmethod
+  def _parse(cls, yaml_node, kwargs, state):
     element = EmptyElement.parse(yaml_node)
     if isinstance(element, NotParsed):
-      element = ElementWithContent.parse(yaml_node)
+      element = ElementWithContent._parse(yaml_node, kwargs, state)
       if isinstance(element, NotParsed):
         return cls.fail(
           yaml_node,
@@ -515,7 +773,7 @@ class EmptyElement(Element):
 """
 
   @classmethod
-  def parse(cls, yaml_node):
+  def parse(cls, yaml_node, **kwargs):
     if type(yaml_node) is not dict or len(yaml_node) is not 1:
       return cls.fail(yaml_node, 'not a dict containing 1 entry')
     tag, attributes_dict = yaml_node.copy().popitem()
@@ -526,6 +784,8 @@ class EmptyElement(Element):
 
   _render_template = '{line_prefix}<{tag}{attributes}>'
   def render(self, **kwargs):
+    if get_kwarg_with_default(kwargs, 'minify'):
+      return '<' + self.tag + self.attributes.render(**kwargs) + '>'
     return self._render_template.format(
       tag = self.tag,
       attributes = self.attributes.render(**kwargs),
@@ -559,7 +819,11 @@ or a list containing an attribute dict and child nodes.
 """
   
   @classmethod
-  def parse(cls, yaml_node):
+  def parse(cls, yaml_node, **kwargs):
+    return cls._parse(yaml_node, kwargs, ParseState.from_kwargs(kwargs))
+
+  @classmethod
+  def _parse(cls, yaml_node, kwargs, state):
 
     if type(yaml_node) is not dict or len(yaml_node) is not 1:
       return cls.fail(yaml_node, 'not a dict containing 1 entry')
@@ -585,7 +849,15 @@ or a list containing an attribute dict and child nodes.
     else:
       attributes = Attributes.empty()
 
-    parsed_content = Nodes.parse(content)
+    if get_kwarg_with_default(kwargs, 'lazy'):
+      return cls(
+        tag = tag,
+        attributes = attributes,
+        nodes = LazyNodes(yaml_node = content, _parse_kwargs = kwargs),
+        yaml_node = yaml_node
+      )
+
+    parsed_content = Nodes._parse(content, kwargs, state)
 
     if isinstance(parsed_content, NotParsed):
       return parsed_content
@@ -610,23 +882,36 @@ or a list containing an attribute dict and child nodes.
     '{line_prefix}</{tag}>'
   )
   def render(self, **kwargs):
+    if '_shared' in self.__dict__:
+      return self._render_once(kwargs)
+    return self._render(kwargs)
+
+  def _render(self, kwargs, render_child = _render_child):
+
+    if get_kwarg_with_default(kwargs, 'minify'):
+      tag = self.tag
+      return _check_output_size(''.join((
+        '<', tag, self.attributes.render(**kwargs), '>',
+        render_child(self.nodes, kwargs),
+        '</', tag, '>'
+      )), kwargs)
 
     line_prefix = get_kwarg_with_default(kwargs, 'line_prefix')
     tag = self.tag
     attributes = self.attributes.render(**kwargs)
     kwargs['line_prefix'] = line_prefix + '  '
     nodes = self.nodes
-    content = nodes.render(**kwargs)
+    content = render_child(nodes, kwargs)
     if nodes.preferred_render_style(**kwargs) == RENDER_BLOCK:
       template = self._render_template_block
     else:
       template = self._render_template_inline
-    return template.format(
+    return _check_output_size(template.format(
       line_prefix = line_prefix,
       tag = tag,
       attributes = attributes,
       content = content
-    )
+    ), kwargs)
 
 
 class Nodes(HTYAML):
@@ -649,21 +934,38 @@ class Nodes(HTYAML):
 '''
 
   @classmethod
-  def parse(cls, yaml_node):
+  def parse(cls, yaml_node, **kwargs):
+    return cls._parse(yaml_node, kwargs, ParseState.from_kwargs(kwargs))
+
+  @classmethod
+  def _parse(cls, yaml_node, kwargs, state):
     if type(yaml_node) is not list:
-      parsed_node = Node.parse(yaml_node)
+      parsed_node = Node._parse(yaml_node, kwargs, state)
       if isinstance(parsed_node, NotParsed):
         return parsed_node
       else:
         return cls(nodes = [parsed_node], yaml_node = yaml_node)
 
+    memo = state.memo
+    if memo is not None:
+      key = (Nodes, id(yaml_node))
+      entry = memo.get(key)
+      if entry is not None:
+        return state.reuse(cls, yaml_node, entry)
+      start = state.start(key)
+
     parsed_nodes = []
     for node in yaml_node:
-      parsed_node = Node.parse(node)
+      parsed_node = Node._parse(node, kwargs, state)
       if isinstance(parsed_node, NotParsed):
+        if memo is not None:
+          state.finish(key, yaml_node, parsed_node, start)
         return parsed_node
       parsed_nodes.append(parsed_node)
-    return cls(nodes = parsed_nodes, yaml_node = yaml_node)
+    result = cls(nodes = parsed_nodes, yaml_node = yaml_node)
+    if memo is not None:
+      state.finish(key, yaml_node, result, start)
+    return result
 
   def preferred_render_style(self, **kwargs):
     if len(self) == 0:
@@ -679,15 +981,46 @@ class Nodes(HTYAML):
     return cls(nodes = [], yaml_node = None)
 
   def render(self, **kwargs):
+    if '_shared' in self.__dict__:
+      return self._render_once(kwargs)
+    return self._render(kwargs)
+
+  def _render(self, kwargs, render_child = _render_child):
 
     if len(self) is 0:
       return ''
 
-    if self.preferred_render_style(**kwargs) == RENDER_BLOCK:
-      return '\n'.join(node.render(**kwargs) for node in self)
+    if get_kwarg_with_default(kwargs, 'minify'):
+      return _check_output_size(self._render_minified(kwargs, render_child), kwargs)
 
-    kwargs['line_prefix'] = ''
-    return ' '.join(node.render(**kwargs) for node in self)
+    if self.preferred_render_style(**kwargs) == RENDER_BLOCK:
+      result = '\n'.join([render_child(node, kwargs) for node in self])
+    else:
+      kwargs['line_prefix'] = ''
+      result = ' '.join([render_child(node, kwargs) for node in self])
+    return _check_output_size(result, kwargs)
+
+  def _render_minified(self, kwargs, render_child = _render_child):
+    r'''Renders without indentation or newlines between nodes. A space is
+only kept between two neighbouring inline nodes, where it is significant.
+
+    >>> print(Nodes.parse_yaml("""
+    ... - div:
+    ...   - p: [one, {b: two}]
+    ...   - hr:
+    ...   - three
+    ... """).render(minify = True))
+    <div><p>one <b>two</b></p><hr>three</div>
+'''
+    parts = []
+    previous_inline = False
+    for node in self:
+      inline = node.preferred_render_style(**kwargs) != RENDER_BLOCK
+      if inline and previous_inline:
+        parts.append(' ')
+      parts.append(render_child(node, kwargs))
+      previous_inline = inline
+    return ''.join(parts)
 
 
   def __len__(self):
@@ -699,10 +1032,89 @@ class Nodes(HTYAML):
   def __iter__(self):
     return self.nodes.__iter__()
 
+  def element_index(self):
+    '''Returns the `ElementIndex` of this tree, building it on first use.'''
+    try:
+      return self.__dict__['_index']
+    except KeyError:
+      pass
+    index = ElementIndex(self)
+    self.__dict__['_index'] = index
+    return index
+
+  def get_element_by_id(self, id):
+    r'''Returns the element with the given `id`, or None.
+
+    >>> page = Nodes.parse_yaml("- p: [[id: intro], Hello]")
+    >>> page.get_element_by_id('intro').render()
+    '<p id="intro">Hello</p>'
+'''
+    return self.element_index().by_id.get(id)
+
+  def find_all(self, tag = None, id = None, class_name = None,
+               attribute = None, value = ANY):
+    r'''Returns the elements, in document order, that match every given
+condition. `attribute` alone matches elements that have the attribute;
+with `value`, its value must also match.
+
+    >>> page = Nodes.parse_yaml("""
+    ... - img: {src: a.png, class: icon}
+    ... - img: {src: b.png}
+    ... """)
+    >>> [img.render() for img in page.find_all(tag = 'img', class_name = 'icon')]
+    ['<img class="icon" src="a.png">']
+'''
+    return self.element_index().find_all(
+      tag = tag,
+      id = id,
+      class_name = class_name,
+      attribute = attribute,
+      value = value
+    )
+
+
+class LazyNodes(Nodes):
+  r"""Nodes whose children are parsed the first time `nodes` is accessed,
+and cached after that. `ElementWithContent.parse` builds these when
+called with `lazy = True`, so only the parts of a document that are
+actually inspected or rendered get parsed.
+
+    >>> page = Nodes.parse_yaml('''
+    ... - head:
+    ...    - title: Hello
+    ... - body:
+    ...    - 99
+    ... ''', lazy = True)
+    >>> print(page[0].render())
+    <head>
+      <title>Hello</title>
+    </head>
+
+Parse errors surface when the faulty subtree is first accessed:
+
+    >>> page[1].nodes[0]
+    Traceback (most recent call last):
+      ...
+    stubbly.yaml2html.htyaml.ParseError: Node: not a valid HTML node
+"""
+
+  @property
+  def nodes(self):
+    try:
+      return self.__dict__['_nodes']
+    except KeyError:
+      pass
+    parsed = Nodes.parse(self.yaml_node, **self._parse_kwargs)
+    if isinstance(parsed, NotParsed):
+      raise ParseError(parsed)
+    self.__dict__['_nodes'] = parsed.nodes
+    return parsed.nodes
+
 if __name__ == '__main__':
   from sys import argv
   if len(argv) is 1:
     from doctest import testmod
     testmod()
   else:
-    print(HTYAML.parse_yaml(open(argv[1])).render(markdown = True))
+    from .cli import main
+    main(argv[1:])
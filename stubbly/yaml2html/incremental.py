@@ -0,0 +1,288 @@
+'''Incremental re-parsing and re-rendering, for live previews.
+
+A `PreviewSession` keeps the source, YAML data and HTYAML tree of the
+last version of a page. `update` splits the new source into the items of
+its top-level sequence and, inside items of the form
+
+    - tag:
+      - child
+      - child
+
+into the source of each child, recursively. Items whose source text is
+unchanged reuse the node parsed for them before, and the rendered HTML
+cached on it; only the items that changed, and the elements containing
+them, are parsed and rendered again. The work done by an update
+therefore follows the size of the edit rather than the size of the page.
+
+    >>> session = PreviewSession()
+    >>> print(session.update("""
+    ... - h1: Title
+    ... - p: one
+    ... """).html)
+    <h1>Title</h1>
+    <p>one</p>
+    >>> update = session.update("""
+    ... - h1: Title
+    ... - p: two
+    ... """)
+    >>> update.fragments
+    [Fragment(index=1, html='<p>two</p>')]
+
+Sources that cannot be split safely, such as those that do not start
+with a top-level sequence, that use anchors and aliases across items, or
+that define the same anchor in two items, are parsed in full, as
+`HTYAML.parse_yaml` would. So are pages that
+turn out to contain an error, so that the error is reported exactly as a
+full parse reports it: items with the same source share their YAML data,
+which would otherwise show as anchors in the message. Either way the
+result is the same as parsing and rendering the whole page.
+
+The `max_nodes` limit applies to each re-parsed item separately.
+'''
+import re
+from collections import namedtuple
+import yaml
+from .settings import get_kwarg_with_default, RENDER_BLOCK
+from .htyaml import (
+  HTYAML, Node, Nodes, NotParsed, ElementWithContent, Attributes,
+  UnambiguousAttributes, PageLoader
+)
+
+
+PreviewUpdate = namedtuple('PreviewUpdate', 'html fragments complete')
+PreviewUpdate.__doc__ = '''The result of `PreviewSession.update`.
+
+`html` is the whole rendered page. If `complete` is False, the page has
+as many top-level items as before, and `fragments` lists the `Fragment`s
+for the ones that changed. If `complete` is True, `fragments` is empty,
+and the whole page should be replaced.'''
+
+Fragment = namedtuple('Fragment', 'index html')
+
+
+class _Fallback(Exception):
+  '''The source cannot be parsed item by item.'''
+
+
+# `- key:` on a line of its own: a possible element with a list of children.
+_element_header = re.compile(r'- [^\s#&*!|>\'"\[\]{},%@`?:-][^#&*!]*:[ \t]*(#.*)?\r?\n?\Z')
+
+
+def _is_item_line(line, indent):
+  return (
+    line.startswith('-', indent) and
+    line[:indent].strip(' ') == '' and
+    line[indent + 1:indent + 2] in ('', ' ', '\n', '\r')
+  )
+
+
+def _is_ignorable(line):
+  stripped = line.strip()
+  return not stripped or stripped.startswith('#')
+
+
+def _split_items(lines, indent):
+  '''Splits `lines`, a block sequence indented by `indent`, into the
+lines of each item. Returns None if they are not a plain block sequence.'''
+  items = []
+  for line in lines:
+    if _is_item_line(line, indent):
+      items.append([line])
+    elif _is_ignorable(line):
+      if items:
+        items[-1].append(line)
+    elif items and len(line) - len(line.lstrip(' ')) > indent:
+      items[-1].append(line)
+    else:
+      return None
+  return items
+
+
+def _dedent(lines, indent):
+  prefix = ' ' * indent
+  return [
+    line[indent:] if line.startswith(prefix) else line.lstrip(' ')
+    for line in lines
+  ]
+
+
+class _Item(object):
+  '''The source text, YAML data and parsed node of one sequence item,
+and the names of the anchors it defines.'''
+  __slots__ = ('text', 'yaml_node', 'node', 'anchors')
+
+  def __init__(self, text, yaml_node, node, anchors):
+    self.text = text
+    self.yaml_node = yaml_node
+    self.node = node
+    self.anchors = anchors
+
+
+class PreviewSession(object):
+  '''Holds the last version of a page, and updates it from new sources.
+
+Keyword arguments are passed to both `parse` and `render`.'''
+
+  def __init__(self, **kwargs):
+    self.kwargs = kwargs
+    self.source = None
+    self.yaml_node = None
+    self.tree = None
+    self._items = {}
+    self._top_count = None
+
+  def update(self, source):
+    '''Returns the `PreviewUpdate` for `source`, the new text of the page.'''
+    previous_items = self._previous_items = self._items
+    self._items = {}
+    self._parsed = set()
+    try:
+      top = self._parse_sequence(source.splitlines(True))
+    except _Fallback:
+      top = None
+    except:
+      self._items = previous_items
+      raise
+    finally:
+      del self._previous_items
+
+    if top is None:
+      self._items = previous_items
+      return self._parse_in_full(source)
+
+    self.source = source
+    failed = any(isinstance(item.node, NotParsed) for item in top)
+    if failed:
+      # The items are kept for the next update.
+      self.yaml_node = yaml.load(source, Loader = PageLoader)
+      self.tree = HTYAML.parse(self.yaml_node, **self.kwargs)
+    else:
+      self.yaml_node = [item.yaml_node for item in top]
+      self.tree = Nodes(nodes = [item.node for item in top], yaml_node = self.yaml_node)
+    html = self.tree.render(**self.kwargs)
+
+    complete = failed or len(top) != self._top_count
+    self._top_count = None if failed else len(top)
+    if complete:
+      return PreviewUpdate(html, [], True)
+    render_kwargs = self._top_render_kwargs()
+    fragments = [
+      Fragment(index, item.node.render(**render_kwargs))
+      for index, item in enumerate(top)
+      if id(item) in self._parsed
+    ]
+    return PreviewUpdate(html, fragments, False)
+
+  def _top_render_kwargs(self):
+    '''The options `Nodes.render` renders the top-level items with.'''
+    render_kwargs = dict(self.kwargs)
+    if (not get_kwarg_with_default(render_kwargs, 'minify') and
+        self.tree.preferred_render_style(**render_kwargs) != RENDER_BLOCK):
+      render_kwargs['line_prefix'] = ''
+    return render_kwargs
+
+  def _parse_in_full(self, source):
+    yaml_node = yaml.load(source, Loader = PageLoader)
+    tree = HTYAML.parse(yaml_node, **self.kwargs)
+    self.source = source
+    self.yaml_node = yaml_node
+    self.tree = tree
+    self._items = {}
+    self._top_count = None
+    return PreviewUpdate(tree.render(**self.kwargs), [], True)
+
+  def _parse_sequence(self, lines):
+    '''Returns the `_Item`s of a block sequence at the start of the line.'''
+    items = _split_items(lines, 0)
+    if not items:
+      raise _Fallback()
+    top = [self._parse_item(item_lines) for item_lines in items]
+    anchors = [name for item in top for name in item.anchors]
+    if len(set(anchors)) != len(anchors):
+      # Depending on the PyYAML version, loading the whole page fails on
+      # an anchor defined twice, or binds later aliases to the last one.
+      raise _Fallback()
+    return top
+
+  def _parse_item(self, lines):
+    text = ''.join(lines)
+    item = self._items.get(text)
+    if item is None:
+      item = self._previous_items.get(text)
+    if item is None:
+      item = self._parse_element(lines)
+      if item is None:
+        item = self._parse_whole(text)
+      item.node._share()
+      self._parsed.add(id(item))
+    self._items[text] = item
+    return item
+
+  def _load(self, text):
+    '''Returns the YAML data of the single item in `text`, and the names
+of the anchors it defines.'''
+    loader = PageLoader(text)
+    try:
+      data = loader.get_single_data()
+    except yaml.YAMLError:
+      raise _Fallback()
+    finally:
+      loader.dispose()
+    if type(data) is not list or len(data) != 1:
+      raise _Fallback()
+    return data[0], loader.anchor_names
+
+  def _parse_whole(self, text):
+    yaml_node, anchors = self._load(text)
+    return _Item(text, yaml_node, Node.parse(yaml_node, **self.kwargs), anchors)
+
+  def _parse_element(self, lines):
+    '''Parses `- tag:` followed by a list of children child by child, and
+returns None for anything else.'''
+    if (get_kwarg_with_default(self.kwargs, 'lazy') or
+        len(lines) < 2 or not _element_header.match(lines[0])):
+      return None
+    body = lines[1:]
+    indent = None
+    for line in body:
+      if not _is_ignorable(line):
+        indent = len(line) - len(line.lstrip(' '))
+        break
+    if indent is None or indent < 2:
+      return None
+    child_lines = _split_items(body, indent)
+    if not child_lines:
+      return None
+    try:
+      header, _ = self._load(lines[0])
+      if type(header) is not dict or len(header) != 1 or None not in header.values():
+        return None
+      children = [self._parse_item(_dedent(item_lines, indent)) for item_lines in child_lines]
+    except _Fallback:
+      # E.g. an alias to an anchor in another child: load the item whole.
+      return None
+    [tag] = header
+    content = [child.yaml_node for child in children]
+    yaml_node = {tag: content}
+    text = ''.join(lines)
+    anchors = tuple(name for child in children for name in child.anchors)
+
+    # As in ElementWithContent.parse.
+    if content == [None]:
+      return _Item(text, yaml_node, Node.parse(yaml_node, **self.kwargs), anchors)
+    attributes = UnambiguousAttributes.parse(content[0])
+    if isinstance(attributes, NotParsed):
+      attributes = Attributes.empty()
+    else:
+      children = children[1:]
+      content = content[1:]
+    if any(isinstance(child.node, NotParsed) for child in children):
+      # Let the full parse work out the error message.
+      return _Item(text, yaml_node, Node.parse(yaml_node, **self.kwargs), anchors)
+    node = ElementWithContent(
+      tag = tag,
+      attributes = attributes,
+      nodes = Nodes(nodes = [child.node for child in children], yaml_node = content),
+      yaml_node = yaml_node
+    )
+    return _Item(text, yaml_node, node, anchors)
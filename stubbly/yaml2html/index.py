@@ -0,0 +1,148 @@
+'''Index of the elements in a parsed HTYAML tree.
+
+Parsed trees are immutable, so the index only needs to be built once.
+After that, a query on one condition returns a list the index already
+holds, and a query on several scans the shortest of their lists.
+`Nodes.element_index` builds it on first use and keeps it with the tree.
+
+Elements are recognised by their `tag` and `attributes`, and their
+children are found through `nodes`, so anything that looks like an
+element is indexed.
+'''
+
+ANY = object()
+
+
+def _tag_key(tag):
+  '''Tags are looked up ignoring case. Tags that are not strings, which
+parsed trees can hold, are used as they are.'''
+  return tag.lower() if isinstance(tag, str) else tag
+
+
+def _class_tokens(attributes):
+  value = attributes.get('class')
+  if value is None or value.value is None:
+    return ()
+  return str(value.value).split()
+
+
+class ElementIndex(object):
+  r'''Look up elements by tag name, `id`, class token, or attribute.
+Results are tuples, in document order.
+
+    >>> from stubbly.yaml2html.htyaml import Nodes
+    >>> page = Nodes.parse_yaml("""
+    ... - div:
+    ...   - - id: main
+    ...       class: box wide
+    ...   - a:
+    ...     - - href: /home
+    ...     - Home
+    ...   - a:
+    ...     - - href: /about
+    ...         class: box
+    ...     - About
+    ... """)
+    >>> index = page.element_index()
+    >>> index.by_id['main'].tag
+    'div'
+    >>> [a.attributes.attributes['href'].value for a in index.find_all(tag = 'a')]
+    ['/home', '/about']
+    >>> [e.tag for e in index.find_all(class_name = 'box')]
+    ['div', 'a']
+    >>> [e.tag for e in index.find_all(attribute = 'href', value = '/about')]
+    ['a']
+'''
+
+  def __init__(self, nodes):
+    self.elements = []
+    self.by_tag = {}
+    self.by_id = {}
+    self.by_class = {}
+    self.by_attribute = {}
+    self._by_attribute_value = {}
+
+    stack = [iter(nodes)]
+    while stack:
+      for node in stack[-1]:
+        self._add(node)
+        children = getattr(node, 'nodes', None)
+        if children is not None:
+          stack.append(iter(children))
+          break
+      else:
+        stack.pop()
+
+    for name in ('by_tag', 'by_class', 'by_attribute'):
+      table = getattr(self, name)
+      for key, elements in table.items():
+        table[key] = tuple(elements)
+    self.elements = tuple(self.elements)
+
+  def _add(self, node):
+    tag = getattr(node, 'tag', None)
+    if tag is None:
+      return
+    attributes = node.attributes.attributes
+    self.elements.append(node)
+    self.by_tag.setdefault(_tag_key(tag), []).append(node)
+    for name in attributes:
+      self.by_attribute.setdefault(name, []).append(node)
+    id_value = attributes.get('id')
+    if id_value is not None and id_value.value is not None:
+      self.by_id.setdefault(str(id_value.value), node)
+    for token in _class_tokens(attributes):
+      self.by_class.setdefault(token, []).append(node)
+
+  def with_attribute(self, name, value = ANY):
+    '''Elements that have the attribute `name`, optionally with the given value.'''
+    if value is ANY:
+      return self.by_attribute.get(name, ())
+    try:
+      by_value = self._by_attribute_value[name]
+    except KeyError:
+      by_value = {}
+      for element in self.by_attribute.get(name, ()):
+        by_value.setdefault(element.attributes.attributes[name].value, []).append(element)
+      by_value = dict((key, tuple(elements)) for key, elements in by_value.items())
+      self._by_attribute_value[name] = by_value
+    return by_value.get(value, ())
+
+  def find_all(self, tag = None, id = None, class_name = None,
+               attribute = None, value = ANY):
+    '''Elements that meet every one of the given conditions. With one
+condition, this is the list the index holds for it; with several, the
+shortest of their lists is scanned for elements meeting the others.'''
+    candidates = []
+    if id is not None:
+      element = self.by_id.get(id)
+      candidates.append((element,) if element is not None else ())
+    if tag is not None:
+      tag = _tag_key(tag)
+      candidates.append(self.by_tag.get(tag, ()))
+    if class_name is not None:
+      candidates.append(self.by_class.get(class_name, ()))
+    if attribute is not None:
+      candidates.append(self.with_attribute(attribute, value))
+    if not candidates:
+      return self.elements
+    if len(candidates) == 1:
+      return candidates[0]
+
+    def matches(element):
+      attributes = element.attributes.attributes
+      if tag is not None and _tag_key(element.tag) != tag:
+        return False
+      if class_name is not None and class_name not in _class_tokens(attributes):
+        return False
+      if attribute is not None:
+        if attribute not in attributes:
+          return False
+        if value is not ANY and attributes[attribute].value != value:
+          return False
+      if id is not None and self.by_id.get(id) is not element:
+        return False
+      return True
+
+    smallest = min(candidates, key = len)
+    return tuple(element for element in smallest if matches(element))
@@ -0,0 +1,89 @@
+'''HTYAML pages written as JSON.
+
+`HTYAML.parse` works on plain lists, dicts and strings, so a page can come
+from any format that decodes to them. JSON decoders are much faster than
+the YAML scanner, which matters for pages generated by other programs.
+
+As in YAML pages, the keys `"$include"` and `"$table"` are the
+directives; every other string, including ones starting with `$`, is
+text:
+
+    >>> load_json('[{"$include": "header.json"}, {"p": "$5 off"}, "$name"]')
+    [{Include(): 'header.json'}, {'p': '$5 off'}, '$name']
+
+JSON is decoded with orjson when it is installed, and with the standard
+library's `json` otherwise. Either raises a `json.JSONDecodeError` for
+invalid JSON.
+'''
+import os
+from ..yaml_tags import Include, Table
+
+_loads = None
+
+
+def _json_loads():
+  global _loads
+  if _loads is None:
+    # Imported on first use, like markdown2.
+    try:
+      import orjson
+      _loads = orjson.loads
+    except ImportError:
+      import json
+      _loads = json.loads
+  return _loads
+
+
+_DIRECTIVES = {'$include': Include(), '$table': Table()}
+
+
+def resolve_directives(data):
+  '''Returns `data`, decoded JSON, with `$include` and `$table` keys
+turned into their tags. Dicts are changed in place where possible.'''
+  data_type = type(data)
+  if data_type is list:
+    for i, item in enumerate(data):
+      if type(item) in (list, dict):
+        data[i] = resolve_directives(item)
+  elif data_type is dict:
+    if any(key in _DIRECTIVES for key in data):
+      data = dict((_DIRECTIVES.get(key, key), value) for key, value in data.items())
+    for key, value in data.items():
+      if type(value) in (list, dict):
+        data[key] = resolve_directives(value)
+  return data
+
+
+def load_json(json_src):
+  '''Decodes `json_src`, a string, bytes or a file, and resolves the
+`$include` and `$table` directives in it.'''
+  if hasattr(json_src, 'read'):
+    json_src = json_src.read()
+  return resolve_directives(_json_loads()(json_src))
+
+
+def load_json_lines(stream):
+  '''Generates the documents of a JSON Lines stream, one per line, read
+one at a time. Blank lines are skipped.'''
+  for line in stream:
+    if line.strip():
+      yield load_json(line)
+
+
+def detect_format(file_name, head = ''):
+  '''Returns 'json' or 'yaml': by the extension of `file_name`, or, for
+other names, 'json' when `head`, the start of the source, looks like a
+JSON array or object. Such sources are usually also valid YAML, so
+callers should fall back to YAML if decoding fails.
+
+    >>> detect_format('page.json'), detect_format('page.yml')
+    ('json', 'yaml')
+    >>> detect_format('-', ' [{"p": "text"}]'), detect_format('-', '- p: text')
+    ('json', 'yaml')
+'''
+  extension = os.path.splitext(file_name)[1].lower()
+  if extension in ('.json', '.jsonl'):
+    return 'json'
+  if extension in ('.yaml', '.yml'):
+    return 'yaml'
+  return 'json' if head.lstrip()[:1] in ('[', '{') else 'yaml'
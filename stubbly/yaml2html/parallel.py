@@ -0,0 +1,132 @@
+'''Renders large trees on several threads, on free-threaded Python.
+
+On free-threaded builds of CPython (3.13t and later) threads run Python
+code on several cores at once, and share the tree without the pickling
+a process pool would need. `ParallelRenderer` splits a tree into
+subtrees of a sizable number of nodes, such as the sections of a long
+page, renders them on a thread pool, and puts the results together in
+order, exactly as `render` would have:
+
+    >>> from stubbly.yaml2html.htyaml import Nodes
+    >>> page = Nodes.parse_yaml("""
+    ... - h1: Title
+    ... - p: [one, {b: two}]
+    ... """)
+    >>> with ParallelRenderer(workers = 4) as renderer:
+    ...   print(renderer.render(page))
+    <h1>Title</h1>
+    <p>one <b>two</b></p>
+
+Where the GIL is enabled, threads would only take turns, so `render`
+renders on the calling thread instead, unless `serial_on_gil` is False.
+'''
+import os
+import sys
+import threading
+from .htyaml import Nodes, ElementWithContent, _render_child
+
+
+def gil_enabled():
+  '''False only on free-threaded builds running without the GIL.'''
+  is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+  return True if is_gil_enabled is None else is_gil_enabled()
+
+
+_BRANCHES = (Nodes, ElementWithContent)
+
+
+def _size(node):
+  '''The number of nodes in the subtree under `node`, counting elements
+and `Nodes` only. Cached on the node, as trees are immutable.'''
+  try:
+    return node.__dict__['_size']
+  except KeyError:
+    pass
+  # Sizes of children are worked out before those of their parents.
+  stack = [(node, False)]
+  while stack:
+    current, children_done = stack.pop()
+    if '_size' in current.__dict__:
+      continue
+    children = current.nodes if isinstance(current, Nodes) else [current.nodes]
+    children = [child for child in children if isinstance(child, _BRANCHES)]
+    if children_done:
+      current.__dict__['_size'] = 1 + sum(child.__dict__['_size'] for child in children)
+    else:
+      stack.append((current, True))
+      stack.extend((child, False) for child in children)
+  return node.__dict__['_size']
+
+
+class ParallelRenderer(object):
+  '''Renders trees with a pool of `workers` threads, by default one per
+CPU. Subtrees of at most `min_chunk_nodes` elements are never split.'''
+
+  def __init__(self, workers = None, min_chunk_nodes = 64, serial_on_gil = True):
+    self.workers = workers or os.cpu_count() or 1
+    self.min_chunk_nodes = min_chunk_nodes
+    self.serial_on_gil = serial_on_gil
+    self._executor = None
+    self._lock = threading.Lock()
+
+  def _pool(self):
+    with self._lock:
+      if self._executor is None:
+        from concurrent.futures import ThreadPoolExecutor
+        self._executor = ThreadPoolExecutor(max_workers = self.workers)
+      return self._executor
+
+  def close(self):
+    with self._lock:
+      executor, self._executor = self._executor, None
+    if executor is not None:
+      executor.shutdown()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    self.close()
+
+  def parallel(self):
+    '''Whether `render` uses threads.'''
+    return self.workers > 1 and not (self.serial_on_gil and gil_enabled())
+
+  def render(self, tree, **kwargs):
+    '''Returns `tree.render(**kwargs)`.'''
+    if not self.parallel() or not isinstance(tree, _BRANCHES):
+      return tree.render(**kwargs)
+    # Aim for a few chunks per worker, so that they even out.
+    chunk = max(self.min_chunk_nodes, _size(tree) // (self.workers * 4))
+
+    def split(node):
+      return (
+        isinstance(node, _BRANCHES) and
+        '_shared' not in node.__dict__ and
+        _size(node) > chunk
+      )
+
+    # First pass: go down the large subtrees, rendering their markup
+    # around empty content, and start rendering the chunks under them.
+    pool = self._pool()
+    futures = []
+    def submit(node, kwargs):
+      if split(node):
+        return node._render(dict(kwargs), submit)
+      futures.append(pool.submit(_render_child, node, dict(kwargs)))
+      return ''
+    submit(tree, kwargs)
+
+    # Second pass: the same walk, in the same order, with the results.
+    results = iter(futures)
+    def collect(node, kwargs):
+      if split(node):
+        return node._render(dict(kwargs), collect)
+      return next(results).result()
+    return collect(tree, kwargs)
+
+
+def render_parallel(tree, workers = None, **kwargs):
+  '''Renders `tree` with a `ParallelRenderer` made for the call.'''
+  with ParallelRenderer(workers) as renderer:
+    return renderer.render(tree, **kwargs)
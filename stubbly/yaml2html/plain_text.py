@@ -0,0 +1,220 @@
+r'''The visible text of HTYAML trees, for search indexing and the like.
+
+`to_text` walks a tree and keeps only its text: attributes are dropped,
+and so are elements whose content is not shown, such as `script`. No
+HTML is built. Block nodes go on lines of their own, and neighbouring
+inline nodes are separated by a space:
+
+    >>> from stubbly.yaml2html.htyaml import Nodes
+    >>> page = Nodes.parse_yaml("""
+    ... - head:
+    ...   - title: Not shown
+    ... - body:
+    ...   - h1: Title
+    ...   - - |
+    ...       Some *Markdown*, with [a link](/x).
+    ...
+    ...       - and a list
+    ...   - p: [one, {b: two}, <i>three</i> &amp; four]
+    ...   - script: var x = 1;
+    ... """)
+    >>> print(to_text(page, markdown = True))
+    Title
+    Some Markdown, with a link.
+    and a list
+    one two three & four
+
+With `markdown = True`, Markdown is turned into text by removing its
+markup, without converting it to HTML. This covers emphasis, code,
+links, images, headings, lists, quotes, rules and escapes, which is
+enough for indexing; `markdown_extras` are ignored. Literals holding
+markup are stripped of their tags. Blank lines are left out.
+'''
+import re
+from html import unescape
+from html.parser import HTMLParser
+from .htyaml import (
+  NotParsed, ParseError, Literal, EscapableText, EmptyElement,
+  ElementWithContent, Nodes
+)
+from .bulk_table import BulkTable
+from .settings import (
+  get_kwarg_with_default, get_tag_render_style, RENDER_INLINE, RENDER_BLOCK,
+  RENDER_ACCORDING_TO_CHILDREN
+)
+
+# Elements whose content is not shown as text.
+SKIPPED_TAGS = frozenset(('head', 'script', 'style', 'template'))
+
+
+class _TagStripper(HTMLParser):
+  '''Collects the text of an HTML fragment, outside skipped elements.'''
+
+  def __init__(self, skipped_tags):
+    super(_TagStripper, self).__init__(convert_charrefs = True)
+    self.skipped_tags = skipped_tags
+    self.skipping = 0
+    self.parts = []
+
+  def handle_starttag(self, tag, attrs):
+    if tag in self.skipped_tags:
+      self.skipping += 1
+
+  def handle_endtag(self, tag):
+    if tag in self.skipped_tags and self.skipping:
+      self.skipping -= 1
+
+  def handle_data(self, data):
+    if not self.skipping:
+      self.parts.append(data)
+
+
+def _strip_tags(html, skipped_tags):
+  stripper = _TagStripper(skipped_tags)
+  stripper.feed(html)
+  stripper.close()
+  return ''.join(stripper.parts)
+
+
+# Backslash escapes are set aside while the rest of the markup goes, as
+# characters from a private use area.
+_ESCAPED = '\\`*_{}[]()#+-.!>'
+_ESCAPE = re.compile(r'\\([\\`*_{}\[\]()#+\-.!>])')
+_UNESCAPE = dict((0xE000 + i, c) for i, c in enumerate(_ESCAPED))
+
+_MARKDOWN_RULES = [(re.compile(pattern, flags), replacement) for pattern, flags, replacement in (
+  # Reference definitions, rules, fences and setext underlines.
+  (r'^ {0,3}\[[^\]\n]+\]:[ \t]*\S.*$', re.M, ''),
+  (r'^ {0,3}(?:(?:\*[ \t]*){3,}|(?:-[ \t]*){3,}|(?:_[ \t]*){3,}|=+[ \t]*|(?:`{3,}|~{3,}).*)$', re.M, ''),
+  # Headings, quotes and list items.
+  (r'^ {0,3}#{1,6}[ \t]+(.*?)(?:[ \t]+#+)?[ \t]*$', re.M, r'\1'),
+  (r'^ {0,3}(?:>[ \t]?)+', re.M, ''),
+  (r'^[ \t]*(?:[-*+]|\d+[.)])[ \t]+', re.M, ''),
+  # Images, links and automatic links.
+  (r'!\[([^\]]*)\](?:\([^)]*\)|[ \t]?\[[^\]]*\])', 0, r'\1'),
+  (r'\[([^\]]*)\](?:\([^)]*\)|[ \t]?\[[^\]]*\])', 0, r'\1'),
+  (r'<((?:https?|ftp)://[^>\s]+|[^@>\s]+@[^>\s]+)>', 0, r'\1'),
+  # Code, strong and emphasis.
+  (r'(`+)[ \t]?(.+?)[ \t]?\1', re.S, r'\2'),
+  (r'(\*\*|__)(?=\S)(.+?)(?<=\S)\1', re.S, r'\2'),
+  (r'\*(?=\S)(.+?)(?<=\S)\*', re.S, r'\1'),
+  (r'(?<!\w)_(?=\S)(.+?)(?<=\S)_(?!\w)', re.S, r'\1'),
+)]
+
+
+def markdown_to_text(text, skipped_tags = SKIPPED_TAGS):
+  r'''Returns the text that Markdown source `text` shows.
+
+    >>> print(markdown_to_text("""# Heading #
+    ...
+    ... > A **quote**, \\*not emphasis\\*, and `code`.
+    ...
+    ... 1. ![An image](i.png) &amp; <span>HTML</span>
+    ... """))
+    Heading
+    <BLANKLINE>
+    A quote, *not emphasis*, and code.
+    <BLANKLINE>
+    An image & HTML
+    <BLANKLINE>
+'''
+  text = _ESCAPE.sub(lambda match: chr(0xE000 + _ESCAPED.index(match.group(1))), text)
+  for pattern, replacement in _MARKDOWN_RULES:
+    text = pattern.sub(replacement, text)
+  if '<' in text:
+    text = _strip_tags(text, skipped_tags)
+  elif '&' in text:
+    text = unescape(text)
+  return text.translate(_UNESCAPE)
+
+
+class _TextExtractor(object):
+
+  def __init__(self, skipped_tags, kwargs):
+    self.skipped_tags = skipped_tags
+    self.kwargs = kwargs
+    self.markdown = get_kwarg_with_default(kwargs, 'markdown')
+    # (id, with kwargs) -> (node, render style). The node is kept so that
+    # its id is not reused.
+    self.styles = {}
+
+  def text(self, node):
+    '''Returns the text of `node`.'''
+    node_type = type(node)
+    if isinstance(node, Nodes):
+      return self.nodes_text(node)
+    if node_type is ElementWithContent:
+      tag = node.tag
+      if (tag.lower() if isinstance(tag, str) else tag) in self.skipped_tags:
+        return ''
+      return self.nodes_text(node.nodes)
+    if node_type is EmptyElement:
+      return ''
+    if node_type is Literal:
+      literal = node.literal
+      if '<' in literal:
+        return _strip_tags(literal, self.skipped_tags)
+      if '&' in literal:
+        return unescape(literal)
+      return literal
+    if node_type is EscapableText:
+      if node.text is None:
+        return ''
+      if self.markdown:
+        return markdown_to_text(node.text, self.skipped_tags)
+      return node.text
+    if isinstance(node, NotParsed):
+      raise ParseError(node)
+    if isinstance(node, BulkTable):
+      return '\n'.join(
+        ' '.join(row) for row in list(zip(*node.header)) + list(zip(*node.cells))
+      )
+    raise TypeError('cannot extract text from {0}'.format(node_type.__name__))
+
+  def style(self, node, kwargs):
+    '''Returns `node.preferred_render_style(**kwargs)`, working it out
+once for each node rather than again at every level above it.'''
+    key = (id(node), kwargs is self.kwargs)
+    cached = self.styles.get(key)
+    if cached is not None:
+      return cached[1]
+    if type(node) is ElementWithContent:
+      style = get_tag_render_style(kwargs, node.tag)
+      if style == RENDER_ACCORDING_TO_CHILDREN:
+        # As `ElementWithContent` does, without the options.
+        style = self.style(node.nodes, {})
+    elif isinstance(node, Nodes):
+      style = RENDER_INLINE
+      for child in node:
+        if self.style(child, kwargs) == RENDER_BLOCK:
+          style = RENDER_BLOCK
+          break
+    else:
+      style = node.preferred_render_style(**kwargs)
+    self.styles[key] = (node, style)
+    return style
+
+  def nodes_text(self, nodes):
+    kwargs = self.kwargs
+    parts = []
+    previous_inline = False
+    for node in nodes:
+      text = self.text(node)
+      if not text:
+        continue
+      inline = self.style(node, kwargs) != RENDER_BLOCK
+      if parts:
+        parts.append(' ' if inline and previous_inline else '\n')
+      parts.append(text)
+      previous_inline = inline
+    return ''.join(parts)
+
+
+def to_text(tree, skipped_tags = SKIPPED_TAGS, **kwargs):
+  '''Returns the visible text of `tree`, a parsed HTYAML tree, leaving
+out elements whose tag is in `skipped_tags`. Takes the render options
+that affect content, such as `markdown`.
+
+Raises `ParseError` if `tree` contains a `NotParsed`.'''
+  text = _TextExtractor(skipped_tags, kwargs).text(tree)
+  return '\n'.join(line.strip() for line in text.splitlines() if line.strip())
@@ -0,0 +1,250 @@
+'''WSGI/ASGI application that serves HTYAML pages.
+
+URL paths are mapped to YAML sources, either by a dict or by looking up
+`<path>.yaml` in a directory. Rendered pages are cached by the hash of
+their source and the render options, so a page is only re-rendered when
+its source, or a fragment it includes with `$include`, changes. Responses
+carry an ETag, and conditional requests are answered with `304 Not Modified`.
+
+    >>> app = HTYAMLApp({'/': 'index.yaml'})
+    >>> app.stats_path
+    '/_stats'
+'''
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+import yaml
+from .htyaml import NotParsed
+from .fragments import fragment_cache as default_fragment_cache
+
+
+class CachedPage(object):
+  '''A rendered page, encoded and ready to be sent.'''
+
+  def __init__(self, etag, body, status):
+    self.etag = etag
+    self.body = body
+    self.status = status
+
+
+class HTYAMLApp(object):
+  '''Serves HTYAML pages over WSGI (call the instance) or ASGI (`app.asgi`).
+
+`sources` is either a directory, in which `/a/b` is served from `a/b.yaml`
+(and `/` from `index.yaml`), or a dict mapping URL paths to file names.
+Remaining keyword arguments are passed to `render`; `markdown` defaults
+to True, as in the command line tool. Included fragments are parsed
+through `fragment_cache`, by default the one shared by the process.
+'''
+
+  def __init__(self, sources, stats_path = '/_stats', chunk_size = 64 * 1024,
+               max_entries = 256, fragment_cache = None, **render_kwargs):
+    self.sources = sources
+    self.fragment_cache = fragment_cache or default_fragment_cache
+    self.stats_path = stats_path
+    self.chunk_size = chunk_size
+    self.max_entries = max_entries
+    render_kwargs.setdefault('markdown', True)
+    self.render_kwargs = render_kwargs
+    self._options_key = repr(sorted(render_kwargs.items()))
+    self._lock = threading.Lock()
+    self._pages = OrderedDict()
+    self._digests = {}
+    self._stats = {
+      'requests': 0,
+      'hits': 0,
+      'misses': 0,
+      'not_modified': 0,
+      'not_found': 0,
+      'render_seconds': 0.0,
+      'latency_seconds': 0.0,
+      'max_latency_seconds': 0.0,
+    }
+
+  def source_file(self, path):
+    '''Returns the file name for a URL path, or None if there isn't one.'''
+    if not isinstance(self.sources, (str, os.PathLike)):
+      return self.sources.get(path)
+    parts = [part for part in path.split('/') if part]
+    if any(part in ('.', '..') for part in parts):
+      return None
+    file_name = os.path.join(os.fspath(self.sources), *(parts or ['index'])) + '.yaml'
+    return file_name if os.path.isfile(file_name) else None
+
+  def stats(self):
+    '''Returns a dict of cache and latency counters.'''
+    with self._lock:
+      stats = dict(self._stats)
+      stats['cached_pages'] = len(self._pages)
+    requests = stats['requests']
+    stats['mean_latency_seconds'] = (
+      stats['latency_seconds'] / requests if requests else 0.0
+    )
+    return stats
+
+  def _source_digest(self, file_name):
+    '''Hash of the file contents, re-read only when the file's stat changes.'''
+    st = os.stat(file_name)
+    signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+    with self._lock:
+      cached = self._digests.get(file_name)
+    if cached is not None and cached[0] == signature:
+      return cached[1], None
+    with open(file_name, 'rb') as f:
+      source = f.read()
+    digest = hashlib.sha1(source).hexdigest()
+    with self._lock:
+      self._digests[file_name] = (signature, digest)
+    return digest, source
+
+  def _etag(self, file_name, digest):
+    '''ETag of a page: the hash of its source, of the fragments it
+included when it was last rendered, and of the render options.'''
+    parts = [digest]
+    includes = self.fragment_cache.dependencies.get(os.path.abspath(file_name), ())
+    for include in sorted(includes):
+      try:
+        parts.append(self._source_digest(include)[0])
+      except OSError:
+        parts.append('missing')
+    parts.append(self._options_key)
+    return '"{0}"'.format(hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest())
+
+  def _render(self, file_name, source, digest):
+    if source is None:
+      with open(file_name, 'rb') as f:
+        source = f.read()
+    started = time.perf_counter()
+    parsed = self.fragment_cache.parse_file(file_name, source.decode('utf-8'))
+    html = parsed.render(**self.render_kwargs)
+    elapsed = time.perf_counter() - started
+    # The fragments the page includes are only known now.
+    etag = self._etag(file_name, digest)
+    status = '500 Internal Server Error' if isinstance(parsed, NotParsed) else '200 OK'
+    page = CachedPage(etag = etag, body = html.encode('utf-8'), status = status)
+    with self._lock:
+      self._stats['render_seconds'] += elapsed
+      self._pages[etag] = page
+      while len(self._pages) > self.max_entries:
+        self._pages.popitem(last = False)
+    return page
+
+  def _chunks(self, body):
+    view = memoryview(body)
+    for start in range(0, len(body), self.chunk_size):
+      yield bytes(view[start:start + self.chunk_size])
+
+  def respond(self, method, path, if_none_match = None):
+    '''Handles a request. Returns `(status, headers, body_chunks)`.'''
+    started = time.perf_counter()
+    try:
+      return self._respond(method, path, if_none_match)
+    finally:
+      elapsed = time.perf_counter() - started
+      with self._lock:
+        self._stats['requests'] += 1
+        self._stats['latency_seconds'] += elapsed
+        if elapsed > self._stats['max_latency_seconds']:
+          self._stats['max_latency_seconds'] = elapsed
+
+  def _not_found(self):
+    with self._lock:
+      self._stats['not_found'] += 1
+    return '404 Not Found', [('Content-Type', 'text/plain')], [b'Not Found']
+
+  def _respond(self, method, path, if_none_match):
+    if method not in ('GET', 'HEAD'):
+      return '405 Method Not Allowed', [('Allow', 'GET, HEAD')], []
+
+    if path == self.stats_path:
+      body = json.dumps(self.stats(), sort_keys = True).encode('utf-8')
+      headers = [
+        ('Content-Type', 'application/json'),
+        ('Content-Length', str(len(body))),
+        ('Cache-Control', 'no-store'),
+      ]
+      return '200 OK', headers, [body] if method == 'GET' else []
+
+    file_name = self.source_file(path)
+    if file_name is None:
+      return self._not_found()
+
+    try:
+      digest, source = self._source_digest(file_name)
+    except OSError:
+      # Removed since it was looked up.
+      return self._not_found()
+    etag = self._etag(file_name, digest)
+
+    if if_none_match is not None and etag in (
+        tag.strip() for tag in if_none_match.split(',')):
+      with self._lock:
+        self._stats['not_modified'] += 1
+      return '304 Not Modified', [('ETag', etag)], []
+
+    with self._lock:
+      page = self._pages.get(etag)
+      if page is not None:
+        self._pages.move_to_end(etag)
+        self._stats['hits'] += 1
+      else:
+        self._stats['misses'] += 1
+    if page is None:
+      try:
+        page = self._render(file_name, source, digest)
+      except OSError:
+        return self._not_found()
+      except yaml.YAMLError as error:
+        # Not cached: there is no tree to render.
+        body = 'Invalid YAML: {0}'.format(error).encode('utf-8')
+        headers = [
+          ('Content-Type', 'text/plain; charset=utf-8'),
+          ('Content-Length', str(len(body))),
+        ]
+        return '500 Internal Server Error', headers, [body] if method == 'GET' else []
+      etag = page.etag
+
+    headers = [
+      ('Content-Type', 'text/html; charset=utf-8'),
+      ('Content-Length', str(len(page.body))),
+      ('ETag', etag),
+    ]
+    body = self._chunks(page.body) if method == 'GET' else []
+    return page.status, headers, body
+
+  def __call__(self, environ, start_response):
+    status, headers, body = self.respond(
+      environ.get('REQUEST_METHOD', 'GET'),
+      environ.get('PATH_INFO', '') or '/',
+      environ.get('HTTP_IF_NONE_MATCH')
+    )
+    start_response(status, headers)
+    return body
+
+  async def asgi(self, scope, receive, send):
+    '''ASGI entry point. Only the `http` scope type is handled.'''
+    if scope['type'] != 'http':
+      return
+    if_none_match = None
+    for name, value in scope.get('headers', []):
+      if name.lower() == b'if-none-match':
+        if_none_match = value.decode('latin-1')
+    status, headers, body = self.respond(
+      scope.get('method', 'GET'),
+      scope.get('path', '') or '/',
+      if_none_match
+    )
+    await send({
+      'type': 'http.response.start',
+      'status': int(status.split(' ', 1)[0]),
+      'headers': [
+        (name.lower().encode('latin-1'), value.encode('latin-1'))
+        for name, value in headers
+      ],
+    })
+    for chunk in body:
+      await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+    await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
@@ -44,6 +44,13 @@ kwarg_defaults = {
   'line_prefix': '',
   'markdown_extras': [],
   'unknown_element_render_style': RENDER_BLOCK,
+  'lazy': False,
+  'minify': False,
+  'max_nodes': 10 ** 7,
+  'max_output_size': 2 ** 28,
+  'include_dir': None,
+  'fragment_cache': None,
+  'components': None,
 }
 
 _render_style_table_suffix = '_render_style'
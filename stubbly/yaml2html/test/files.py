@@ -0,0 +1,11 @@
+'''Helpers for the tests of pages and fragments read from files.'''
+import os
+
+
+def write_file(file_name, source):
+  '''Writes `source` to `file_name`, moving its modification time one
+second on, so that the change is seen even on coarse-grained clocks.'''
+  with open(file_name, 'w') as f:
+    f.write(source)
+  st = os.stat(file_name)
+  os.utime(file_name, ns = (st.st_atime_ns, st.st_mtime_ns + 1000000000))
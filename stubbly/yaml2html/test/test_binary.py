@@ -0,0 +1,146 @@
+from unittest import TestCase
+import doctest
+import struct
+from .. import binary
+from ..binary import dumps, loads, BinaryFormatError
+from ..htyaml import Nodes, NotParsed
+
+
+class TestRoundTrip(TestCase):
+
+  yaml_src = '''
+    - <!DOCTYPE html>
+    - html:
+      - - lang: en
+      - head:
+        - meta: {charset: utf-8}
+        - title: Größe & 𝄞
+      - body:
+        - div:
+          - - id: main
+              class: box
+              data-count: 3
+              data-ratio: 1.5
+              hidden: yes
+              checked: no
+              empty: null
+          - - |
+              Some *markdown* & text
+          - -
+          - p: [one, {b: two}, three]
+          - hr: {width: 75%}
+          - input:
+  '''
+
+  def setUp(self):
+    self.tree = Nodes.parse_yaml(self.yaml_src)
+    self.loaded = loads(dumps(self.tree))
+
+  def test_render(self):
+    for kwargs in ({}, {'markdown': True}, {'minify': True}):
+      with self.subTest(**kwargs):
+        self.assertEqual(self.loaded.render(**kwargs), self.tree.render(**kwargs))
+
+  def test_structure(self):
+    self.assertEqual(type(self.loaded), Nodes)
+    div = self.loaded[1].nodes[1].nodes[0]
+    self.assertEqual(div.tag, 'div')
+    values = dict(
+      (name, value.value) for name, value in div.attributes.attributes.items()
+    )
+    self.assertEqual(values, {
+      'id': 'main', 'class': 'box', 'data-count': 3, 'data-ratio': 1.5,
+      'hidden': True, 'checked': False, 'empty': None
+    })
+    self.assertEqual(type(div.attributes), type(self.tree[1].nodes[1].nodes[0].attributes))
+
+  def test_yaml_node_left_out(self):
+    self.assertIsNone(self.loaded.yaml_node)
+    self.assertIsNone(self.loaded[1].yaml_node)
+
+  def test_stable(self):
+    self.assertEqual(dumps(self.loaded), dumps(self.tree))
+    self.assertEqual(loads(dumps(self.loaded)), self.loaded)
+
+  def test_smaller_than_source(self):
+    self.assertLess(len(dumps(self.tree)), len(self.yaml_src.encode('utf-8')))
+
+  def test_shared_subtrees(self):
+    tree = Nodes.parse_yaml('''
+      - div: &shared
+        - p: [repeated]
+      - div: *shared
+    ''')
+    loaded = loads(dumps(tree))
+    self.assertIs(loaded[0].nodes, loaded[1].nodes)
+    self.assertIn('_shared', loaded[0].nodes.__dict__)
+    self.assertEqual(loaded.render(), tree.render())
+
+  def test_aliased_leaves(self):
+    for yaml_src in (
+      '- &t [text]\n- *t\n',
+      '- &h {hr: }\n- *h\n',
+      '- &l <br>\n- *l\n',
+      '- &t {$table: [[a, b]]}\n- *t\n',
+    ):
+      with self.subTest(yaml_src = yaml_src):
+        tree = Nodes.parse_yaml(yaml_src)
+        self.assertEqual(loads(dumps(tree)).render(), tree.render())
+
+  def test_lazy_nodes(self):
+    tree = Nodes.parse_yaml('- div: [a, {b: c}]', lazy = True)
+    loaded = loads(dumps(tree))
+    self.assertEqual(type(loaded[0].nodes), Nodes)
+    self.assertEqual(loaded.render(), tree.render())
+
+  def test_many_strings(self):
+    tree = Nodes.parse(['item {0}'.format(n) for n in range(70000)])
+    data = dumps(tree)
+    self.assertEqual(struct.unpack_from('<I', data, 8)[0], 4)
+    self.assertEqual(loads(data).render(), tree.render())
+
+  def test_table(self):
+    tree = Nodes.parse_yaml('''
+      - $table:
+          attributes: {class: report}
+          header: [[a, b], [c]]
+          columns: [{}, {class: n}]
+          rows: [[1, <2>], [3]]
+      - $table: []
+    ''')
+    loaded = loads(dumps(tree))
+    self.assertEqual(loaded[0].cells, [['1', '3'], ['<2>', '']])
+    for kwargs in ({}, {'minify': True}):
+      self.assertEqual(loaded.render(**kwargs), tree.render(**kwargs))
+
+
+class TestErrors(TestCase):
+
+  def test_tag_not_a_string(self):
+    with self.assertRaisesRegex(BinaryFormatError, 'tag 5'):
+      dumps(Nodes.parse_yaml('- 5: text'))
+
+  def test_not_parsed(self):
+    with self.assertRaises(BinaryFormatError):
+      dumps(NotParsed(yaml_node = 1, message = 'bad'))
+
+  def test_not_binary(self):
+    with self.assertRaises(BinaryFormatError):
+      loads(b'- p: text\n' * 4)
+
+  def test_version(self):
+    data = bytearray(dumps(Nodes.parse_yaml('- p: text')))
+    data[4] = 99
+    with self.assertRaisesRegex(BinaryFormatError, 'version 99'):
+      loads(bytes(data))
+
+  def test_truncated(self):
+    data = dumps(Nodes.parse_yaml('- p: [text, {b: bold}]'))
+    for length in (0, 10, len(data) - 1):
+      with self.assertRaises(BinaryFormatError):
+        loads(data[:length])
+
+
+def load_tests(loader, tests, ignore):
+  tests.addTests(doctest.DocTestSuite(binary))
+  return tests
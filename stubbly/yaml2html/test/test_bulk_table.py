@@ -0,0 +1,146 @@
+from unittest import TestCase
+import doctest
+import os
+import shutil
+import tempfile
+from .. import bulk_table
+from ..bulk_table import BulkTable
+from ..fragments import FragmentCache
+from ..htyaml import Nodes, NotParsed
+
+
+class TestBulkTable(TestCase):
+
+  def test_rows_only(self):
+    self.assertEqual(
+      Nodes.parse_yaml('- $table: [[a, 1], [b]]').render(),
+      '<table>\n'
+      '  <tbody>\n'
+      '    <tr><td>a</td><td>1</td></tr>\n'
+      '    <tr><td>b</td><td></td></tr>\n'
+      '  </tbody>\n'
+      '</table>'
+    )
+
+  def test_cells_are_columns_of_strings(self):
+    table = Nodes.parse_yaml('- $table: [[a, 1, 1.5], [yes, null, $x]]')[0]
+    self.assertIsInstance(table, BulkTable)
+    self.assertEqual(table.cells, [['a', 'true'], ['1', ''], ['1.5', '$x']])
+
+  def test_header_rows(self):
+    page = Nodes.parse_yaml('''
+      - $table:
+          header_rows: 2
+          rows: [[A, B], [a, b], [1, 2]]
+    ''')
+    self.assertEqual(page[0].header, [['A', 'a'], ['B', 'b']])
+    self.assertEqual(page.render(minify = True), (
+      '<table><thead><tr><th>A</th><th>B</th></tr><tr><th>a</th><th>b</th></tr></thead>'
+      '<tbody><tr><td>1</td><td>2</td></tr></tbody></table>'
+    ))
+
+  def test_several_header_rows(self):
+    page = Nodes.parse_yaml('- $table: {header: [[A, B], [a]], rows: [[1, 2]]}')
+    self.assertEqual(page[0].header, [['A', 'a'], ['B', '']])
+
+  def test_nested(self):
+    self.assertEqual(
+      Nodes.parse_yaml('- div: [$table: {header: [x], rows: [[1]]}]').render(),
+      '<div>\n'
+      '  <table>\n'
+      '    <thead>\n'
+      '      <tr><th>x</th></tr>\n'
+      '    </thead>\n'
+      '    <tbody>\n'
+      '      <tr><td>1</td></tr>\n'
+      '    </tbody>\n'
+      '  </table>\n'
+      '</div>'
+    )
+
+  def test_column_attributes(self):
+    self.assertEqual(
+      Nodes.parse_yaml('''
+        - $table:
+            attributes: {id: t, class: wide}
+            columns: [{class: a}, {class: b, data-x: '"'}]
+            rows: [[1, 2, 3]]
+      ''').render(minify = True),
+      '<table class="wide" id="t"><tbody><tr><td class="a">1</td>'
+      '<td class="b" data-x="&quot;">2</td><td>3</td></tr></tbody></table>'
+    )
+
+  def test_escaping(self):
+    page = Nodes.parse_yaml('- $table: [["<a & b>", "x\\0y"], ["\\"q\\"", ok]]')
+    self.assertEqual(page.render(minify = True), (
+      '<table><tbody><tr><td>&lt;a &amp; b&gt;</td><td>x\0y</td></tr>'
+      '<tr><td>"q"</td><td>ok</td></tr></tbody></table>'
+    ))
+
+  def test_empty(self):
+    self.assertEqual(
+      Nodes.parse_yaml('- $table: []').render(minify = True),
+      '<table><tbody></tbody></table>'
+    )
+
+  def test_errors(self):
+    for yaml_src, message in (
+      ('$table: text', 'list of rows or a mapping'),
+      ('$table: [a, b]', 'rows must be a list of lists'),
+      ('$table: [[{a: b}]]', 'cells must be'),
+      ('$table: {rows: [], csv: a.csv}', 'only one of'),
+      ('$table: {rowz: []}', 'unknown $table option rowz'),
+      ('$table: {header_rows: -1}', 'whole number'),
+      ('$table: {header: [[a], b]}', 'row or a list of rows'),
+      ('$table: {columns: {a: b}}', 'columns must be'),
+    ):
+      with self.subTest(yaml_src = yaml_src):
+        page = Nodes.parse_yaml(yaml_src)
+        self.assertIsInstance(page, NotParsed)
+        self.assertIn(message, page.message)
+
+
+class TestFiles(TestCase):
+
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    with open(os.path.join(self.directory, 'data.csv'), 'w', newline = '') as f:
+      f.write('name,count\r\n"a, b",1\r\nc,"2\r\n3"\r\n')
+    with open(os.path.join(self.directory, 'data.tsv'), 'w') as f:
+      f.write('name\tcount\nx\t<1>\n')
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def parse(self, yaml_src):
+    return Nodes.parse_yaml(yaml_src, include_dir = self.directory)
+
+  def test_csv(self):
+    table = self.parse('- $table: {csv: data.csv, header_rows: 1}')[0]
+    self.assertEqual(table.header, [['name'], ['count']])
+    self.assertEqual(table.cells, [['a, b', 'c'], ['1', '2\r\n3']])
+
+  def test_tsv(self):
+    self.assertEqual(
+      self.parse('- $table: {tsv: data.tsv, header_rows: 1}').render(minify = True),
+      '<table><thead><tr><th>name</th><th>count</th></tr></thead>'
+      '<tbody><tr><td>x</td><td>&lt;1&gt;</td></tr></tbody></table>'
+    )
+
+  def test_missing_file(self):
+    page = self.parse('- $table: {csv: missing.csv}')
+    self.assertIsInstance(page, NotParsed)
+    self.assertIn('cannot read table', page.message)
+
+  def test_dependency(self):
+    page = os.path.join(self.directory, 'page.yaml')
+    with open(page, 'w') as f:
+      f.write('- $table: {csv: data.csv}\n')
+    cache = FragmentCache()
+    cache.parse_file(page)
+    self.assertEqual(cache.dependents(os.path.join(self.directory, 'data.csv')), [page])
+
+
+def load_tests(loader, tests, ignore):
+  tests.addTests(doctest.DocTestSuite(bulk_table))
+  return tests
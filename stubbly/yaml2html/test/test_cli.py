@@ -0,0 +1,147 @@
+from unittest import TestCase
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+from ..cli import main, render_stream, parse_source
+from ..htyaml import LimitExceeded
+
+
+class CLITest(TestCase):
+
+  stream_src = (
+    '- p: one\n'
+    '---\n'
+    '- p: two\n'
+    '---\n'
+    '- div:\n'
+    '  - - three\n'
+  )
+
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.source = os.path.join(self.directory, 'site.yaml')
+    with open(self.source, 'w') as f:
+      f.write(self.stream_src)
+    self.output_dir = os.path.join(self.directory, 'out')
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def run_main(self, *args):
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+      main(list(args))
+    return stdout.getvalue()
+
+  def read(self, name):
+    with open(os.path.join(self.output_dir, name)) as f:
+      return f.read()
+
+  def check_pages(self):
+    self.assertEqual(
+      sorted(os.listdir(self.output_dir)),
+      ['page-0001.html', 'page-0002.html', 'page-0003.html']
+    )
+    self.assertEqual(self.read('page-0001.html'), '<p>one</p>\n')
+    self.assertEqual(self.read('page-0003.html'), '<div>\n  <p>three</p>\n</div>\n')
+
+
+class TestSinglePage(CLITest):
+
+  def test_render(self):
+    source = os.path.join(self.directory, 'page.yaml')
+    with open(source, 'w') as f:
+      f.write('- div:\n  - - "*hi*"\n')
+    self.assertEqual(
+      self.run_main(source),
+      '<div>\n  <p><em>hi</em></p>\n</div>\n'
+    )
+
+  def test_options(self):
+    source = os.path.join(self.directory, 'page.yaml')
+    with open(source, 'w') as f:
+      f.write('- div:\n  - - "*hi*"\n')
+    self.assertEqual(
+      self.run_main('--no-markdown', '--minify', source),
+      '<div>*hi*</div>\n'
+    )
+
+  def test_threads(self):
+    source = os.path.join(self.directory, 'page.yaml')
+    with open(source, 'w') as f:
+      f.write('- div:\n  - - "*hi*"\n')
+    self.assertEqual(
+      self.run_main('--threads', '4', source),
+      '<div>\n  <p><em>hi</em></p>\n</div>\n'
+    )
+
+  def test_include(self):
+    with open(os.path.join(self.directory, 'footer.yaml'), 'w') as f:
+      f.write('- footer: bye\n')
+    source = os.path.join(self.directory, 'page.yaml')
+    with open(source, 'w') as f:
+      f.write('- p: hi\n- $include: footer.yaml\n')
+    self.assertEqual(self.run_main(source), '<p>hi</p>\n<footer>bye</footer>\n')
+
+  def test_json(self):
+    with open(os.path.join(self.directory, 'footer.json'), 'w') as f:
+      f.write('[{"footer": "bye"}]')
+    for name, src in (
+      ('page.json', '[{"p": "hi"}, {"$include": "footer.json"}]'),
+      ('page.txt', ' [{"p": "hi"}, {"$include": "footer.json"}]'),
+      ('page.txt', '[{p: hi}, {$include: footer.json}]'),
+    ):
+      with self.subTest(name = name, src = src):
+        source = os.path.join(self.directory, name)
+        with open(source, 'w') as f:
+          f.write(src)
+        self.assertEqual(self.run_main(source), '<p>hi</p>\n<footer>bye</footer>\n')
+
+  def test_sniffed_json_errors(self):
+    # Valid JSON, but not valid YAML: errors other than decoding errors
+    # must not fall back to YAML.
+    source = ' [{"p": "a\\/b"}, {"p": "c"}]'
+    self.assertEqual(parse_source(source, 'page.txt').render(), '<p>a/b</p>\n<p>c</p>')
+    with self.assertRaises(LimitExceeded):
+      parse_source(source, 'page.txt', max_nodes = 1)
+
+  def test_format(self):
+    source = os.path.join(self.directory, 'page.json')
+    with open(source, 'w') as f:
+      f.write('- p: hi\n')
+    self.assertEqual(self.run_main('--format', 'yaml', source), '<p>hi</p>\n')
+
+
+class TestStream(CLITest):
+
+  def test_serial(self):
+    output = self.run_main('--stream', self.source, '--output-dir', self.output_dir)
+    self.assertEqual(len(output.splitlines()), 3)
+    self.check_pages()
+
+  def test_parallel(self):
+    self.run_main('--stream', self.source, '--output-dir', self.output_dir, '--jobs', '2')
+    self.check_pages()
+
+  def test_name_template(self):
+    os.mkdir(self.output_dir)
+    with open(self.source) as stream:
+      paths = list(render_stream(stream, self.output_dir, name_template = '{index}.html'))
+    self.assertEqual(
+      [os.path.basename(path) for path in paths],
+      ['1.html', '2.html', '3.html']
+    )
+
+  def test_json_lines(self):
+    source = os.path.join(self.directory, 'site.jsonl')
+    with open(source, 'w') as f:
+      f.write('[{"p": "one"}]\n\n[{"p": "two"}]\n[{"div": [["three"]]}]\n')
+    self.run_main('--stream', source, '--output-dir', self.output_dir)
+    self.check_pages()
+
+  def test_output_dir_required(self):
+    with contextlib.redirect_stderr(io.StringIO()):
+      with self.assertRaises(SystemExit):
+        main(['--stream', self.source])
@@ -0,0 +1,137 @@
+from unittest import TestCase
+import doctest
+from .. import components
+from ..components import ComponentRegistry
+from ..htyaml import Nodes, NotParsed, LimitExceeded
+
+
+class ComponentTest(TestCase):
+
+  def setUp(self):
+    self.calls = []
+    self.registry = ComponentRegistry()
+
+    def badge(content, kind = 'info'):
+      self.calls.append((content, kind))
+      return {'span': [[{'class': 'badge ' + kind}], content]}
+
+    self.registry.register('badge', badge)
+    self.registry.register('card', '''
+      div:
+        - - class: card
+        - h3: $title
+        - $content
+    ''')
+
+  def parse(self, yaml_src, **kwargs):
+    return Nodes.parse_yaml(yaml_src, components = self.registry, **kwargs)
+
+
+class TestComponents(ComponentTest):
+
+  def test_python_component(self):
+    self.assertEqual(
+      self.parse('- p: [Status, {badge: {content: new, kind: ok}}]').render(),
+      '<p>Status <span class="badge ok">new</span></p>'
+    )
+
+  def test_dollar_text(self):
+    self.registry.register('price', '''
+      p:
+        - $$5 off
+        - $quote-as-strings
+        - $content
+    ''')
+    self.assertEqual(
+      self.parse('- price: today').render(),
+      '<p>$5 off $quote-as-strings today</p>'
+    )
+
+  def test_content_argument(self):
+    self.assertEqual(self.parse('- badge: new').render(), '<span class="badge info">new</span>')
+
+  def test_yaml_component(self):
+    self.assertEqual(
+      self.parse('- card: {title: Hi, content: {p: body}}').render(),
+      '<div class="card">\n  <h3>Hi</h3>\n  <p>body</p>\n</div>'
+    )
+
+  def test_nested_components(self):
+    page = self.parse('- card: {title: Hi, content: {badge: new}}')
+    self.assertIn('<span class="badge info">new</span>', page.render())
+
+  def test_memoized(self):
+    page = self.parse('''
+      - badge: new
+      - badge: new
+      - badge: old
+      - badge: {content: new, kind: info}
+    ''')
+    self.assertEqual(self.calls, [('new', 'info'), ('old', 'info'), ('new', 'info')])
+    self.assertIs(page[0], page[1])
+    self.assertIn('_shared', page[0].__dict__)
+    again = self.parse('- badge: new')
+    self.assertIs(again[0], page[0])
+    self.assertEqual(len(self.calls), 3)
+
+  def test_register_clears_expansions(self):
+    first = self.parse('- badge: new')
+    self.registry.register('badge', lambda content: {'b': content})
+    self.assertEqual(self.parse('- badge: new').render(), '<b>new</b>')
+    self.assertNotEqual(first.render(), '<b>new</b>')
+
+  def test_unhashable_arguments(self):
+    self.registry.register('box', lambda content: {'div': content})
+    self.assertEqual(
+      self.parse('- box: [[id: a], text]').render(),
+      '<div id="a">text</div>'
+    )
+
+  def test_max_expansions(self):
+    registry = ComponentRegistry(max_expansions = 2)
+    registry.register('bold', lambda content: {'b': content})
+    Nodes.parse_yaml('[bold: one, bold: two, bold: three]', components = registry)
+    self.assertEqual(len(registry._expansions), 2)
+
+  def test_not_registered_without_registry(self):
+    self.assertEqual(Nodes.parse_yaml('- badge: new').render(), '<badge>new</badge>')
+
+
+class TestErrors(ComponentTest):
+
+  def test_missing_argument(self):
+    page = self.parse('- card: {title: Hi}')
+    self.assertIsInstance(page, NotParsed)
+    self.assertIn('component card needs argument content', page.message)
+
+  def test_python_component_arguments(self):
+    for yaml_src, message in (
+      ('- badge: {level: 1}', "missing a required argument: 'content'"),
+      ('- badge: {content: x, level: 1}', "got an unexpected keyword argument 'level'"),
+    ):
+      with self.subTest(yaml_src = yaml_src):
+        page = self.parse(yaml_src)
+        self.assertIsInstance(page, NotParsed)
+        self.assertIn('component badge: ' + message, page.message)
+    self.assertEqual(self.calls, [])
+
+  def test_expands_to_itself(self):
+    self.registry.register('loop', lambda content: {'loop': content})
+    self.assertIsInstance(self.parse('- loop: x'), NotParsed)
+
+  def test_expands_to_itself_unhashable(self):
+    self.registry.register('loop', lambda content: {'loop': content})
+    page = self.parse('- loop: !!set {x}')
+    self.assertIsInstance(page, NotParsed)
+    self.assertIn('component loop expands to itself', page.message)
+
+  def test_max_nodes(self):
+    self.registry.register('many', lambda: [{'p': str(n)} for n in range(10)])
+    self.parse('- many:', max_nodes = 30)
+    with self.assertRaises(LimitExceeded):
+      self.parse('[many:, many:, many:]', max_nodes = 30)
+
+
+def load_tests(loader, tests, ignore):
+  tests.addTests(doctest.DocTestSuite(components))
+  return tests
@@ -0,0 +1,138 @@
+from unittest import TestCase, skipUnless
+import doctest
+from xml.etree import ElementTree
+from .. import etree
+from ..etree import to_etree
+from ..htyaml import Nodes, ParseError
+
+try:
+  import lxml.html
+except ImportError:
+  lxml = None
+
+
+def tostring(element):
+  return ElementTree.tostring(element, encoding = 'unicode', method = 'html')
+
+
+PAGE = '''
+- <!DOCTYPE html>
+- html:
+  - head:
+    - title: [[A & B]]
+    - link: {rel: stylesheet, href: /a.css}
+  - body:
+    - div:
+      - - id: main
+          class: box
+      - h1: Title
+      - p: [one, {b: two}, three]
+      - p: [{data-n: 3, hidden: true}, Some <i>literal</i> markup]
+      - - escaped <text> &
+      - ul:
+        - li: first
+        - li: [second, {br: }, line]
+      - hr:
+'''
+
+
+class TestToEtree(TestCase):
+
+  def test_same_as_minified_render(self):
+    page = Nodes.parse_yaml(PAGE)
+    html = tostring(to_etree(page, lxml = False))
+    self.assertEqual(
+      '<!DOCTYPE html>' + html,
+      page.render(minify = True)
+    )
+
+  def test_single_element(self):
+    root = to_etree(Nodes.parse_yaml(PAGE), lxml = False)
+    self.assertEqual(root.tag, 'html')
+    self.assertIsNone(root.tail)
+    self.assertEqual(root.find('.//div').attrib, {'class': 'box', 'id': 'main'})
+    self.assertEqual(root.find('.//title').text, 'A & B')
+
+  def test_wrapper(self):
+    page = Nodes.parse_yaml('- p: one\n- p: two\n')
+    self.assertEqual(tostring(to_etree(page, lxml = False)), '<div><p>one</p><p>two</p></div>')
+    self.assertEqual(
+      tostring(to_etree(page, wrapper = 'body', lxml = False)),
+      '<body><p>one</p><p>two</p></body>'
+    )
+    self.assertEqual(tostring(to_etree(Nodes.parse_yaml('- text'), lxml = False)), '<div>text</div>')
+
+  def test_markdown(self):
+    page = Nodes.parse_yaml('- div:\n  - - "Some *text* &amp; [a link](/x)\\n\\nmore"\n')
+    root = to_etree(page, markdown = True, lxml = False)
+    self.assertEqual([p.tag for p in root], ['p', 'p'])
+    self.assertEqual(root.find('p/a').get('href'), '/x')
+    self.assertEqual(tostring(root), page.render(markdown = True, minify = True))
+
+  def test_unclosed_literal_markup(self):
+    # Each literal is a fragment of its own.
+    root = to_etree(Nodes.parse_yaml('- p: [<b>bold, text</i>]'), lxml = False)
+    self.assertEqual(tostring(root), '<p><b>bold</b> text</p>')
+
+  def test_table(self):
+    page = Nodes.parse_yaml('''
+      - $table:
+          attributes: {class: t}
+          header: [x, y]
+          columns: [{class: a}]
+          rows: [[1, <2>]]
+    ''')
+    self.assertEqual(tostring(to_etree(page, lxml = False)), page.render(minify = True))
+
+  def test_method(self):
+    page = Nodes.parse_yaml('- p: one')
+    self.assertEqual(tostring(page.to_etree(lxml = False)), '<p>one</p>')
+    self.assertEqual(tostring(page[0].to_etree(lxml = False)), '<p>one</p>')
+
+  def test_not_parsed(self):
+    page = Nodes.parse_yaml('- div: [[a, b]]\n- 3\n')
+    with self.assertRaises(ParseError):
+      to_etree(page, lxml = False)
+
+  def test_lazy(self):
+    page = Nodes.parse_yaml(PAGE, lazy = True)
+    self.assertEqual(
+      tostring(to_etree(page, lxml = False)),
+      tostring(to_etree(Nodes.parse_yaml(PAGE), lxml = False))
+    )
+
+  @skipUnless(lxml, 'lxml is not installed')
+  def test_lxml(self):
+    page = Nodes.parse_yaml(PAGE)
+    root = to_etree(page, lxml = True)
+    self.assertIsInstance(root, lxml.html.HtmlElement)
+    self.assertEqual(
+      lxml.html.tostring(root, encoding = 'unicode'),
+      tostring(to_etree(page, lxml = False))
+    )
+
+  @skipUnless(lxml, 'lxml is not installed')
+  def test_lxml_fragments(self):
+    page = Nodes.parse_yaml('''
+      - div:
+        - - "Some *text* &amp; [a link](/x)\\n\\nmore"
+        - p: [<b>bold, text</i>, plain]
+        - $table:
+            header: [x, y]
+            rows: [[1, <2>]]
+    ''')
+    root = to_etree(page, markdown = True, lxml = True)
+    self.assertEqual(root.find('p/a').get('href'), '/x')
+    self.assertEqual(
+      lxml.html.tostring(root, encoding = 'unicode'),
+      tostring(to_etree(page, markdown = True, lxml = False))
+    )
+
+  @skipUnless(lxml, 'lxml is not installed')
+  def test_lxml_default(self):
+    self.assertIsInstance(to_etree(Nodes.parse_yaml('- p: one')), lxml.html.HtmlElement)
+
+
+def load_tests(loader, tests, ignore):
+  tests.addTests(doctest.DocTestSuite(etree))
+  return tests
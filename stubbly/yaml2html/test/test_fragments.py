@@ -0,0 +1,174 @@
+from unittest import TestCase
+import doctest
+import os
+import shutil
+import tempfile
+import threading
+from .. import fragments
+from ..fragments import FragmentCache
+from ..components import ComponentRegistry
+from ..htyaml import HTYAML, NotParsed, LimitExceeded
+from ..incremental import PreviewSession
+from .files import write_file
+
+
+class FragmentTest(TestCase):
+
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.cache = FragmentCache()
+    os.mkdir(self.path('parts'))
+    self.write('parts/head.yaml', '- header:\n  - h1: Site\n  - $include: nav.yaml\n')
+    self.write('parts/nav.yaml', '- nav: [a: home]\n')
+    self.write('parts/footer.yaml', '- footer: (c)\n')
+    self.write('page.yaml', '- $include: parts/head.yaml\n- p: one\n- $include: parts/footer.yaml\n')
+    self.write('other.yaml', '- p: two\n- $include: parts/footer.yaml\n')
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def path(self, name):
+    return os.path.join(self.directory, name)
+
+  def write(self, name, source):
+    write_file(self.path(name), source)
+
+  def parse(self, name, **kwargs):
+    return self.cache.parse_file(self.path(name), **kwargs)
+
+
+class TestInclude(FragmentTest):
+
+  def test_render(self):
+    self.assertEqual(self.parse('page.yaml').render(), (
+      '<header>\n'
+      '  <h1>Site</h1>\n'
+      '  <nav><a>home</a></nav>\n'
+      '</header>\n'
+      '<p>one</p>\n'
+      '<footer>(c)</footer>'
+    ))
+    self.assertEqual(
+      self.parse('page.yaml').render(minify = True),
+      '<header><h1>Site</h1><nav><a>home</a></nav></header><p>one</p><footer>(c)</footer>'
+    )
+
+  def test_shared(self):
+    page = self.parse('page.yaml')
+    other = self.parse('other.yaml')
+    self.assertIs(page[2], other[1])
+    self.assertIn('_shared', page[2].__dict__)
+
+  def test_include_dir(self):
+    page = HTYAML.parse_yaml(
+      '- $include: footer.yaml',
+      include_dir = self.path('parts'),
+      fragment_cache = self.cache
+    )
+    self.assertEqual(page.render(), '<footer>(c)</footer>')
+
+  def test_changed_fragment(self):
+    self.parse('page.yaml')
+    self.write('parts/nav.yaml', '- nav: [a: start]\n')
+    self.assertIn('<a>start</a>', self.parse('page.yaml').render())
+
+  def test_dependents(self):
+    self.parse('page.yaml')
+    self.parse('other.yaml')
+    self.assertEqual(self.cache.dependents(self.path('parts/nav.yaml')), [self.path('page.yaml')])
+    self.assertEqual(
+      self.cache.dependents(self.path('parts/footer.yaml')),
+      [self.path('other.yaml'), self.path('page.yaml')]
+    )
+    self.write('page.yaml', '- p: no includes\n')
+    self.parse('page.yaml')
+    self.assertEqual(self.cache.dependents(self.path('parts/nav.yaml')), [])
+
+  def test_missing(self):
+    self.write('page.yaml', '- $include: missing.yaml\n')
+    page = self.parse('page.yaml')
+    self.assertIsInstance(page, NotParsed)
+    self.assertIn('cannot include missing.yaml', page.message)
+
+  def test_invalid_yaml(self):
+    self.write('parts/bad.yaml', '- p: [unclosed\n')
+    self.write('page.yaml', '- $include: parts/bad.yaml\n')
+    page = self.parse('page.yaml')
+    self.assertIsInstance(page, NotParsed)
+    self.assertIn('cannot include parts/bad.yaml', page.message)
+
+  def test_outside_include_dir(self):
+    self.write('parts/up.yaml', '- $include: ../other.yaml\n')
+    for path in ('../page.yaml', 'parts/../../page.yaml', self.path('other.yaml'), 'parts/up.yaml'):
+      self.write('page.yaml', '- $include: {0}\n'.format(path))
+      page = self.parse('page.yaml')
+      self.assertIsInstance(page, NotParsed, path)
+      self.assertIn('outside', page.message)
+    self.write('page.yaml', '- $include: parts/../parts/footer.yaml\n')
+    self.assertEqual(self.parse('page.yaml').render(), '<footer>(c)</footer>')
+
+  def test_table_outside_include_dir(self):
+    self.write('secret.csv', 'secret\n')
+    for source in (
+      '- $table: {csv: ../secret.csv}\n',
+      '- $table: {csv: "' + self.path('secret.csv') + '"}\n',
+    ):
+      self.write('parts/table.yaml', source)
+      self.write('page.yaml', '- $include: parts/table.yaml\n')
+      page = self.parse('page.yaml')
+      self.assertIsInstance(page, NotParsed, source)
+      self.assertIn('outside', page.message)
+    self.write('parts/data.csv', 'a,b\n')
+    self.write('parts/table.yaml', '- $table: {csv: data.csv}\n')
+    self.assertIn('<td>a</td>', self.parse('page.yaml').render())
+
+  def test_not_a_file_name(self):
+    self.write('page.yaml', '- $include: [a, b]\n')
+    self.assertIn('needs a file name', self.parse('page.yaml').message)
+
+  def test_includes_itself(self):
+    self.write('parts/nav.yaml', '- $include: head.yaml\n')
+    page = self.parse('page.yaml')
+    self.assertIsInstance(page, NotParsed)
+
+  def test_components(self):
+    registry = ComponentRegistry()
+    registry.register('alert', lambda content: {'p': [[{'class': 'alert'}], content]})
+    self.write('parts/alert.yaml', '- alert: hi\n')
+    self.write('page.yaml', '- $include: parts/alert.yaml\n- alert: there\n')
+    self.assertEqual(
+      self.parse('page.yaml', components = registry).render(minify = True),
+      '<p class="alert">hi</p><p class="alert">there</p>'
+    )
+    self.assertEqual(
+      self.parse('page.yaml').render(minify = True),
+      '<alert>hi</alert><alert>there</alert>'
+    )
+
+  def test_max_nodes(self):
+    with self.assertRaises(LimitExceeded):
+      self.parse('page.yaml', max_nodes = 5)
+
+  def test_preview_session(self):
+    session = PreviewSession(include_dir = self.directory, fragment_cache = self.cache)
+    with open(self.path('page.yaml')) as f:
+      source = f.read()
+    html = session.update(source).html
+    self.assertEqual(html, self.parse('page.yaml').render())
+
+  def test_threads(self):
+    results = []
+    def parse():
+      for _ in range(20):
+        results.append(self.parse('page.yaml').render())
+    threads = [threading.Thread(target = parse) for _ in range(8)]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+    self.assertEqual(len(set(results)), 1)
+
+
+def load_tests(loader, tests, ignore):
+  tests.addTests(doctest.DocTestSuite(fragments))
+  return tests
@@ -1,11 +1,14 @@
 from unittest import TestCase
 import doctest
+import yaml
 from .. import htyaml
 from ..htyaml import HTYAML, NotParsed, Literal, EmptyElement,\
   ElementWithContent, AttributeValue, UnambiguousAttributes,\
   PotentiallyAmbiguousAttributes, Attributes, \
-  Text, EscapableText, Element, Node, Nodes
+  Text, EscapableText, Element, Node, Nodes, LazyNodes, ParseError,\
+  LimitExceeded, load_page
 
+from ...yaml_tags import Symbol, EscapedDollar
 from ..settings import RENDER_INLINE, RENDER_BLOCK,\
   RENDER_ACCORDING_TO_CHILDREN
 
@@ -44,7 +47,17 @@ class TestNotParsed(TestCase):
         yaml_node = 'foo',
         message = 'bad node'
       ).render(),
-      'Could not parse:\nfoo\n...\n\nbad node'
+      # libyaml leaves out the '...' document end marker
+      'Could not parse:\nfoo\n' + ('' if yaml.__with_libyaml__ else '...\n') + '\nbad node'
+    )
+
+  def test_render_stubbly_objects(self):
+    self.assertEqual(
+      NotParsed(
+        yaml_node = {Symbol('$code'): [EscapedDollar('$$x'), '$y']},
+        message = 'bad node'
+      ).render(),
+      "Could not parse:\n$code:\n- $$x\n- '$y'\n\nbad node"
     )
 
 class TestLiteral(TestCase):
@@ -627,6 +640,23 @@ class TestNode(ParserRendererTest):
     actual = Node.parse([])
     self.assertEqual(expected, actual)
 
+  def test_dollar_text(self):
+    self.check_rendering(Nodes, '- p: $5 off', '<p>$5 off</p>')
+    self.check_rendering(Nodes, '- - $$ money', '$$ money')
+    self.check_rendering(Nodes, '- $quote-as-strings', '$quote-as-strings')
+
+  def test_dollar_attribute(self):
+    self.check_rendering(
+      Nodes,
+      '- a: [[href: $x], link]',
+      '<a href="$x">link</a>'
+    )
+    self.check_rendering(Nodes, '- img: {alt: $$}', '<img alt="$$">')
+
+  def test_bad_attribute_value(self):
+    self.assertIsInstance(PotentiallyAmbiguousAttributes.parse_yaml('{alt: [a]}'), NotParsed)
+    self.assertIsInstance(Node.parse_yaml('a: [{href: [a], id: b}, link]'), NotParsed)
+
 
 class TestNodes(ParserRendererTest):
 
@@ -755,6 +785,189 @@ class TestNodes(ParserRendererTest):
     self.assertEqual(list(Nodes(nodes = [1, 2, 3])), [1, 2, 3])
 
 
+class TestLazyNodes(ParserRendererTest):
+
+  yaml_src = (
+    '- head:\n'
+    '  - title: Test page\n'
+    '- body:\n'
+    '  - div:\n'
+    '    - p: content\n'
+  )
+
+  def test_children_not_parsed_until_accessed(self):
+    page = Nodes.parse_yaml(self.yaml_src, lazy = True)
+    body = page[1]
+    self.assertIsInstance(body.nodes, LazyNodes)
+    self.assertNotIn('_nodes', body.nodes.__dict__)
+    div = body.nodes[0]
+    self.assertIn('_nodes', body.nodes.__dict__)
+    self.assertNotIn('_nodes', div.nodes.__dict__)
+
+  def test_render_same_as_eager(self):
+    eager = Nodes.parse_yaml(self.yaml_src).render(markdown = True)
+    lazy = Nodes.parse_yaml(self.yaml_src, lazy = True).render(markdown = True)
+    self.assertEqual(eager, lazy)
+
+  def test_error_raised_on_render(self):
+    page = Nodes.parse_yaml('- div: [99]', lazy = True)
+    with self.assertRaises(ParseError) as context_manager:
+      page.render()
+    self.assertEqual(
+      context_manager.exception.not_parsed,
+      NotParsed(message = 'Node: not a valid HTML node', yaml_node = 99)
+    )
+
+  def test_eager_parse_fails_immediately(self):
+    self.assertIsInstance(Nodes.parse_yaml('- div: [99]'), NotParsed)
+
+class TestMinify(ParserRendererTest):
+
+  def test_empty_element(self):
+    self.check_rendering(Nodes, 'hr: {width: 75%}', '<hr width="75%">', minify = True)
+
+  def test_no_indentation_or_newlines(self):
+    self.check_rendering(
+      Nodes,
+      '''
+      html:
+       - - lang: en
+       - head:
+          - title: Hello, world!
+       - body:
+          - h1: Hello, world!
+          - This is my first web page.
+      ''',
+      ('<html lang="en"><head><title>Hello, world!</title></head>'
+       '<body><h1>Hello, world!</h1>This is my first web page.</body></html>'),
+      minify = True
+    )
+
+  def test_space_kept_between_inline_nodes(self):
+    self.check_rendering(
+      Nodes,
+      '''
+      p:
+        - Some text
+        - a: a link
+        - - more & text
+      ''',
+      '<p>Some text <a>a link</a> more &amp; text</p>',
+      minify = True
+    )
+
+  def test_multiline_text_not_prefixed(self):
+    self.check_rendering(
+      Nodes,
+      '''
+      div:
+        - pre: "line one\\nline two"
+      ''',
+      '<div><pre>line one\nline two</pre></div>',
+      minify = True
+    )
+
+  def test_markdown(self):
+    self.check_rendering(
+      Nodes,
+      '''
+      div:
+        - - "*hi*"
+        - - there
+      ''',
+      '<div><p><em>hi</em></p><p>there</p></div>',
+      markdown = True,
+      minify = True
+    )
+
+class TestAliases(ParserRendererTest):
+
+  yaml_src = '''
+    - nav: &nav
+      - ul:
+        - li: one
+        - li: two
+    - body:
+      - div: *nav
+      - div: *nav
+  '''
+
+  def bomb(self, levels):
+    src = '- &l0 {p: lol}\n'
+    for level in range(1, levels):
+      aliases = ', '.join(['*l%d' % (level - 1)] * 10)
+      src += '- &l%d {div: [%s]}\n' % (level, aliases)
+    return src
+
+  def test_aliased_subtree_is_parsed_once(self):
+    page = Nodes.parse_yaml(self.yaml_src)
+    nav = page[0].nodes
+    body = page[1].nodes
+    self.assertIs(body[0].nodes, nav)
+    self.assertIs(body[1].nodes, nav)
+
+  def test_rendering_matches_expanded_document(self):
+    expanded = Nodes.parse_yaml(
+      self.yaml_src.replace('&nav', '').replace('*nav', '[{ul: [{li: one}, {li: two}]}]')
+    )
+    aliased = Nodes.parse_yaml(self.yaml_src)
+    self.assertEqual(expanded.render(), aliased.render())
+    self.assertEqual(expanded.render(minify = True), aliased.render(minify = True))
+
+  def test_shared_render_depends_on_options(self):
+    page = Nodes.parse_yaml(self.yaml_src)
+    pretty = page.render()
+    self.assertEqual(
+      page.render(minify = True),
+      '<nav><ul><li>one</li><li>two</li></ul></nav>'
+      '<body><div><ul><li>one</li><li>two</li></ul></div>'
+      '<div><ul><li>one</li><li>two</li></ul></div></body>'
+    )
+    self.assertEqual(page.render(), pretty)
+
+  def test_max_nodes(self):
+    with self.assertRaises(LimitExceeded):
+      Nodes.parse_yaml(self.bomb(4), max_nodes = 1000)
+    Nodes.parse_yaml(self.bomb(3), max_nodes = 1000)
+
+  def test_default_max_nodes_stops_alias_bomb(self):
+    with self.assertRaises(LimitExceeded):
+      Nodes.parse_yaml(self.bomb(9))
+
+  def test_max_output_size(self):
+    page = Nodes.parse_yaml(self.bomb(4), max_nodes = None)
+    with self.assertRaises(LimitExceeded):
+      page.render(max_output_size = 1000)
+    with self.assertRaises(LimitExceeded):
+      page.render(max_output_size = 1000, minify = True)
+
+  def test_recursive_alias(self):
+    page = Nodes.parse_yaml('&a {div: [*a]}')
+    self.assertEqual(
+      page.message,
+      'Node: not a valid HTML node'
+    )
+
+  def test_anchors_detected(self):
+    self.assertEqual(load_page('[{p: x}, {p: x}]'), ([{'p': 'x'}, {'p': 'x'}], False))
+    self.assertTrue(load_page(self.yaml_src)[1])
+
+  def test_no_memo_without_anchors(self):
+    page = Nodes.parse_yaml('- div: [p: x]', lazy = True)
+    self.assertIsNone(page[0].nodes._parse_kwargs['parse_state'].memo)
+    page = Nodes.parse_yaml(self.yaml_src, lazy = True)
+    self.assertIsNotNone(page[0].nodes._parse_kwargs['parse_state'].memo)
+
+  def test_shared_python_objects(self):
+    nav = {'ul': [{'li': 'one'}]}
+    page = Nodes.parse([{'div': [nav]}, {'div': [nav]}])
+    self.assertIs(page[0].nodes[0], page[1].nodes[0])
+
+  def test_anchors_per_document(self):
+    first, second = HTYAML.parse_yaml_all('- p: x\n---\n- &a {p: y}\n- *a\n')
+    self.assertEqual(first.render(), '<p>x</p>')
+    self.assertIs(second[0], second[1])
+
 
 def load_tests(loader, tests, ignore):
   tests.addTests(doctest.DocTestSuite(htyaml))
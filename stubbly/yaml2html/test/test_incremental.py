@@ -0,0 +1,156 @@
+from unittest import TestCase
+import doctest
+import yaml
+from .. import incremental
+from ..incremental import PreviewSession, Fragment
+from ..htyaml import HTYAML, NotParsed, LimitExceeded
+
+
+PAGE = '''\
+- <!DOCTYPE html>
+- html:
+  - - lang: en
+  - head:
+    - title: Preview
+  - body:
+    # A comment between items.
+    - div:
+      - - class: intro
+      - - |
+          Some *markdown*
+
+          in two paragraphs.
+      - p: [one, {b: two}]
+
+    - ul:
+      - li: first
+      - li: second
+    - hr:
+'''
+
+
+class TestPreviewSession(TestCase):
+
+  def check(self, session, source):
+    update = session.update(source)
+    kwargs = session.kwargs
+    self.assertEqual(session.tree, HTYAML.parse_yaml(source, **kwargs))
+    self.assertEqual(update.html, HTYAML.parse_yaml(source, **kwargs).render(**kwargs))
+    return update
+
+  def test_edits(self):
+    edits = [
+      PAGE,
+      PAGE.replace('first', 'the first'),
+      PAGE.replace('      - li: second\n', ''),
+      PAGE.replace('class: intro', 'class: intro wide'),
+      PAGE.replace('in two', 'in 2'),
+      PAGE.replace('- p: [one, {b: two}]', '- p: [one, {i: two}]'),
+      PAGE.replace('    - hr:\n', '    - hr:\n    - p: added\n'),
+      PAGE.replace('- div:', '- section:'),
+      PAGE,
+    ]
+    for kwargs in ({}, {'markdown': True}, {'minify': True}, {'lazy': True}):
+      with self.subTest(**kwargs):
+        session = PreviewSession(**kwargs)
+        for source in edits:
+          self.check(session, source)
+
+  def test_nodes_reused(self):
+    session = PreviewSession()
+    session.update(PAGE)
+    head = session.tree[1].nodes[0]
+    ul = session.tree[1].nodes[1].nodes[1]
+    session.update(PAGE.replace('first', 'the first'))
+    self.assertIs(session.tree[1].nodes[0], head)
+    self.assertIsNot(session.tree[1].nodes[1].nodes[1], ul)
+    self.assertIs(session.tree[1].nodes[1].nodes[1].nodes[1], ul.nodes[1])
+
+  def test_fragments(self):
+    session = PreviewSession()
+    first = session.update('- h1: Title\n- p: one\n- p: two\n')
+    self.assertTrue(first.complete)
+    self.assertEqual(first.fragments, [])
+    update = session.update('- h1: Title\n- p: one\n- p: three\n')
+    self.assertFalse(update.complete)
+    self.assertEqual(update.fragments, [Fragment(2, '<p>three</p>')])
+    update = session.update('- h1: Title\n- p: one\n- p: three\n')
+    self.assertEqual(update.fragments, [])
+    update = session.update('- h1: Title\n- p: one\n')
+    self.assertTrue(update.complete)
+
+  def test_inline_fragments(self):
+    session = PreviewSession(line_prefix = '  ')
+    session.update('- a\n- b: b\n')
+    update = session.update('- a\n- b: c\n')
+    self.assertEqual(update.html, 'a <b>c</b>')
+    self.assertEqual(update.fragments, [Fragment(1, '<b>c</b>')])
+
+  def test_fallbacks(self):
+    for source in (
+      'p: not a sequence',
+      '---\n- p: document start\n',
+      '- div: &a\n  - p: shared\n- div: *a\n',
+      '- div:\n  - p: &a anchored\n  - p: *a\n',
+      '- p: "a quoted\n- string"\n',
+      '',
+    ):
+      with self.subTest(source = source):
+        session = PreviewSession()
+        self.check(session, PAGE)
+        update = self.check(session, source)
+        self.assertTrue(update.complete)
+        self.check(session, PAGE)
+
+  def test_anchor_defined_twice(self):
+    for source in (
+      '- &a {p: x}\n- p: one\n- &a {p: y}\n',
+      '- div:\n  - &a {p: x}\n- div:\n  - p: one\n  - &a {p: y}\n',
+    ):
+      with self.subTest(source = source):
+        session = PreviewSession()
+        self.check(session, '- &a {p: x}\n- p: one\n')
+        try:
+          expected = HTYAML.parse_yaml(source).render()
+        except yaml.YAMLError as error:
+          with self.assertRaises(type(error)):
+            session.update(source)
+        else:
+          self.assertEqual(session.update(source).html, expected)
+        self.check(session, '- &a {p: x}\n- p: one\n')
+
+  def test_not_parsed(self):
+    session = PreviewSession()
+    self.check(session, PAGE)
+    update = self.check(session, PAGE.replace('- li: first', '- li: [first, {a: x, b: y}]'))
+    self.assertIsInstance(session.tree, NotParsed)
+    self.assertTrue(update.complete)
+    self.check(session, PAGE)
+
+  def test_not_parsed_repeated_items(self):
+    session = PreviewSession()
+    self.check(session, '- div:\n  - p: [a]\n  - p: [a]\n')
+    update = self.check(session, '- div:\n  - p: [a]\n  - p: [a]\n  - 3\n')
+    self.assertNotIn('&id', update.html)
+    self.check(session, '- div:\n  - p: [a]\n  - p: [a]\n')
+
+  def test_yaml_error(self):
+    session = PreviewSession()
+    self.check(session, PAGE)
+    with self.assertRaises(yaml.YAMLError):
+      session.update(PAGE + '- p: [unclosed\n')
+    self.assertEqual(session.source, PAGE)
+    update = session.update(PAGE.replace('first', 'the first'))
+    self.assertFalse(update.complete)
+
+  def test_max_nodes(self):
+    session = PreviewSession(max_nodes = 5)
+    with self.assertRaises(LimitExceeded):
+      session.update('- div: [a, b, c, d, e, f]\n')
+    update = session.update('- p: one\n- p: two\n- p: three\n')
+    self.assertEqual(update.html, '<p>one</p>\n<p>two</p>\n<p>three</p>')
+
+
+def load_tests(loader, tests, ignore):
+  tests.addTests(doctest.DocTestSuite(incremental))
+  return tests
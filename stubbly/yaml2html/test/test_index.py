@@ -0,0 +1,110 @@
+from unittest import TestCase
+import doctest
+from .. import index
+from ..htyaml import Nodes
+
+
+class TestElementIndex(TestCase):
+
+  yaml_src = '''
+    - html:
+      - head:
+        - link: {rel: stylesheet, href: style.css}
+      - body:
+        - div:
+          - - id: nav
+              class: menu top
+          - a:
+            - - href: /one
+            - One
+          - a:
+            - - href: /two
+                class: current
+            - Two
+        - p:
+          - - class: menu
+          - text
+        - IMG: {src: pic.png, alt: null}
+  '''
+
+  def setUp(self):
+    self.page = Nodes.parse_yaml(self.yaml_src)
+
+  def tags(self, elements):
+    return [element.tag for element in elements]
+
+  def test_index_built_once(self):
+    self.assertIs(self.page.element_index(), self.page.element_index())
+
+  def test_index_does_not_affect_equality(self):
+    other = Nodes.parse_yaml(self.yaml_src)
+    self.page.element_index()
+    self.assertEqual(self.page, other)
+
+  def test_all_elements_in_document_order(self):
+    self.assertEqual(
+      self.tags(self.page.find_all()),
+      ['html', 'head', 'link', 'body', 'div', 'a', 'a', 'p', 'IMG']
+    )
+
+  def test_by_id(self):
+    self.assertEqual(self.page.get_element_by_id('nav').tag, 'div')
+    self.assertIsNone(self.page.get_element_by_id('missing'))
+
+  def test_by_tag_is_case_insensitive(self):
+    self.assertEqual(self.tags(self.page.find_all(tag = 'img')), ['IMG'])
+
+  def test_by_class_token(self):
+    self.assertEqual(self.tags(self.page.find_all(class_name = 'menu')), ['div', 'p'])
+    self.assertEqual(self.tags(self.page.find_all(class_name = 'top')), ['div'])
+
+  def test_by_attribute_presence(self):
+    self.assertEqual(
+      self.tags(self.page.find_all(attribute = 'href')),
+      ['link', 'a', 'a']
+    )
+
+  def test_by_attribute_value(self):
+    self.assertEqual(
+      self.tags(self.page.find_all(attribute = 'href', value = '/two')),
+      ['a']
+    )
+
+  def test_by_null_attribute_value(self):
+    self.assertEqual(
+      self.tags(self.page.find_all(attribute = 'alt', value = None)),
+      ['IMG']
+    )
+
+  def test_combined_conditions(self):
+    self.assertEqual(
+      self.tags(self.page.find_all(tag = 'a', class_name = 'current')),
+      ['a']
+    )
+    self.assertEqual(self.page.find_all(tag = 'p', id = 'nav'), ())
+    self.assertEqual(
+      self.tags(self.page.find_all(id = 'nav', class_name = 'menu')),
+      ['div']
+    )
+
+  def test_tag_not_a_string(self):
+    page = Nodes.parse_yaml('- 5: text\n- p: [[class: x], text]\n')
+    index = page.element_index()
+    self.assertEqual(index.by_tag[5], (page[0],))
+    self.assertEqual(self.tags(page.find_all(tag = 'p', class_name = 'x')), ['p'])
+    self.assertEqual(page.find_all(tag = 5, attribute = 'class'), ())
+
+  def test_no_match(self):
+    self.assertEqual(self.page.find_all(tag = 'table'), ())
+
+  def test_lazy_tree(self):
+    lazy = Nodes.parse_yaml(self.yaml_src, lazy = True)
+    self.assertEqual(
+      self.tags(lazy.find_all(attribute = 'href')),
+      ['link', 'a', 'a']
+    )
+
+
+def load_tests(loader, tests, ignore):
+  tests.addTests(doctest.DocTestSuite(index))
+  return tests
@@ -0,0 +1,119 @@
+from unittest import TestCase
+import doctest
+import io
+import json
+import yaml
+from ...yaml_tags import Include, Table
+from .. import json_input
+from ..json_input import load_json, load_json_lines, resolve_directives
+from ..htyaml import HTYAML, PageLoader
+
+try:
+  import orjson
+except ImportError:
+  orjson = None
+
+
+PAGE = '''
+- <!DOCTYPE html>
+- html:
+  - - lang: en
+  - body:
+    - div:
+      - - class: intro
+          data-count: 3
+          hidden: true
+      - - Some *markdown* & text
+      - p: [one, {b: two}, [null]]
+    - $table: {header: [a, b], rows: [[1, 2.5], [yes, null]]}
+    - $quote-as-strings: [$a, $$b]
+    - $name: [$value, {$key: $$escaped}]
+'''
+
+PAGE_JSON = '''[
+  "<!DOCTYPE html>",
+  {"html": [
+    [{"lang": "en"}],
+    {"body": [
+      {"div": [
+        [{"class": "intro", "data-count": 3, "hidden": true}],
+        ["Some *markdown* & text"],
+        {"p": ["one", {"b": "two"}, [null]]}
+      ]},
+      {"$table": {"header": ["a", "b"], "rows": [[1, 2.5], [true, null]]}},
+      {"$quote-as-strings": ["$a", "$$b"]},
+      {"$name": ["$value", {"$key": "$$escaped"}]}
+    ]}
+  ]}
+]'''
+
+
+class TestLoadJSON(TestCase):
+
+  def decoders(self):
+    decoders = [json.loads]
+    if orjson is not None:
+      decoders.append(orjson.loads)
+    for loads in decoders:
+      saved = json_input._loads
+      json_input._loads = loads
+      try:
+        with self.subTest(decoder = loads.__module__):
+          yield
+      finally:
+        json_input._loads = saved
+
+  def test_same_as_yaml(self):
+    data = yaml.load(PAGE, Loader = PageLoader)
+    for _ in self.decoders():
+      loaded = load_json(PAGE_JSON)
+      self.assertEqual(loaded, data)
+      self.assertEqual(repr(loaded), repr(data))
+
+  def test_objects(self):
+    loaded = load_json(
+      '[{"$include": "a.json"}, {"$table": [], "id": "$include"}, "$x", "$$y", "$", ""]'
+    )
+    self.assertIs(next(iter(loaded[0])), Include())
+    self.assertEqual(loaded[1], {Table(): [], 'id': '$include'})
+    self.assertEqual(loaded[2:], ['$x', '$$y', '$', ''])
+    self.assertTrue(all(type(text) is str for text in loaded[2:]))
+
+  def test_bytes_and_files(self):
+    for _ in self.decoders():
+      self.assertEqual(load_json(b'[{"$table": "$a"}]'), [{Table(): '$a'}])
+      self.assertEqual(load_json(io.StringIO('{"p": "x"}')), {'p': 'x'})
+
+  def test_invalid(self):
+    for _ in self.decoders():
+      with self.assertRaises(json.JSONDecodeError):
+        load_json('[{p: x}]')
+
+  def test_scalars(self):
+    self.assertEqual(resolve_directives('$include'), '$include')
+    self.assertEqual(resolve_directives(3), 3)
+
+  def test_lines(self):
+    stream = io.StringIO('["$a"]\n\n  \n{"$include": "b"}\n')
+    self.assertEqual(list(load_json_lines(stream)), [['$a'], {Include(): 'b'}])
+
+
+class TestParseJSON(TestCase):
+
+  def test_same_as_yaml(self):
+    yaml_src, json_src = PAGE, PAGE_JSON
+    for kwargs in ({}, {'markdown': True}, {'lazy': True}):
+      with self.subTest(**kwargs):
+        page = HTYAML.parse_json(json_src, **kwargs)
+        self.assertEqual(page, HTYAML.parse_yaml(yaml_src, **kwargs))
+        self.assertEqual(page.render(**kwargs), HTYAML.parse_yaml(yaml_src, **kwargs).render(**kwargs))
+
+  def test_dollar_text(self):
+    self.assertEqual(HTYAML.parse_json('[{"p": "$5 off"}, ["$$ money"]]').render(), (
+      '<p>$5 off</p>\n$$ money'
+    ))
+
+
+def load_tests(loader, tests, ignore):
+  tests.addTests(doctest.DocTestSuite(json_input))
+  return tests
@@ -0,0 +1,91 @@
+from unittest import TestCase
+import doctest
+from .. import parallel
+from ..parallel import ParallelRenderer, render_parallel, gil_enabled
+from ..htyaml import Nodes, LimitExceeded
+
+
+PAGE = '''
+- <!DOCTYPE html>
+- html:
+  - - lang: en
+  - head:
+    - title: Parallel
+  - body:
+    - section: &shared
+      - h2: Shared
+      - - Some *markdown* text.
+    - section: *shared
+''' + ''.join('''
+    - section:
+      - - id: s{0}
+      - h2: Section {0}
+      - - Paragraph {0} with *markdown* & [a link](#s{0}).
+      - ul:
+        - li: [first, {{a: [[href: '#a{0}'], link]}}]
+        - li: second
+      - p: [inline, {{b: bold}}, text]
+'''.format(n) for n in range(40))
+
+
+class TestParallelRenderer(TestCase):
+
+  def setUp(self):
+    self.page = Nodes.parse_yaml(PAGE)
+    self.renderer = ParallelRenderer(workers = 4, min_chunk_nodes = 2, serial_on_gil = False)
+
+  def tearDown(self):
+    self.renderer.close()
+
+  def test_same_as_render(self):
+    for kwargs in (
+      {}, {'markdown': True}, {'minify': True}, {'line_prefix': '    '},
+      {'markdown': True, 'minify': True},
+    ):
+      with self.subTest(**kwargs):
+        self.assertEqual(self.renderer.render(self.page, **kwargs), self.page.render(**kwargs))
+
+  def test_chunk_sizes(self):
+    for min_chunk_nodes in (1, 5, 50, 10000):
+      with self.subTest(min_chunk_nodes = min_chunk_nodes):
+        renderer = ParallelRenderer(
+          workers = 3, min_chunk_nodes = min_chunk_nodes, serial_on_gil = False
+        )
+        with renderer:
+          self.assertEqual(renderer.render(self.page, markdown = True), self.page.render(markdown = True))
+
+  def test_inline_parent(self):
+    page = Nodes.parse_yaml('- span: [{b: [one, {i: two}]}, {b: three}, four]')
+    self.assertEqual(self.renderer.render(page), page.render())
+
+  def test_leaf_tree(self):
+    page = Nodes.parse_yaml('plain text')
+    self.assertEqual(self.renderer.render(page[0]), 'plain text')
+
+  def test_errors(self):
+    with self.assertRaises(LimitExceeded):
+      self.renderer.render(self.page, max_output_size = 1000)
+
+  def test_size(self):
+    page = Nodes.parse_yaml('- div: [{p: one}, {p: two}]')
+    # Nodes, div, its Nodes, and a p and its Nodes for each paragraph.
+    self.assertEqual(parallel._size(page), 7)
+
+
+class TestFallback(TestCase):
+
+  def test_gil(self):
+    renderer = ParallelRenderer(workers = 4)
+    self.assertEqual(renderer.parallel(), not gil_enabled())
+
+  def test_one_worker(self):
+    self.assertFalse(ParallelRenderer(workers = 1, serial_on_gil = False).parallel())
+
+  def test_render_parallel(self):
+    page = Nodes.parse_yaml(PAGE)
+    self.assertEqual(render_parallel(page, markdown = True), page.render(markdown = True))
+
+
+def load_tests(loader, tests, ignore):
+  tests.addTests(doctest.DocTestSuite(parallel))
+  return tests
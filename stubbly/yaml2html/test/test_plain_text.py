@@ -0,0 +1,126 @@
+from unittest import TestCase
+import doctest
+from unittest.mock import patch
+from .. import plain_text
+from ..plain_text import to_text, markdown_to_text, SKIPPED_TAGS, _strip_tags
+from ..htyaml import Nodes, ParseError
+
+
+PAGE = '''
+- <!DOCTYPE html>
+- html:
+  - head:
+    - title: Hidden
+    - style: 'p {color: red}'
+  - body:
+    - div:
+      - - id: main
+          title: not text
+      - h1: Title
+      - - |
+          A *short* paragraph with [a link](/x "title")
+          and `some code`.
+
+          * one
+          * two
+      - p: [one, {b: two}, {img: {alt: none, src: a.png}}, three]
+      - p: [<span class="x">raw <b>html</b></span>, <script>skip()</script>, "&lt;ok&gt;"]
+      - script: alert(1)
+      - ul:
+        - li: first
+        - li: [second, {br: }, line]
+'''
+
+
+def words(text):
+  return text.split()
+
+
+class TestToText(TestCase):
+
+  def test_page(self):
+    self.assertEqual(to_text(Nodes.parse_yaml(PAGE), markdown = True), (
+      'Title\n'
+      'A short paragraph with a link\n'
+      'and some code.\n'
+      'one\n'
+      'two\n'
+      'one two three\n'
+      'raw html <ok>\n'
+      'first\n'
+      'second line'
+    ))
+
+  def test_same_words_as_render_then_strip(self):
+    page = Nodes.parse_yaml(PAGE)
+    for kwargs in ({}, {'markdown': True}):
+      with self.subTest(**kwargs):
+        self.assertEqual(
+          words(to_text(page, **kwargs)),
+          words(_strip_tags(page.render(**kwargs), SKIPPED_TAGS))
+        )
+
+  def test_without_markdown(self):
+    page = Nodes.parse_yaml('- p: [[Some *text* & more]]')
+    self.assertEqual(to_text(page), 'Some *text* & more')
+    self.assertEqual(to_text(page, markdown = True), 'Some text & more')
+
+  def test_skipped_tags(self):
+    page = Nodes.parse_yaml('- nav: menu\n- main: content\n')
+    self.assertEqual(to_text(page), 'menu\ncontent')
+    self.assertEqual(to_text(page, skipped_tags = {'nav'}), 'content')
+
+  def test_skipped_tags_any_case(self):
+    page = Nodes.parse_yaml('- SCRIPT: var x\n- Style: p {}\n- p: text\n')
+    self.assertEqual(to_text(page), 'text')
+
+  def test_deep_tree(self):
+    # Render styles are worked out once for each node.
+    depth = 50
+    page = Nodes.parse_yaml('- ' + 'button: [' * depth + 'x, {b: y}' + ']' * depth)
+    with patch.object(Nodes, 'preferred_render_style', side_effect = AssertionError):
+      self.assertEqual(to_text(page), 'x y')
+
+  def test_table(self):
+    page = Nodes.parse_yaml('- $table: {header: [a, b], rows: [["<1>", 2], [3]]}')
+    self.assertEqual(to_text(page), 'a b\n<1> 2\n3')
+
+  def test_method(self):
+    page = Nodes.parse_yaml('- p: one\n- p: two\n')
+    self.assertEqual(page.to_text(), 'one\ntwo')
+    self.assertEqual(page[1].to_text(), 'two')
+
+  def test_lazy(self):
+    self.assertEqual(
+      to_text(Nodes.parse_yaml(PAGE, lazy = True), markdown = True),
+      to_text(Nodes.parse_yaml(PAGE), markdown = True)
+    )
+
+  def test_not_parsed(self):
+    with self.assertRaises(ParseError):
+      to_text(Nodes.parse_yaml('- div: [[a, b]]\n- 3\n'))
+
+
+class TestMarkdownToText(TestCase):
+
+  def test_markup(self):
+    for source, text in (
+      ('**strong** and __strong__', 'strong and strong'),
+      ('*em* and _em_ but snake_case_name', 'em and em but snake_case_name'),
+      ('``code with ` inside``', 'code with ` inside'),
+      ('[link][ref] and ![img] [ref]\n\n[ref]: http://example.com', 'link and img\n\n'),
+      ('<http://example.com>', 'http://example.com'),
+      ('Heading\n=======\n\n---\n', 'Heading\n\n\n\n'),
+      ('```python\nx = 1\n```', '\nx = 1\n'),
+      ('> > nested\n> quote', 'nested\nquote'),
+      ('1) first\n2. second\n+ third', 'first\nsecond\nthird'),
+      ('\\*literal\\* \\\\ \\_', '*literal* \\ _'),
+      ('a &amp; b &copy;', 'a & b \xa9'),
+    ):
+      with self.subTest(source = source):
+        self.assertEqual(markdown_to_text(source), text)
+
+
+def load_tests(loader, tests, ignore):
+  tests.addTests(doctest.DocTestSuite(plain_text))
+  return tests
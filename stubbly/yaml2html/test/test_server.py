@@ -0,0 +1,194 @@
+from unittest import TestCase
+import asyncio
+import doctest
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+from wsgiref.util import setup_testing_defaults
+from .. import server
+from ..server import HTYAMLApp
+from ..fragments import FragmentCache
+from .files import write_file
+
+
+class ServerTest(TestCase):
+
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.write('index.yaml', '- p: home')
+    self.app = HTYAMLApp(self.directory, fragment_cache = FragmentCache())
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def write(self, name, source):
+    write_file(os.path.join(self.directory, name), source)
+
+  def get(self, path, method = 'GET', **headers):
+    environ = {'PATH_INFO': path, 'REQUEST_METHOD': method}
+    for name, value in headers.items():
+      environ['HTTP_' + name.upper()] = value
+    setup_testing_defaults(environ)
+    response = {}
+    def start_response(status, headers):
+      response['status'] = status
+      response['headers'] = dict(headers)
+    body = b''.join(self.app(environ, start_response))
+    return response['status'], response['headers'], body
+
+
+class TestWSGI(ServerTest):
+
+  def test_render(self):
+    status, headers, body = self.get('/')
+    self.assertEqual(status, '200 OK')
+    self.assertEqual(body, b'<p>home</p>')
+    self.assertEqual(headers['Content-Length'], '11')
+
+  def test_subdirectory(self):
+    os.mkdir(os.path.join(self.directory, 'docs'))
+    self.write(os.path.join('docs', 'intro.yaml'), '- - intro')
+    status, headers, body = self.get('/docs/intro')
+    self.assertEqual(body, b'<p>intro</p>')
+
+  def test_not_found(self):
+    status, headers, body = self.get('/missing')
+    self.assertEqual(status, '404 Not Found')
+
+  def test_no_parent_directories(self):
+    status, headers, body = self.get('/../index')
+    self.assertEqual(status, '404 Not Found')
+
+  def test_method_not_allowed(self):
+    status, headers, body = self.get('/', method = 'POST')
+    self.assertEqual(status, '405 Method Not Allowed')
+
+  def test_head(self):
+    status, headers, body = self.get('/', method = 'HEAD')
+    self.assertEqual(status, '200 OK')
+    self.assertEqual(body, b'')
+    self.assertEqual(headers['Content-Length'], '11')
+
+  def test_not_modified(self):
+    status, headers, body = self.get('/')
+    etag = headers['ETag']
+    status, headers, body = self.get('/', if_none_match = etag)
+    self.assertEqual(status, '304 Not Modified')
+    self.assertEqual(body, b'')
+
+  def test_cache_hit(self):
+    self.get('/')
+    self.get('/')
+    stats = self.app.stats()
+    self.assertEqual(stats['misses'], 1)
+    self.assertEqual(stats['hits'], 1)
+
+  def test_rerender_when_source_changes(self):
+    status, headers, body = self.get('/')
+    self.write('index.yaml', '- p: changed')
+    status, new_headers, body = self.get('/', if_none_match = headers['ETag'])
+    self.assertEqual(status, '200 OK')
+    self.assertEqual(body, b'<p>changed</p>')
+    self.assertNotEqual(headers['ETag'], new_headers['ETag'])
+
+  def test_rerender_when_fragment_changes(self):
+    self.write('footer.yaml', '- footer: old')
+    self.write('index.yaml', '- p: home\n- $include: footer.yaml')
+    status, headers, body = self.get('/')
+    self.assertEqual(body, b'<p>home</p>\n<footer>old</footer>')
+    status, headers, body = self.get('/', if_none_match = headers['ETag'])
+    self.assertEqual(status, '304 Not Modified')
+    self.write('footer.yaml', '- footer: new')
+    status, new_headers, body = self.get('/', if_none_match = headers['ETag'])
+    self.assertEqual(status, '200 OK')
+    self.assertEqual(body, b'<p>home</p>\n<footer>new</footer>')
+    self.assertNotEqual(headers['ETag'], new_headers['ETag'])
+    self.get('/')
+    self.assertEqual(self.app.stats()['hits'], 1)
+
+  def test_etag_depends_on_render_options(self):
+    other = HTYAMLApp(self.directory, markdown = False)
+    environ = {'PATH_INFO': '/'}
+    setup_testing_defaults(environ)
+    headers = []
+    other(environ, lambda status, h: headers.extend(h))
+    status, own_headers, body = self.get('/')
+    self.assertNotEqual(dict(headers)['ETag'], own_headers['ETag'])
+
+  def test_streaming(self):
+    self.write('big.yaml', '\n'.join('- p: line %d' % i for i in range(100)))
+    app = HTYAMLApp(self.directory, chunk_size = 64)
+    environ = {'PATH_INFO': '/big'}
+    setup_testing_defaults(environ)
+    chunks = list(app(environ, lambda status, headers: None))
+    self.assertGreater(len(chunks), 1)
+    self.assertTrue(all(len(chunk) <= 64 for chunk in chunks))
+    self.assertTrue(b''.join(chunks).startswith(b'<p>line 0</p>\n'))
+
+  def test_parse_error(self):
+    self.write('bad.yaml', '- 99')
+    status, headers, body = self.get('/bad')
+    self.assertEqual(status, '500 Internal Server Error')
+
+  def test_yaml_error(self):
+    self.write('bad.yaml', '- p: [unclosed')
+    status, headers, body = self.get('/bad')
+    self.assertEqual(status, '500 Internal Server Error')
+    self.assertTrue(body.startswith(b'Invalid YAML: '))
+
+  def test_missing_mapped_file(self):
+    self.app = HTYAMLApp({'/gone': os.path.join(self.directory, 'gone.yaml')})
+    self.assertEqual(self.get('/gone')[0], '404 Not Found')
+    self.assertEqual(self.app.stats()['not_found'], 1)
+
+  def test_path_sources(self):
+    self.app = HTYAMLApp(pathlib.Path(self.directory), fragment_cache = FragmentCache())
+    self.assertEqual(self.get('/')[2], b'<p>home</p>')
+
+  def test_mapping_sources(self):
+    self.app = HTYAMLApp({'/home': os.path.join(self.directory, 'index.yaml')})
+    self.assertEqual(self.get('/home')[2], b'<p>home</p>')
+    self.assertEqual(self.get('/')[0], '404 Not Found')
+
+  def test_stats_endpoint(self):
+    self.get('/')
+    self.get('/missing')
+    status, headers, body = self.get('/_stats')
+    self.assertEqual(headers['Content-Type'], 'application/json')
+    stats = json.loads(body.decode('utf-8'))
+    self.assertEqual(stats['requests'], 2)
+    self.assertEqual(stats['not_found'], 1)
+    self.assertEqual(stats['cached_pages'], 1)
+    self.assertGreater(stats['render_seconds'], 0)
+
+
+class TestASGI(ServerTest):
+
+  def asgi_get(self, path, headers = ()):
+    messages = []
+    async def receive():
+      return {'type': 'http.request'}
+    async def send(message):
+      messages.append(message)
+    scope = {'type': 'http', 'method': 'GET', 'path': path, 'headers': list(headers)}
+    asyncio.run(self.app.asgi(scope, receive, send))
+    return messages
+
+  def test_render(self):
+    messages = self.asgi_get('/')
+    self.assertEqual(messages[0]['status'], 200)
+    body = b''.join(m['body'] for m in messages[1:])
+    self.assertEqual(body, b'<p>home</p>')
+    self.assertFalse(messages[-1]['more_body'])
+
+  def test_not_modified(self):
+    headers = dict(self.asgi_get('/')[0]['headers'])
+    messages = self.asgi_get('/', [(b'if-none-match', headers[b'etag'])])
+    self.assertEqual(messages[0]['status'], 304)
+
+
+def load_tests(loader, tests, ignore):
+  tests.addTests(doctest.DocTestSuite(server))
+  return tests
@@ -1,3 +1,8 @@
+from .stubbly import StubblyLoader, StubblyDumper, FastStubblyLoader, FastStubblyDumper, StubblyObject, scope_table
+from .scopes import Scope, ScopeTable
 from .escaped_dollar import EscapedDollar
 from .symbol import Symbol
-from .quote_as_strings import QuoteAsStrings
\ No newline at end of file
+from .quote_as_strings import QuoteAsStrings
+from .include import Include
+from .table import Table
+from .config import LoaderConfig, FrozenConfigError, DEFAULT_CONFIG
@@ -0,0 +1,147 @@
+'''Isolated, read-only sets of stubbly tags.
+
+Defining a `StubblyObject` subclass registers its tag on the shared
+`StubblyLoader`, `StubblyDumper` and `scope_table`. A `LoaderConfig`
+instead builds its own Loader, FastLoader and Dumper classes and scope
+table for a
+fixed tuple of tag types, when it is created. Nothing registered later
+reaches it, and its tables cannot be changed, so one config can be
+shared by any number of threads, and configs with different tags can be
+used side by side.
+
+    >>> import yaml
+    >>> escapes_only = LoaderConfig([EscapedDollar])
+    >>> yaml.load('[$name, $$price]', Loader = escapes_only.Loader)
+    ['$name', EscapedDollar('$$price')]
+'''
+import threading
+from yaml.constructor import Constructor
+from yaml.representer import Representer
+from .stubbly import StubblyLoader, FastStubblyLoader, StubblyDumper, StubblyObjectMetaclass
+from .scopes import ScopeTable, FrozenConfigError
+from .escaped_dollar import EscapedDollar
+from .symbol import Symbol
+from .quote_as_strings import QuoteAsStrings
+
+STUBBLY_TAGS = (EscapedDollar, QuoteAsStrings, Symbol)
+
+
+def _frozen(cls, *args):
+  raise FrozenConfigError(
+    '{0} belongs to a LoaderConfig and cannot be changed'.format(cls.__name__)
+  )
+
+
+class LoaderConfig(object):
+  '''Loader and Dumper classes, and a scope table, for `tags`.
+
+`FastLoader` is `Loader` composing with libyaml, when PyYAML has it.
+Resolvers are tried in the order of `tags`.'''
+
+  __slots__ = ('tags', 'Loader', 'FastLoader', 'Dumper', 'scope_table')
+
+  def __init__(self, tags = STUBBLY_TAGS):
+    tags = tuple(tags)
+    constructors = dict(Constructor.yaml_constructors)
+    representers = dict(Representer.yaml_representers)
+    resolvers = {}
+    scope_table = ScopeTable(StubblyObjectMetaclass.tag_prefix)
+    for tag_type in tags:
+      constructors[tag_type.yaml_tag] = tag_type.from_yaml
+      representers[tag_type] = tag_type.to_yaml
+      regexp = getattr(tag_type, 'resolver_regexp', None)
+      if regexp is not None:
+        for ch in tag_type.resolver_first or [None]:
+          resolvers[ch] = resolvers.get(ch, []) + [(tag_type.yaml_tag, regexp)]
+      scope = getattr(tag_type, 'scope', None)
+      if scope is not None:
+        scope_table.register(tag_type.yaml_tag, scope)
+    scope_table.freeze(tag_type.yaml_tag for tag_type in tags)
+
+    frozen = {
+      'stubbly_resolvers': resolvers,
+      'add_stubbly_resolver': classmethod(_frozen),
+      'add_implicit_resolver': classmethod(_frozen),
+      'add_path_resolver': classmethod(_frozen),
+    }
+    loader_attributes = dict(
+      frozen,
+      scope_table = scope_table,
+      yaml_constructors = constructors,
+      yaml_multi_constructors = dict(Constructor.yaml_multi_constructors),
+      add_constructor = classmethod(_frozen),
+      add_multi_constructor = classmethod(_frozen),
+    )
+    loader = type('ConfiguredStubblyLoader', (StubblyLoader,), loader_attributes)
+    if FastStubblyLoader is StubblyLoader:
+      fast_loader = loader
+    else:
+      fast_loader = type('ConfiguredStubblyCLoader', (FastStubblyLoader,), loader_attributes)
+    dumper = type('ConfiguredStubblyDumper', (StubblyDumper,), dict(
+      frozen,
+      yaml_representers = representers,
+      yaml_multi_representers = dict(Representer.yaml_multi_representers),
+      add_representer = classmethod(_frozen),
+      add_multi_representer = classmethod(_frozen),
+    ))
+    # Compile the resolver dispatch now rather than on first use.
+    loader._compile_stubbly_dispatch()
+    fast_loader._compile_stubbly_dispatch()
+    dumper._compile_stubbly_dispatch()
+
+    for name, value in (
+      ('tags', tags),
+      ('Loader', loader),
+      ('FastLoader', fast_loader),
+      ('Dumper', dumper),
+      ('scope_table', scope_table),
+    ):
+      object.__setattr__(self, name, value)
+
+  def __setattr__(self, name, value):
+    raise FrozenConfigError('LoaderConfig is read-only')
+
+  def __delattr__(self, name):
+    raise FrozenConfigError('LoaderConfig is read-only')
+
+  def __repr__(self):
+    return '{0}([{1}])'.format(
+      self.__class__.__name__,
+      ', '.join(tag_type.__name__ for tag_type in self.tags)
+    )
+
+
+_default_config = None
+_default_config_lock = threading.Lock()
+
+
+def default_config():
+  '''Returns the `LoaderConfig` of `STUBBLY_TAGS`, built on first use,
+to keep importing stubbly cheap.'''
+  global _default_config
+  if _default_config is None:
+    with _default_config_lock:
+      if _default_config is None:
+        _default_config = LoaderConfig()
+  return _default_config
+
+
+class _DefaultConfig(object):
+  '''Stands in for `default_config()`, building it when first used.'''
+
+  __slots__ = ()
+
+  def __getattr__(self, name):
+    return getattr(default_config(), name)
+
+  def __setattr__(self, name, value):
+    raise FrozenConfigError('LoaderConfig is read-only')
+
+  def __delattr__(self, name):
+    raise FrozenConfigError('LoaderConfig is read-only')
+
+  def __repr__(self):
+    return repr(default_config())
+
+
+DEFAULT_CONFIG = _DefaultConfig()
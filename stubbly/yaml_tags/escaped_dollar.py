@@ -23,6 +23,6 @@ class EscapedDollar(str, StubblyObject):
   @classmethod
   def to_yaml(cls, dumper, data):
     return dumper.represent_scalar(
-      dumper.DEFAULT_SCALAR_TAG,
+      cls.yaml_tag,
       '$' + data
     )
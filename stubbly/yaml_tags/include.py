@@ -0,0 +1,24 @@
+from .stubbly import SingletonStubblyObject
+
+class Include(SingletonStubblyObject):
+  '''The `$include` key. In HTYAML pages, `$include: path` is replaced
+by the nodes of another YAML file; see `stubbly.yaml2html.fragments`.'''
+
+  resolver_regexp = r'^\$include$'
+  resolver_first = '$'
+  # Only HTYAML pages have the directive; elsewhere `$include` is a Symbol.
+  shared_resolver = False
+
+  def __repr__(self):
+    return self.__class__.__name__ + '()'
+
+  @classmethod
+  def from_yaml(cls, loader, node):
+    return cls()
+
+  @classmethod
+  def to_yaml(cls, dumper, data):
+    return dumper.represent_scalar(
+      cls.yaml_tag,
+      '$include'
+    )
@@ -1,9 +1,19 @@
 from .stubbly import SingletonStubblyObject
+from .scopes import Scope
+
 class QuoteAsStrings(SingletonStubblyObject):
 
   resolver_regexp = r'^\$quote-as-strings$'
   resolver_first = '$'
 
+  # Everything under a $quote-as-strings key, keys included, is a string.
+  scope = Scope(
+    'quote-as-strings',
+    keep_stubbly_scalars = False,
+    keep_keys = False,
+    final = True
+  )
+
   def __repr__(self):
     return self.__class__.__name__ + '()'
 
@@ -14,6 +24,6 @@ class QuoteAsStrings(SingletonStubblyObject):
   @classmethod
   def to_yaml(cls, dumper, data):
     return dumper.represent_scalar(
-      dumper.DEFAULT_SCALAR_TAG,
+      cls.yaml_tag,
       '$quote-as-strings'
     )
\ No newline at end of file
@@ -0,0 +1,108 @@
+'''Scopes: how `scalars_to_strings` treats the nodes of a document section.
+
+A mapping key tagged with a scope tag (e.g. `$code`, `$quote-as-strings`)
+puts its value in that tag's scope. The filter looks each (scope, tag)
+pair up in a `ScopeTable`, which compiles the rules below into a table
+entry the first time the pair is seen. The cost per node is one lookup,
+however many scopes are registered.
+'''
+from yaml.resolver import BaseResolver
+
+STRING_TAG = BaseResolver.DEFAULT_SCALAR_TAG
+
+# The tags PyYAML's own resolvers give, compiled into frozen tables.
+YAML_TAGS = frozenset('tag:yaml.org,2002:' + name for name in (
+  'null', 'bool', 'int', 'float', 'binary', 'timestamp', 'omap', 'pairs',
+  'set', 'str', 'seq', 'map', 'merge', 'value'
+))
+
+
+class FrozenConfigError(TypeError):
+  pass
+
+
+class Scope(object):
+  '''A state of the scalar filter.
+
+`keep_scalars`: leave all scalars as they were resolved.
+`keep_stubbly_scalars`: leave `!stubbly/…` scalars as they were resolved.
+`keep_keys`: leave mapping keys as they were resolved.
+`final`: scope tags in keys do not change the scope of their values.
+
+Scalars and keys that are not kept become strings.
+'''
+
+  def __init__(self, name, keep_scalars = False, keep_stubbly_scalars = True,
+               keep_keys = True, final = False):
+    self.name = name
+    self.keep_scalars = keep_scalars
+    self.keep_stubbly_scalars = keep_stubbly_scalars
+    self.keep_keys = keep_keys
+    self.final = final
+
+  def __repr__(self):
+    return self.__class__.__name__ + '(' + repr(self.name) + ')'
+
+
+BASE = Scope('base')
+
+
+class ScopeTable(object):
+  '''Maps (scope, tag) pairs to `(next_scope, keep_scalar, keep_key)`:
+the scope of a mapping value whose key has `tag`, and whether a scalar
+or key with `tag` is left as it is.
+
+    >>> table = ScopeTable('!stubbly/')
+    >>> code = Scope('code', keep_scalars = True)
+    >>> table.register('!stubbly/code', code)
+    >>> table.entry(BASE, '!stubbly/code')
+    (Scope('code'), True, True)
+    >>> table.entry(BASE, 'tag:yaml.org,2002:int')
+    (Scope('base'), False, True)
+'''
+
+  # Set by `freeze`, on tables that belong to a `LoaderConfig`.
+  frozen = False
+
+  def __init__(self, tag_prefix):
+    self.tag_prefix = tag_prefix
+    self.scopes = {}
+    self.rows = {}
+
+  def register(self, tag, scope):
+    '''Make keys tagged `tag` open `scope`.'''
+    if self.frozen:
+      raise FrozenConfigError('this scope table belongs to a LoaderConfig and cannot be changed')
+    self.scopes[tag] = scope
+    self.rows = {}
+
+  def freeze(self, tags = ()):
+    '''Compile the entries of every registered scope for `tags`, the
+scope tags and YAML's own tags, and make the table read-only. Entries
+for other pairs are worked out on each lookup, and not stored.'''
+    tags = set(tags) | set(self.scopes) | YAML_TAGS
+    for scope in [BASE] + list(self.scopes.values()):
+      for tag in tags:
+        self.compile(scope, tag)
+    self.frozen = True
+
+  def entry(self, scope, tag):
+    try:
+      return self.rows[scope][tag]
+    except KeyError:
+      return self.compile(scope, tag)
+
+  def compile(self, scope, tag):
+    '''Work out the entry for (scope, tag) and add it to the table.'''
+    is_string = tag == STRING_TAG
+    keep_scalar = (
+      is_string or
+      scope.keep_scalars or
+      (scope.keep_stubbly_scalars and tag.startswith(self.tag_prefix))
+    )
+    keep_key = is_string or scope.keep_keys
+    next_scope = scope if scope.final else self.scopes.get(tag, scope)
+    entry = (next_scope, keep_scalar, keep_key)
+    if not self.frozen:
+      self.rows.setdefault(scope, {})[tag] = entry
+    return entry
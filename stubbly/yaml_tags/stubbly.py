@@ -1,5 +1,122 @@
 import re
+import threading
 import yaml
+from yaml.nodes import ScalarNode
+from yaml.reader import Reader
+from yaml.scanner import Scanner
+from yaml.parser import Parser
+from yaml.composer import Composer
+from yaml.constructor import Constructor
+from yaml.emitter import Emitter
+from yaml.serializer import Serializer
+from yaml.representer import Representer
+from yaml.resolver import Resolver
+from .scopes import ScopeTable
+
+
+class StubblyResolver(Resolver):
+  '''Resolver that also recognises stubbly's implicit tags.
+
+Stubbly tags are registered with `add_stubbly_resolver` instead of
+`add_implicit_resolver`. All the expressions for one first character are
+combined into a single regular expression, with one named group per tag,
+so resolving a '$'-prefixed scalar takes one match whichever tag it
+turns out to have. As with implicit resolvers, the first registered
+expression that matches wins.
+
+    >>> loader = StubblyLoader('')
+    >>> loader.resolve(ScalarNode, '$$dollars', (True, False))
+    '!stubbly/escaped-dollar'
+    >>> loader.resolve(ScalarNode, '$name', (False, True))
+    'tag:yaml.org,2002:str'
+'''
+
+  stubbly_resolvers = {}
+  _stubbly_dispatch = None
+
+  @classmethod
+  def add_stubbly_resolver(cls, tag, regexp, first):
+    resolvers = dict(cls.stubbly_resolvers)
+    for ch in first or [None]:
+      resolvers[ch] = resolvers.get(ch, []) + [(tag, regexp)]
+    cls.stubbly_resolvers = resolvers
+    cls._stubbly_dispatch = None
+
+  @classmethod
+  def _compile_stubbly_dispatch(cls):
+    dispatch = {}
+    any_first = cls.stubbly_resolvers.get(None, [])
+    for ch, resolvers in cls.stubbly_resolvers.items():
+      if ch is not None:
+        resolvers = resolvers + any_first
+      tags = {}
+      groups = []
+      for n, (tag, regexp) in enumerate(resolvers):
+        name = 't{0}'.format(n)
+        tags[name] = tag
+        groups.append('(?P<{0}>{1})'.format(name, regexp))
+      dispatch[ch] = (re.compile('|'.join(groups)).match, tags)
+    # Cache the dispatch next to the resolvers it was compiled from, so
+    # that add_stubbly_resolver on that class invalidates it for subclasses.
+    owner = next(c for c in cls.__mro__ if 'stubbly_resolvers' in c.__dict__)
+    owner._stubbly_dispatch = dispatch
+    return dispatch
+
+  def resolve(self, kind, value, implicit):
+    if kind is ScalarNode and implicit[0] and value:
+      dispatch = self._stubbly_dispatch
+      if dispatch is None:
+        dispatch = self._compile_stubbly_dispatch()
+      entry = dispatch.get(value[0]) or dispatch.get(None)
+      if entry is not None:
+        match, tags = entry
+        matched = match(value)
+        if matched is not None:
+          return tags[matched.lastgroup]
+    return Resolver.resolve(self, kind, value, implicit)
+
+
+class StubblyConstructor(Constructor):
+  '''Constructor with stubbly's tags registered.'''
+
+
+class StubblyRepresenter(Representer):
+  '''Representer with stubbly's types registered.'''
+
+  def ignore_aliases(self, data):
+    # Stubbly objects are scalars; repeated ones (e.g. interned symbols)
+    # are written out again rather than anchored.
+    return isinstance(data, StubblyObject) or Representer.ignore_aliases(self, data)
+
+
+class StubblyLoader(Reader, Scanner, Parser, Composer, StubblyConstructor, StubblyResolver):
+  '''`yaml.Loader` with stubbly's tags. Stubbly registers nothing on
+`yaml.Loader` itself, so other users of PyYAML are unaffected.'''
+  __init__ = yaml.Loader.__init__
+
+
+class StubblyDumper(Emitter, Serializer, StubblyRepresenter, StubblyResolver):
+  '''`yaml.Dumper` with stubbly's tags.'''
+  __init__ = yaml.Dumper.__init__
+
+
+if yaml.__with_libyaml__:
+  from yaml.cyaml import CParser, CEmitter
+
+  class StubblyCLoader(CParser, StubblyLoader):
+    '''`StubblyLoader` that scans, parses and composes with libyaml.
+Only constructing the nodes runs in Python.'''
+    __init__ = yaml.CLoader.__init__
+
+  class StubblyCDumper(CEmitter, StubblyRepresenter, StubblyResolver):
+    '''`yaml.CDumper` with stubbly's tags: emits with libyaml.'''
+    __init__ = yaml.CDumper.__init__
+
+  FastStubblyLoader = StubblyCLoader
+  FastStubblyDumper = StubblyCDumper
+else:
+  FastStubblyLoader = StubblyLoader
+  FastStubblyDumper = StubblyDumper
 
 
 class StubblyObjectMetaclass(yaml.YAMLObjectMetaclass):
@@ -7,45 +124,60 @@ class StubblyObjectMetaclass(yaml.YAMLObjectMetaclass):
 
   def __init__(cls, name, bases, kwds):
     super(cls.__class__, cls).__init__(name, bases, kwds)
-    
+
     first_letter = name[0].lower()
     rest = ['-'+c.lower() if c.isupper() else c for c in name[1:]]
     yaml_tag = cls.tag_prefix + first_letter + ''.join(rest)
     cls.yaml_tag = yaml_tag
 
-    cls.yaml_loader.add_constructor(yaml_tag, cls.from_yaml)
-    cls.yaml_dumper.add_representer(yaml_tag, cls.to_yaml)
+    StubblyConstructor.add_constructor(yaml_tag, cls.from_yaml)
+    StubblyRepresenter.add_representer(cls, cls.to_yaml)
 
     regexp = kwds.get('resolver_regexp')
     first = kwds.get('resolver_first')
-    if regexp is not None:
-      compiled = re.compile(regexp)
-      yaml.add_implicit_resolver(
-        yaml_tag,
-        compiled,
-        Loader = cls.yaml_loader,
-        Dumper = cls.yaml_dumper,
-        first = first 
-      )
+    if regexp is not None and kwds.get('shared_resolver', True):
+      StubblyResolver.add_stubbly_resolver(yaml_tag, regexp, first)
+
+    scope = kwds.get('scope')
+    if scope is not None:
+      scope_table.register(yaml_tag, scope)
+
+
+# Scopes opened by stubbly tags, for `scalars_to_strings`.
+scope_table = ScopeTable(StubblyObjectMetaclass.tag_prefix)
+StubblyLoader.scope_table = scope_table
 
 
 StubblyObject = StubblyObjectMetaclass(
-  'StubblyObject', (yaml.YAMLObject,), {}
+  'StubblyObject', (yaml.YAMLObject,), {
+    'yaml_loader': StubblyLoader,
+    'yaml_dumper': StubblyDumper,
+  }
 )
 
 StubblyObject.__doc__ = '''\n
 Extension of YAMLObject that automatically infers the yaml_tag
 field from the class' name, and automatically registers
 a resolver from the supplied `resolver_regexp` and
-`resolver_first` fields.
+`resolver_first` fields, and the `Scope` that mapping keys
+with the tag open, from the `scope` field.
+
+Tags are registered on `StubblyLoader` and `StubblyDumper`.
+With `shared_resolver = False`, the resolver is left off
+`StubblyLoader`, and only used by `LoaderConfig`s listing the tag.
 '''
 
 class SingletonStubblyObject(StubblyObject):
   '''Singleton version of StubblyObject.'''
   _instances = {}
+  _instances_lock = threading.Lock()
   def __new__(cls, *args, **kwargs):
-    if cls not in cls._instances:
-      cls._instances[cls] = super(
-        SingletonStubblyObject, cls
-      ).__new__(cls, *args, **kwargs)
-    return cls._instances[cls]
+    instance = cls._instances.get(cls)
+    if instance is None:
+      with cls._instances_lock:
+        instance = cls._instances.get(cls)
+        if instance is None:
+          instance = cls._instances[cls] = super(
+            SingletonStubblyObject, cls
+          ).__new__(cls, *args, **kwargs)
+    return instance
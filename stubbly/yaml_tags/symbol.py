@@ -1,22 +1,56 @@
+import threading
 from .stubbly import StubblyObject
+from .scopes import Scope
+
+# Process-wide symbol table: (class, name) -> the one instance.
+# Symbols are never removed; configs use a bounded set of names.
+_symbols = {}
+_symbols_lock = threading.Lock()
 
 class Symbol(StubblyObject, str):
+  '''A `$name` scalar. Symbols are interned, so equal symbols are the
+same object, and comparing them costs an identity check:
+
+    >>> Symbol('$code') is Symbol('code')
+    True
+'''
 
   # Any string starting with '$', but not with '$$',
   # except '$quote-as-strings'
   resolver_regexp = r'^\$(?!\$|quote-as-strings$)'
   resolver_first = '$'
-  
+
+  # Values under a symbol key are left as they were resolved.
+  scope = Scope('symbol', keep_scalars = True)
+
   def __new__(cls, string):
     if string.startswith('$'):
       string = string [1:]
-    return str.__new__(cls, string)
+    key = (cls, string)
+    symbol = _symbols.get(key)
+    if symbol is None:
+      with _symbols_lock:
+        symbol = _symbols.get(key)
+        if symbol is None:
+          symbol = _symbols[key] = str.__new__(cls, string)
+    return symbol
+
+  def __reduce__(self):
+    # Unpickling goes through __new__, so it finds the interned symbol
+    # of the receiving process.
+    return (self.__class__, ('$' + self,))
+
+  def __copy__(self):
+    return self
+
+  def __deepcopy__(self, memo):
+    return self
 
   def __repr__(self):
     return (
       self.__class__.__name__ + '(' + repr('$' + self) + ')'
     )
-    
+
 
   @classmethod
   def from_yaml(cls, loader, node):
@@ -25,6 +59,6 @@ class Symbol(StubblyObject, str):
   @classmethod
   def to_yaml(cls, dumper, data):
     return dumper.represent_scalar(
-      dumper.DEFAULT_SCALAR_TAG,
+      cls.yaml_tag,
       '$' + data
     )
@@ -0,0 +1,24 @@
+from .stubbly import SingletonStubblyObject
+
+class Table(SingletonStubblyObject):
+  '''The `$table` key. In HTYAML pages, `$table: ...` is a table of
+plain cells, rendered in bulk; see `stubbly.yaml2html.bulk_table`.'''
+
+  resolver_regexp = r'^\$table$'
+  resolver_first = '$'
+  # Only HTYAML pages have the directive; elsewhere `$table` is a Symbol.
+  shared_resolver = False
+
+  def __repr__(self):
+    return self.__class__.__name__ + '()'
+
+  @classmethod
+  def from_yaml(cls, loader, node):
+    return cls()
+
+  @classmethod
+  def to_yaml(cls, dumper, data):
+    return dumper.represent_scalar(
+      cls.yaml_tag,
+      '$table'
+    )
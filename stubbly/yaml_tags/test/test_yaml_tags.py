@@ -1,6 +1,13 @@
 from unittest import TestCase
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import doctest
+import pickle
+import threading
 import yaml
 from .. import *
+from ..stubbly import SingletonStubblyObject
+from .. import stubbly, symbol, scopes, config
 
 class TestSymbol(TestCase):
 
@@ -31,7 +38,7 @@ class TestSymbol(TestCase):
     )
 
   def test_resolver(self):
-    composed = yaml.compose(self.yaml_src)
+    composed = yaml.compose(self.yaml_src, Loader = StubblyLoader)
     self.assertEqual(
       composed.value[0].tag,
       Symbol.yaml_tag
@@ -57,7 +64,7 @@ class TestSymbol(TestCase):
   def test_load(self):
     self.assertEqual(
       self.expected_object,
-      yaml.load(self.yaml_src)
+      yaml.load(self.yaml_src, Loader = StubblyLoader)
     )
 
   def test_acts_like_string(self):
@@ -95,7 +102,7 @@ class TestEscapedDollar(TestCase):
     )
 
   def test_resolver(self):
-    composed = yaml.compose(self.yaml_src)
+    composed = yaml.compose(self.yaml_src, Loader = StubblyLoader)
     self.assertEqual(
       composed.value[0].tag,
       EscapedDollar.yaml_tag
@@ -110,7 +117,7 @@ class TestEscapedDollar(TestCase):
 
   def test_load(self):
     self.assertEqual(
-      yaml.load(self.yaml_src),
+      yaml.load(self.yaml_src, Loader = StubblyLoader),
       self.expected_object
     )
 
@@ -143,7 +150,7 @@ class TestQuoteAsStrings(TestCase):
     )
 
   def test_resolver(self):
-    composed = yaml.compose(self.yaml_src)
+    composed = yaml.compose(self.yaml_src, Loader = StubblyLoader)
     self.assertEqual(
       composed.value[0].tag,
       QuoteAsStrings.yaml_tag
@@ -157,6 +164,204 @@ class TestQuoteAsStrings(TestCase):
   def test_load(self):
     self.assertEqual(
       self.expected_object,
-      yaml.load(self.yaml_src)
+      yaml.load(self.yaml_src, Loader = StubblyLoader)
     )
 
+
+class TestInclude(TestCase):
+
+  def test_yaml_tag(self):
+    self.assertEqual(Include.yaml_tag, '!stubbly/include')
+
+  def test_load(self):
+    self.assertEqual(
+      yaml.load('[$include: a.yaml, $includes, $include-me]', Loader = LoaderConfig([Include]).Loader),
+      [{Include(): 'a.yaml'}, '$includes', '$include-me']
+    )
+
+  def test_symbol_elsewhere(self):
+    self.assertEqual(yaml.load('$include', Loader = StubblyLoader), Symbol('$include'))
+    self.assertIs(
+      yaml.load('$include', Loader = LoaderConfig([Include, Symbol]).Loader), Include()
+    )
+
+  def test_singleton(self):
+    self.assertIs(Include(), Include())
+
+
+class TestTable(TestCase):
+
+  def test_yaml_tag(self):
+    self.assertEqual(Table.yaml_tag, '!stubbly/table')
+
+  def test_load(self):
+    self.assertEqual(
+      yaml.load('[$table: [[a]], $tables]', Loader = LoaderConfig([Table, Symbol]).Loader),
+      [{Table(): [['a']]}, Symbol('$tables')]
+    )
+
+  def test_symbol_elsewhere(self):
+    self.assertEqual(yaml.load('$table', Loader = StubblyLoader), Symbol('$table'))
+
+  def test_singleton(self):
+    self.assertIs(Table(), Table())
+
+
+class TestSymbolInterning(TestCase):
+
+  def test_equal_symbols_are_identical(self):
+    self.assertIs(Symbol('$name'), Symbol('name'))
+    self.assertIsNot(Symbol('$name'), Symbol('$other'))
+
+  def test_loaded_symbols_are_identical(self):
+    loaded = yaml.load('[$name, {$name: $name}]', Loader = StubblyLoader)
+    [key] = loaded[1]
+    self.assertIs(loaded[0], key)
+    self.assertIs(loaded[0], loaded[1][key])
+
+  def test_subclass_not_shared(self):
+    class Keyword(Symbol):
+      pass
+    self.assertIsNot(Keyword('$name'), Symbol('$name'))
+    self.assertIs(Keyword('$name'), Keyword('name'))
+    self.assertIs(type(Keyword('$name')), Keyword)
+
+  def test_pickle(self):
+    for name in ('$name', '$$dollars', '$'):
+      original = Symbol(name)
+      for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        self.assertIs(pickle.loads(pickle.dumps(original, protocol)), original)
+
+  def test_copy(self):
+    original = Symbol('$name')
+    self.assertIs(copy.copy(original), original)
+    self.assertIs(copy.deepcopy({original: [original]})[original][0], original)
+
+  def test_threads(self):
+    names = ['$thread-{0}'.format(i % 50) for i in range(5000)]
+    with ThreadPoolExecutor(max_workers = 8) as executor:
+      symbols = list(executor.map(Symbol, names))
+    for name, created in zip(names, symbols):
+      self.assertIs(created, Symbol(name))
+
+
+class TestLoaderConfig(TestCase):
+
+  yaml_src = '[$name, $$price, $quote-as-strings]'
+
+  def test_default(self):
+    self.assertEqual(
+      yaml.load(self.yaml_src, Loader = DEFAULT_CONFIG.Loader),
+      [Symbol('$name'), EscapedDollar('$$price'), QuoteAsStrings()]
+    )
+    self.assertEqual(
+      yaml.dump([Symbol('$name')], Dumper = DEFAULT_CONFIG.Dumper),
+      '- $name\n'
+    )
+
+  def test_default_built_once(self):
+    config._default_config = None
+    with ThreadPoolExecutor(8) as pool:
+      configs = list(pool.map(lambda _: config.default_config(), range(32)))
+    self.assertTrue(all(built is configs[0] for built in configs))
+    self.assertIs(DEFAULT_CONFIG.Loader, configs[0].Loader)
+    self.assertEqual(repr(DEFAULT_CONFIG), 'LoaderConfig([EscapedDollar, QuoteAsStrings, Symbol])')
+
+  def test_subset(self):
+    symbols_only = LoaderConfig([Symbol])
+    self.assertEqual(
+      yaml.load(self.yaml_src, Loader = symbols_only.Loader),
+      [Symbol('$name'), '$$price', '$quote-as-strings']
+    )
+    self.assertNotIn(
+      QuoteAsStrings.yaml_tag, symbols_only.scope_table.scopes
+    )
+
+  def test_later_tags_not_added(self):
+    snapshot = LoaderConfig()
+    class Later(StubblyObject):
+      resolver_regexp = r'^\^later$'
+      resolver_first = '^'
+      @classmethod
+      def from_yaml(cls, loader, node):
+        return cls()
+    self.assertIsInstance(yaml.load('^later', Loader = StubblyLoader), Later)
+    self.assertEqual(yaml.load('^later', Loader = snapshot.Loader), '^later')
+
+  def test_scope_table_frozen(self):
+    table = LoaderConfig().scope_table
+    self.assertRaises(FrozenConfigError, table.register, '!x', None)
+    self.assertEqual(
+      table.rows[QuoteAsStrings.scope]['tag:yaml.org,2002:int'],
+      (QuoteAsStrings.scope, False, False)
+    )
+    rows = repr(table.rows)
+    self.assertEqual(table.entry(scopes.BASE, '!x'), (scopes.BASE, False, True))
+    self.assertEqual(table.compile(Symbol.scope, '!x'), (Symbol.scope, True, True))
+    self.assertEqual(repr(table.rows), rows)
+
+  def test_read_only(self):
+    for change in (
+      lambda: DEFAULT_CONFIG.Loader.add_constructor('!x', None),
+      lambda: DEFAULT_CONFIG.Loader.add_implicit_resolver('!x', None, None),
+      lambda: DEFAULT_CONFIG.Loader.add_stubbly_resolver('!x', 'x', 'x'),
+      lambda: DEFAULT_CONFIG.Dumper.add_representer(int, None),
+      lambda: DEFAULT_CONFIG.scope_table.register('!x', None),
+      lambda: setattr(DEFAULT_CONFIG, 'tags', ()),
+    ):
+      self.assertRaises(TypeError, change)
+
+  def test_global_loader_unchanged(self):
+    before = dict(StubblyLoader.yaml_constructors)
+    LoaderConfig([EscapedDollar])
+    self.assertEqual(StubblyLoader.yaml_constructors, before)
+
+
+class TestSingletonThreads(TestCase):
+
+  def test_one_instance(self):
+    class Once(SingletonStubblyObject):
+      pass
+    barrier = threading.Barrier(8)
+    def create(_):
+      barrier.wait()
+      return Once()
+    with ThreadPoolExecutor(max_workers = 8) as executor:
+      instances = list(executor.map(create, range(8)))
+    self.assertTrue(all(instance is instances[0] for instance in instances))
+
+
+class TestStubblyLoader(TestCase):
+
+  def test_global_loader_unaffected(self):
+    self.assertEqual(
+      yaml.load('[$name, $$dollars, $quote-as-strings]', Loader = yaml.Loader),
+      ['$name', '$$dollars', '$quote-as-strings']
+    )
+    self.assertNotIn('$', yaml.Loader.yaml_implicit_resolvers)
+
+  def test_explicit_tags(self):
+    self.assertEqual(
+      yaml.load('!stubbly/symbol name', Loader = StubblyLoader),
+      Symbol('$name')
+    )
+
+  def test_quoted_strings_not_resolved(self):
+    self.assertEqual(
+      type(yaml.load("'$name'", Loader = StubblyLoader)),
+      str
+    )
+
+  def test_other_implicit_tags(self):
+    self.assertEqual(
+      yaml.load('[1, on, null, text]', Loader = StubblyLoader),
+      [1, True, None, 'text']
+    )
+
+
+def load_tests(loader, tests, ignore):
+  tests.addTests(doctest.DocTestSuite(stubbly))
+  tests.addTests(doctest.DocTestSuite(symbol))
+  tests.addTests(doctest.DocTestSuite(scopes))
+  tests.addTests(doctest.DocTestSuite(config))
+  return tests